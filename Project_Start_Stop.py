@@ -1,36 +1,67 @@
-import RPi.GPIO as GPIO
-import time
-import subprocess
-import os
-import signal
-
-GPIO.setmode(GPIO.BCM)
-button_pin = 22
-GPIO.setup(button_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-
-# Track the running process
-process = None
-
-def button_pressed(channel):
-    global process
-    if process is None:
-        print("Button pressed! Starting script...")
-        # Start the process in the background
-        process = subprocess.Popen(["python3", "Pygame_Servo_Working_V10_6.py"])
-    else:
-        print("Button pressed! Stopping script...")
-        # Kill the running process
-        process.terminate()  # Sends SIGTERM
-        process.wait()
-        process = None
-
-GPIO.add_event_detect(button_pin, GPIO.FALLING, callback=button_pressed, bouncetime=500)
-
-try:
-    while True:
-        time.sleep(0.1)
-except KeyboardInterrupt:
-    if process:
-        process.terminate()
-    GPIO.cleanup()
-
+import RPi.GPIO as GPIO
+import time
+import subprocess
+import os
+import sys
+from haptivision.control import DEFAULT_PATH, send
+from haptivision.shutdown import stop_process
+
+GPIO.setmode(GPIO.BCM)
+button_pin = 22
+GPIO.setup(button_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+SCRIPT = "Pygame_Servo_Working_V10_6.py"
+COLD_START = "--cold" in sys.argv # Old behaviour: a new interpreter per press, stopped on the next one
+control_path = os.environ.get("HAPTIVISION_CONTROL", DEFAULT_PATH)
+MOTOR_PINS, SERVO_PINS = (5, 13, 6), (17, 18) # Silenced through pigpiod if the program has to be killed
+
+def stop_navigation(): # SIGTERM, bounded wait, then kill; the program logs its own stop timings
+    elapsed, killed = stop_process(process, motor_pins=MOTOR_PINS, servo_pins=SERVO_PINS)
+    print(f"Navigation program {'killed' if killed else 'stopped'} after {elapsed * 1000:.0f} ms")
+
+def start_resident(press_t=None): # With press_t it navigates at once, otherwise it waits in standby
+    env = {**os.environ, "HAPTIVISION_CONTROL": control_path}
+    if press_t is not None:
+        env["HAPTIVISION_PRESS_T"] = str(press_t)
+    resident = subprocess.Popen(["python3", SCRIPT], env=env)
+    print(f"Navigation program starting {'to navigate' if press_t is not None else 'in standby'} (pid {resident.pid})")
+    return resident
+
+# Track the running process
+process = None
+if not COLD_START: # The navigation program initializes once and waits in standby for the button
+    process = start_resident()
+
+def button_pressed(channel):
+    global process
+    press_t = time.monotonic() # System wide, so the navigation program can time its start from the press
+    if not COLD_START:
+        if process.poll() is not None: # Crashed or quit: the socket will never answer again, start a new one
+            print(f"Button pressed! Navigation program had exited with status {process.returncode}, restarting it")
+            process = start_resident(press_t)
+            return
+        try:
+            reply = send(f"toggle {press_t}", control_path)
+        except OSError:
+            print("Button pressed! Navigation program is still starting, try again in a moment")
+            return
+        print(f"Button pressed! Toggling navigation: {reply}")
+        return
+    if process is None:
+        print("Button pressed! Starting script...")
+        # Start the process in the background
+        process = subprocess.Popen(["python3", SCRIPT], env={**os.environ, "HAPTIVISION_PRESS_T": str(press_t)})
+    else:
+        print("Button pressed! Stopping script...")
+        stop_navigation()
+        process = None
+
+GPIO.add_event_detect(button_pin, GPIO.FALLING, callback=button_pressed, bouncetime=500)
+
+try:
+    while True:
+        time.sleep(0.1)
+except KeyboardInterrupt:
+    if process:
+        stop_navigation()
+    GPIO.cleanup()
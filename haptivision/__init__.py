@@ -0,0 +1 @@
+"""HaptiVision support package (simulation, tooling and shared pipeline code)."""
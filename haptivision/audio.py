@@ -0,0 +1,104 @@
+"""Audio cues next to the vibration motors, through ``pygame.mixer``.
+
+Every (motor, priority) cue is synthesized once at start-up with numpy:
+a tone burst per priority, panned to the motor's side of the stereo field
+(left, center, right).  Each motor gets a mixer channel of its own, so a
+motor transition is one ``Channel.play`` of a ready ``Sound`` that cuts
+that motor's previous cue short.
+
+    cues = AudioCues()               # after pygame.init()
+    ...
+    if motor is not None:
+        cues.play(motor, arbiter.motor_priority[motor], verdict_t)
+
+``verdict_t`` is the ``monotonic()`` time of the zone verdict; the time from
+it to the play call is kept per cue.  The mixer's own buffer adds
+``buffer / frequency`` on top of that (about 12 ms at 256 frames, 22050 Hz).
+"""
+from collections import deque
+from time import monotonic
+
+import numpy as np
+
+from .haptics import MOTORS
+from .latency import percentile
+from .zones import GREY_PRIORITY, PRIORITY_NAMES, RED_PRIORITY, YELLOW_PRIORITY
+
+CUES = { # Priority -> (tone Hz, (on_s, off_s) bursts); GREEN stops the motor's cue
+    RED_PRIORITY: (1000, ((0.05, 0.05),) * 3), # Three rapid high beeps
+    GREY_PRIORITY: (300, ((0.4, 0.0),)), # One long low tone for a gap in the floor
+    YELLOW_PRIORITY: (600, ((0.15, 0.0),)), # One short mid tone
+}
+PAN = {"left": -1.0, "center": 0.0, "right": 1.0}
+FADE_S = 0.005 # Ramp at both ends of every burst, so the tones start and stop without a click
+
+
+def synthesize(frequency, bursts, rate, pan=0.0, volume=0.5):
+    """int16 samples ``(n, 2)`` of a tone burst train, panned with constant power (-1 left .. 1 right)."""
+    parts = []
+    fade = max(1, int(FADE_S * rate))
+    for on, off in bursts:
+        n = int(on * rate)
+        burst = np.sin(2 * np.pi * frequency * np.arange(n) / rate)
+        ramp = np.minimum(1.0, np.minimum(np.arange(n), np.arange(n)[::-1]) / fade)
+        parts += [burst * ramp, np.zeros(int(off * rate))]
+    mono = np.concatenate(parts) * volume * 32767
+    angle = (pan + 1) * np.pi / 4
+    return np.column_stack((mono * np.cos(angle), mono * np.sin(angle))).astype(np.int16)
+
+
+class AudioCues:
+    def __init__(self, motors=MOTORS, frequency=22050, buffer=256, cues=CUES, volume=0.5, window=1000,
+                 clock=monotonic):
+        import pygame
+        if pygame.mixer.get_init():
+            pygame.mixer.quit() # Re-open it with a small buffer
+        pygame.mixer.init(frequency=frequency, size=-16, channels=2, buffer=buffer)
+        self.frequency, _, channels = pygame.mixer.get_init()
+        self.buffer = buffer
+        self.cues = cues
+        self.clock = clock
+        if pygame.mixer.get_num_channels() < len(motors):
+            pygame.mixer.set_num_channels(len(motors))
+        pygame.mixer.set_reserved(len(motors)) # Keep the motors' channels away from anything else that plays
+        self.channels = [pygame.mixer.Channel(m) for m in range(len(motors))]
+        self.sounds = {} # (motor index, priority) -> Sound
+        for m, name in enumerate(motors):
+            for priority, (tone, bursts) in cues.items():
+                samples = synthesize(tone, bursts, self.frequency, PAN.get(name, 0.0), volume)
+                if channels == 1:
+                    samples = samples.mean(axis=1).astype(np.int16)
+                self.sounds[m, priority] = pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+        self.latencies = deque(maxlen=window)
+        self.played = 0
+
+    def play(self, motor, priority, verdict_t=None):
+        """Starts the cue of a motor's new priority (stops its cue for GREEN)."""
+        sound = self.sounds.get((motor, priority))
+        if sound is None:
+            self.channels[motor].stop()
+            return
+        if verdict_t is not None:
+            self.latencies.append(self.clock() - verdict_t)
+        self.channels[motor].play(sound)
+        self.played += 1
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+
+    def close(self):
+        import pygame
+        self.stop()
+        pygame.mixer.quit()
+
+    def format_summary(self):
+        values = sorted(self.latencies)
+        names = ", ".join(f"{PRIORITY_NAMES[p]} {sum(on + off for on, off in bursts) * 1000:.0f} ms"
+                          for p, (_, bursts) in sorted(self.cues.items(), reverse=True))
+        mixer_ms = self.buffer / self.frequency * 1000
+        if not values:
+            return f"Audio cues: none played ({names}; mixer buffer {mixer_ms:.1f} ms)"
+        return (f"Audio cues: {self.played} played, verdict->play p50 {percentile(values, 50) * 1000:.2f} ms, "
+                f"p90 {percentile(values, 90) * 1000:.2f} ms, max {values[-1] * 1000:.2f} ms "
+                f"(+ {mixer_ms:.1f} ms mixer buffer; {names})")
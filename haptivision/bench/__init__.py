@@ -0,0 +1,15 @@
+"""Benchmarks for the navigation loop, run against the simulated hardware."""
+import os
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def revision(): # Short git revision of the tree being measured, "-dirty" with local changes
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=REPO_ROOT).returncode != 0
+        return rev + ("-dirty" if dirty else "") if rev else None
+    except OSError:
+        return None
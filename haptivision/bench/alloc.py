@@ -0,0 +1,154 @@
+"""Allocation budget check for the steady-state sweep.
+
+Runs the navigation program itself -- ``Navigator.sweep()`` and its
+``zone()``, headless, with the default blink haptics and the session log --
+on the simulated hardware (fake TF-Luna, fake pigpio daemon) and a
+``VirtualClock``, so the servo settle sleeps cost no time.  After a warm-up
+every sweep is measured with ``tracemalloc``:
+
+* ``allocations``: heap blocks allocated by each zone update and still held
+  when it returns, summed over the sweep's zones (per-zone buffers, tuples
+  and lists the loop builds and keeps until the next zone);
+* ``retained``: heap blocks the whole sweep leaves allocated;
+* ``transient``: the high-water mark of memory the sweep held above what it
+  started with, which catches temporaries built and freed within a call.
+
+CPython keeps no count of blocks that are allocated and freed again inside
+a single call, which is what ``transient`` covers.  Only the main thread is
+counted: traces whose stack starts in ``Thread._bootstrap`` (the simulated
+daemon and sensor, the session log writer, gpiozero's blink threads) are
+filtered out, and so is whatever the simulator itself allocates on the
+main thread (the fake sensor's I2C answers, the virtual clock).  The servo
+and motor commands go through pigpio's socket client on the main thread
+and are counted; the window is drawn on the renderer's own thread and is
+not part of the sweep.
+
+The check fails if any measured sweep goes over ``--allocations``,
+``--retained`` or ``--transient``:
+
+    python -m haptivision.bench.alloc --sweeps 20
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+
+from . import revision
+
+FRAMES = 100 # Deep enough to reach the bottom of every thread's stack
+SIM_FILES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sim", "*")
+BUDGET = {"allocations": 24, "retained": 8, "transient": 8192}
+
+
+def _bootstrap_filter(): # Excludes every trace made on a thread other than the main one
+    import inspect
+    lines, first = inspect.getsourcelines(threading.Thread._bootstrap)
+    lineno = next(first + i for i, line in enumerate(lines) if line.strip() == "self._bootstrap_inner()")
+    return tracemalloc.Filter(False, threading.__file__, lineno, all_frames=True)
+
+
+class SweepMeter:
+    """Wraps a Navigator's ``zone()`` to count the blocks each zone update keeps."""
+
+    def __init__(self, navigator):
+        self.filters = [_bootstrap_filter(), tracemalloc.Filter(False, tracemalloc.__file__),
+                        tracemalloc.Filter(False, SIM_FILES, all_frames=True)]
+        self.zone = navigator.zone
+        self.allocations = 0
+        navigator.zone = self._zone # Instance attribute: sweep() calls it instead of the method
+
+    def blocks(self):
+        return len(tracemalloc.take_snapshot().filter_traces(self.filters).traces)
+
+    def _zone(self, *args):
+        if not tracemalloc.is_tracing():
+            return self.zone(*args)
+        before = self.blocks()
+        self.zone(*args)
+        self.allocations += max(0, self.blocks() - before)
+
+
+def measure(sweeps=20, warmup=25, scene="room", seed=0, telemetry_path=os.devnull):
+    """Per-sweep ``{"sweep", "allocations", "retained", "transient"}`` for ``sweeps`` measured sweeps."""
+    from ..runtime import Navigator
+    from ..shutdown import StopSignal
+    from ..sim.clock import VirtualClock
+    from ..sim.hardware import SimulatedHardware
+    clock = VirtualClock()
+    # A bounded pin log: every traced block is copied by each snapshot
+    hardware = SimulatedHardware(scene, seed=seed, clock=clock.monotonic, sleep=clock.sleep, max_events=256)
+    alarm = signal.getsignal(signal.SIGALRM)
+    results = []
+    with hardware, clock.patch():
+        navigator = Navigator(telemetry_path=telemetry_path, console_interval=1e9, display=False)
+        navigator.start()
+        meter = SweepMeter(navigator)
+        try:
+            for _ in range(warmup):
+                navigator.sweep()
+            tracemalloc.start(FRAMES)
+            navigator.sweep() # Traced but not measured: what tracing itself sets up is not counted
+            for n in range(sweeps):
+                meter.allocations = 0
+                blocks = meter.blocks()
+                start = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                navigator.sweep()
+                peak = tracemalloc.get_traced_memory()[1]
+                results.append({"sweep": n, "allocations": meter.allocations, "retained": meter.blocks() - blocks,
+                                "transient": peak - start})
+        finally:
+            tracemalloc.stop()
+            navigator.stop = StopSignal(signals=()) # The stop sequence without taking over SIGTERM
+            navigator.shutdown()
+            navigator.close()
+            signal.signal(signal.SIGALRM, alarm)
+    return results
+
+
+def check(results, allocations=BUDGET["allocations"], retained=BUDGET["retained"], transient=BUDGET["transient"]):
+    """(ok, {"allocations": worst, "retained": worst, "transient": worst}) of the measured sweeps."""
+    worst = {name: max(r[name] for r in results) for name in BUDGET}
+    return worst["allocations"] <= allocations and worst["retained"] <= retained and \
+        worst["transient"] <= transient, worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.bench.alloc", description=__doc__.splitlines()[0])
+    parser.add_argument("--sweeps", type=int, default=20, help="sweeps measured after the warm-up")
+    parser.add_argument("--warmup", type=int, default=25,
+                        help="sweeps run before measuring (past 256 zone updates, CPython's cached small ints)")
+    parser.add_argument("--allocations", type=int, default=BUDGET["allocations"],
+                        help="heap blocks the zone updates of a sweep may keep, summed over its zones")
+    parser.add_argument("--retained", type=int, default=BUDGET["retained"],
+                        help="heap blocks a sweep may leave allocated")
+    parser.add_argument("--transient", type=int, default=BUDGET["transient"],
+                        help="bytes a sweep may hold above its starting level at any one time")
+    parser.add_argument("--scene", default="room", help="simulated scene (a static one is the steady state)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the per-sweep results here")
+    args = parser.parse_args(argv)
+
+    results = measure(args.sweeps, args.warmup, args.scene, args.seed)
+    limits = {"allocations": args.allocations, "retained": args.retained, "transient": args.transient}
+    ok, worst = check(results, **limits)
+    print(f"--- Allocations per sweep over {len(results)} sweeps ---", file=sys.stderr)
+    print(f"  allocations  max {worst['allocations']:6d}   (limit {args.allocations})", file=sys.stderr)
+    print(f"  retained     max {worst['retained']:+6d}   (limit {args.retained})", file=sys.stderr)
+    print(f"  transient    max {worst['transient']:6d} B (limit {args.transient})", file=sys.stderr)
+    print("ok" if ok else "OVER BUDGET", file=sys.stderr)
+
+    if args.json:
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"revision": revision(), "ok": ok, "limits": limits, "sweeps": results}, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
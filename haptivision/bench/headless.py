@@ -0,0 +1,164 @@
+"""CPU use and sweep period of the navigation script with and without its window.
+
+Runs the script on the simulated hardware in real time, once with the
+window (``HAPTIVISION_DISPLAY=1``, SDL's dummy video driver when there is
+no X display) and once headless (``HAPTIVISION_DISPLAY=0``), each in a
+fresh process, and compares the steady-state sweeps after a warm-up:
+
+    python -m haptivision.bench.headless --sweeps 5 --json results/headless.json
+
+Reported per mode:
+
+* sweep period (s) between two returns of the tilt servo to home;
+* CPU of the script's main thread and of the whole process (the simulated
+  daemon and LiDAR threads included, the same in both modes), as a share
+  of one core over the measured sweeps and in ms per sweep;
+* whether the run imported pygame or initialized its display.
+
+Most of a sweep is servo settling and the LiDAR's own sample rate, and the
+window is drawn on the renderer's own thread, so the period hardly moves;
+the CPU share shows what the renderer costs the wearable.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import REPO_ROOT, revision
+from ..sim.hardware import SimulatedHardware, _post_quit, restored_environ
+
+DEFAULT_SCRIPT = os.path.join(REPO_ROOT, "Pygame_Servo_Working_V10_6.py")
+MODES = {"display": "1", "headless": "0"}
+
+
+def thread_cpu_s(native_id): # User + system CPU seconds of one thread of this process, None off Linux
+    try:
+        with open(f"/proc/self/task/{native_id}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class SweepMeter:
+    """Wall and CPU time at every sweep, from the sweep listener of a ``SimulatedHardware``."""
+
+    def __init__(self, sweeps, warmup):
+        self.total = warmup + sweeps
+        self.warmup = warmup
+        self.main_id = threading.main_thread().native_id
+        self.marks = [] # [(sweep, wall s, process CPU s, main thread CPU s), ...]
+        self.display_initialized = False # Seen while sweeping; the script quits pygame before the result is read
+
+    def on_sweep(self, n):
+        if n <= self.total:
+            self.marks.append((n, time.perf_counter(), time.process_time(), thread_cpu_s(self.main_id)))
+            pygame = sys.modules.get("pygame")
+            self.display_initialized |= bool(pygame is not None and pygame.display.get_init())
+        if n >= self.total:
+            _post_quit()
+
+    def result(self):
+        marks = [m for m in self.marks if m[0] >= self.warmup]
+        if len(marks) < 2:
+            return {"error": f"only {len(marks)} sweeps measured"}
+        (n0, wall0, cpu0, main0), (n1, wall1, cpu1, main1) = marks[0], marks[-1]
+        sweeps, wall = n1 - n0, wall1 - wall0
+        periods = sorted(b[1] - a[1] for a, b in zip(marks, marks[1:]))
+        main = main1 - main0 if main0 is not None and main1 is not None else None
+        pygame = sys.modules.get("pygame")
+        return {"sweeps": sweeps, "wall_s": wall,
+                "period_s": {"mean": wall / sweeps, "p50": periods[len(periods) // 2], "max": periods[-1]},
+                "process_cpu": {"share": (cpu1 - cpu0) / wall, "ms_per_sweep": (cpu1 - cpu0) / sweeps * 1000},
+                "main_cpu": None if main is None else {"share": main / wall, "ms_per_sweep": main / sweeps * 1000},
+                "pygame_imported": pygame is not None,
+                "display_initialized": self.display_initialized}
+
+
+def measure(script, sweeps, warmup, scene, seed):
+    """Runs the script in this process (mode from HAPTIVISION_DISPLAY) and returns its SweepMeter result."""
+    meter = SweepMeter(sweeps, warmup)
+    hardware = SimulatedHardware(scene, seed=seed)
+    hardware.add_sweep_listener(meter.on_sweep)
+    with restored_environ("HAPTIVISION_TELEMETRY", "HAPTIVISION_CONSOLE") as environ, hardware:
+        environ["HAPTIVISION_TELEMETRY"] = "0"
+        environ.setdefault("HAPTIVISION_CONSOLE", "0")
+        hardware.run_script(script)
+    return meter.result()
+
+
+def _share(cpu):
+    return f"{cpu['share'] * 100:5.1f}% ({cpu['ms_per_sweep']:6.0f} ms/sweep)" if cpu else "-"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.bench.headless", description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="navigation script under test")
+    parser.add_argument("--sweeps", type=int, default=5, help="measured sweeps per mode (real time)")
+    parser.add_argument("--warmup", type=int, default=1, help="sweeps left out at the start")
+    parser.add_argument("--scene", default="hallway")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the results here")
+    parser.add_argument("--verbose", action="store_true", help="show the script's own output")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS) # Runs one mode, writes its result to --json
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        os.environ["HAPTIVISION_DISPLAY"] = MODES[args.worker]
+        result = measure(args.script, args.sweeps, args.warmup, args.scene, args.seed)
+        with open(args.json, "w") as f:
+            json.dump(result, f)
+        return
+
+    results = {"revision": revision(), "script": os.path.basename(args.script), "scene": args.scene,
+               "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "modes": {}}
+    output = None if args.verbose else subprocess.DEVNULL
+    for mode in MODES: # A fresh process per mode: pygame and gpiozero keep global state
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            path = tmp.name
+        try:
+            proc = subprocess.run([sys.executable, "-m", "haptivision.bench.headless", "--worker", mode,
+                                   "--script", args.script, "--sweeps", str(args.sweeps), "--warmup", str(args.warmup),
+                                   "--scene", args.scene, "--seed", str(args.seed), "--json", path],
+                                  cwd=REPO_ROOT, stdout=output, stderr=output)
+            if proc.returncode:
+                results["modes"][mode] = {"error": f"exit status {proc.returncode}"}
+            else:
+                with open(path) as f:
+                    results["modes"][mode] = json.load(f)
+        finally:
+            os.unlink(path)
+
+    print(f"--- Display vs headless: {args.sweeps} sweeps each after {args.warmup} warm-up, "
+          f"scene {args.scene} ---", file=sys.stderr)
+    print(f"  {'mode':<10} {'period p50':>10} {'mean':>7}   {'main thread CPU':<27} {'process CPU':<27} pygame",
+          file=sys.stderr)
+    for mode, r in results["modes"].items():
+        if "error" in r:
+            print(f"  {mode:<10} FAILED ({r['error']})", file=sys.stderr)
+            continue
+        pygame = "display" if r["display_initialized"] else "imported" if r["pygame_imported"] else "-"
+        print(f"  {mode:<10} {r['period_s']['p50']:9.2f}s {r['period_s']['mean']:6.2f}s   {_share(r['main_cpu']):<27} "
+              f"{_share(r['process_cpu']):<27} {pygame}", file=sys.stderr)
+    display, headless = results["modes"].get("display", {}), results["modes"].get("headless", {})
+    if "error" not in display and "error" not in headless and display and headless:
+        saved = display["process_cpu"]["ms_per_sweep"] - headless["process_cpu"]["ms_per_sweep"]
+        shorter = display["period_s"]["mean"] - headless["period_s"]["mean"]
+        results["headless_saves"] = {"cpu_ms_per_sweep": saved, "period_s": shorter}
+        print(f"Headless saves {saved:.0f} ms CPU per sweep; sweep period {-shorter * 1000:+.0f} ms",
+              file=sys.stderr)
+
+    if args.json:
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
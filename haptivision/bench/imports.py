@@ -0,0 +1,86 @@
+"""Import time of the haptivision modules, each in a fresh interpreter.
+
+Runs ``python -X importtime -c "import <module>"`` a few times per module and
+reports the best cumulative import time and which heavy dependencies
+(numpy, pygame, gpiozero, pigpio, smbus2) the import pulled in:
+
+    python -m haptivision.bench.imports
+    python -m haptivision.bench.imports haptivision.zones --budget-ms 20
+
+The core modules (classification, arbitration, patterns, control, runtime)
+must stay under ``--budget-ms`` and import none of the heavy dependencies,
+so CLI tools and replay jobs start quickly; the array, display and logging
+modules need numpy or pygame by design and are only reported.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from . import REPO_ROOT, revision
+
+CORE = ("haptivision", "haptivision.zones", "haptivision.haptics", "haptivision.patterns", "haptivision.control",
+        "haptivision.shutdown", "haptivision.latency", "haptivision.profiling", "haptivision.runtime")
+OTHERS = ("haptivision.state", "haptivision.lidar", "haptivision.telemetry", "haptivision.render",
+          "haptivision.framebuffer", "haptivision.liveview", "haptivision.audio", "haptivision.replay")
+HEAVY = ("numpy", "pygame", "gpiozero", "pigpio", "smbus2")
+
+
+def import_time(module, python=sys.executable):
+    """(cumulative import time in µs, sorted heavy top-level packages imported) of one fresh import."""
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True)
+    cumulative, names = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if cum.strip().isdigit():
+            names.add(name.strip())
+            if name.strip() == module:
+                cumulative = int(cum)
+    return cumulative, sorted(h for h in HEAVY if h in names)
+
+
+def measure(modules, repeat=5):
+    results = []
+    for module in modules:
+        runs = [import_time(module) for _ in range(repeat)]
+        results.append({"module": module, "us": min(us for us, _ in runs), "heavy": runs[0][1],
+                        "core": module in CORE})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.bench.imports", description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help=f"modules to time (default: all of {', '.join(CORE + OTHERS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh imports per module, the best one counts")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="import time allowed for a core module")
+    parser.add_argument("--json", metavar="PATH", help="write the results here")
+    args = parser.parse_args(argv)
+
+    results = measure(args.modules or CORE + OTHERS, args.repeat)
+    ok = True
+    print(f"--- Import time, best of {args.repeat} fresh interpreters ---", file=sys.stderr)
+    for r in results:
+        status = ""
+        if r["core"]:
+            r["ok"] = r["us"] <= args.budget_ms * 1000 and not r["heavy"]
+            ok = ok and r["ok"]
+            status = "ok" if r["ok"] else "OVER BUDGET" if not r["heavy"] else "HEAVY IMPORT"
+        heavy = ", ".join(r["heavy"]) or "-"
+        print(f"  {r['module']:<24} {r['us'] / 1000:8.1f} ms   heavy: {heavy:<22} {status}", file=sys.stderr)
+    print("ok" if ok else "core import budget exceeded", file=sys.stderr)
+
+    if args.json:
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"revision": revision(), "ok": ok, "budget_ms": args.budget_ms, "modules": results}, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
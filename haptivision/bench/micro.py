@@ -0,0 +1,182 @@
+"""Microbenchmarks for the per-zone hot path, no hardware needed.
+
+Times the functions the navigation loop calls for every zone on synthetic
+distance data at several sample counts and reports nanoseconds per sample:
+
+    python -m haptivision.bench.micro
+    python -m haptivision.bench.micro --samples 20 200 --json results/micro.json
+
+The frame draw renders into an off-screen surface with every point cloud
+zone holding ``samples`` points, so it is reported per point drawn as well
+as per frame.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from time import perf_counter_ns
+
+from . import revision
+
+SAMPLE_COUNTS = (20, 200, 2000)
+
+
+def timeit(func, min_time=0.2, repeat=5):
+    """Best time per call in ns over ``repeat`` runs of at least ``min_time`` seconds each."""
+    loops = 1
+    while True: # Find a loop count that runs long enough to time
+        start = perf_counter_ns()
+        for _ in range(loops):
+            func()
+        elapsed = perf_counter_ns() - start
+        if elapsed >= min_time * 1e9 / repeat:
+            break
+        loops *= 10 if elapsed < min_time * 1e8 / repeat else 2
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = perf_counter_ns()
+        for _ in range(loops):
+            func()
+        best = min(best, (perf_counter_ns() - start) / loops)
+    return best
+
+
+def synthetic_zone(samples, rng): # Distances (cm) spread over every threshold band, including 0 for no return
+    return [rng.choice((0, rng.randint(20, 99), rng.randint(100, 199), rng.randint(200, 210),
+                        rng.randint(211, 400), rng.randint(401, 800))) for _ in range(samples)]
+
+
+def cases(samples, seed=0):
+    """(name, per-call function, samples handled per call) for one sample count."""
+    import numpy as np
+    import pygame
+    from ..haptics import Arbiter
+    from ..liveview import LiveViewPublisher
+    from ..render import CENTER, HEIGHT, WIDTH, PointCloud, PolarHeatmap, Renderer, StaticText, draw_frame, \
+        get_color_for_distance, polar_to_screen, zone_points
+    from ..state import ZoneStore
+    from ..zones import POSITIONS, ZONE_IDS, ZONE_LABELS, ZoneClassifier, classify_zone, nearest_return
+
+    rng = random.Random(seed)
+    dist = synthetic_zone(samples, rng)
+    angles = [rng.uniform(45, 135) for _ in range(samples)]
+
+    def polar():
+        for a, d in zip(angles, dist):
+            polar_to_screen(CENTER, a, min(d, 350), scale=1)
+
+    def color():
+        for i, d in enumerate(dist):
+            get_color_for_distance(d, i % 12)
+
+    yield "polar_to_screen", polar, samples
+    yield "get_color_for_distance", color, samples
+    yield "classify_zone (upper)", lambda: classify_zone("2nd", dist), samples
+    yield "classify_zone (floor)", lambda: classify_zone("8th", dist), samples
+    yield "zone_points", lambda: zone_points("2nd", dist, 1), samples
+
+    buffer = np.array(dist, np.int32) # What LidarReader hands the loop
+    classifier = ZoneClassifier(samples)
+    cloud = PointCloud(samples)
+    yield "ZoneClassifier (upper)", lambda: classifier("2nd", buffer), samples
+    yield "ZoneClassifier (floor)", lambda: classifier("8th", buffer), samples
+    yield "PointCloud.update", lambda: cloud.update("2nd", buffer, classifier.levels), samples
+
+    store, snapshot = ZoneStore(), ZoneStore().snapshot()
+    yield "ZoneStore.update", lambda: store.update(1, 3, 57), 1
+    yield "ZoneStore.snapshot", lambda: store.snapshot(snapshot), 1
+
+    arbiter = Arbiter()
+    yield "Arbiter.update (static)", lambda: arbiter.update(1, 0), 1
+    flip = iter(range(1 << 62))
+    yield "Arbiter.update (changing)", lambda: arbiter.update(1, 3 * (next(flip) & 1)), 1
+
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    zones = ZoneStore()
+    for i in range(len(ZONE_LABELS)):
+        zones.update(i, i % 4, 100 * i)
+    zone_to_points = {label: [] for label in ZONE_LABELS}
+    for idx, (_, _, label) in enumerate(POSITIONS):
+        zone_to_points[label] = zone_points(label, synthetic_zone(samples, rng), idx)
+    points = sum(len(p) for p in zone_to_points.values())
+    text = StaticText()
+    yield "draw_frame", lambda: draw_frame(screen, zones, zone_to_points, text), points
+    for idx, (_, _, label) in enumerate(POSITIONS):
+        values = np.array(synthetic_zone(samples, rng), np.int32)
+        classifier(label, values)
+        cloud.update(label, values, classifier.levels)
+    yield "draw_frame (PointCloud)", lambda: draw_frame(screen, zones, cloud, text), points
+
+    store = ZoneStore(samples=samples)
+    renderer = Renderer(store)
+    for idx, (_, _, label) in enumerate(POSITIONS):
+        values = np.array(synthetic_zone(samples, rng), np.int32)
+        store.update(ZONE_IDS[label], classifier(label, values), nearest_return(values), values, classifier.levels)
+    renderer.draw(screen)
+    yield "Renderer.draw (same)", lambda: renderer.draw(screen), points
+    yield "Renderer.draw (new)", lambda: store.update(1, 3, 57, values, classifier.levels) or \
+        renderer.draw(screen), points
+
+    heatmap = PolarHeatmap(samples)
+    yield "PolarHeatmap.add", lambda: heatmap.add("2nd", values), samples
+    yield "PolarHeatmap.draw", lambda: heatmap.draw(screen), points
+
+    publisher = LiveViewPublisher(("127.0.0.1", 9), samples, rate=1e9) # Always due; nothing listens on discard
+    idle = LiveViewPublisher(("127.0.0.1", 9), samples, rate=1e-9) # Never due after the first
+    idle.publish(store)
+    yield "LiveView.publish (due)", lambda: store.update(1, 3, 57, values, classifier.levels) or \
+        publisher.publish(store), samples
+    yield "LiveView.publish (idle)", lambda: idle.publish(store), samples
+
+
+def run(sample_counts=SAMPLE_COUNTS, min_time=0.2, seed=0, names=None):
+    if not os.environ.get("DISPLAY"):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    results = []
+    try:
+        for samples in sample_counts:
+            for name, func, n in cases(samples, seed):
+                if names and not any(name.startswith(wanted) for wanted in names):
+                    continue
+                ns = timeit(func, min_time)
+                results.append({"name": name, "samples": samples, "per_call": n,
+                                "ns_per_sample": ns / n, "us_per_call": ns / 1e3})
+    finally:
+        pygame.quit()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.bench.micro", description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only benchmarks whose name starts with one of these")
+    parser.add_argument("--samples", type=int, nargs="+", default=SAMPLE_COUNTS, help="samples per zone")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent timing each case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the results here ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    results = run(args.samples, args.min_time, args.seed, args.names)
+    print(f"{'benchmark':<26}{'samples':>8}{'ns/sample':>12}{'us/call':>12}", file=sys.stderr)
+    for r in results:
+        print(f"{r['name']:<26}{r['samples']:>8}{r['ns_per_sample']:>12.1f}{r['us_per_call']:>12.1f}", file=sys.stderr)
+
+    report = {"revision": revision(), "python": platform.python_version(), "machine": platform.machine(),
+              "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Scripted walk-through scenarios scored against a noise-free oracle.
+
+Each scenario is a scene plus a motion function of time (the user walking,
+a person crossing).  The navigation script runs against it on the simulated
+hardware in its own process, with the session log switched on.  Afterwards
+the run is scored against an oracle: the same scene ray-cast without noise
+at the exact pan/tilt of every zone, classified with the script's rules.
+
+    python -m haptivision.bench.scenarios --json results/bench.json
+    python -m haptivision.bench.scenarios approaching_wall curb_gap
+
+Reported per scenario:
+
+* sweep rate (full 12 zone sweeps per second);
+* per-zone staleness, the time between two updates of the same zone;
+* hazard latency, from the hazard entering the field (oracle) to the first
+  on-pulse of the expected motor pattern or a more urgent one; ``null`` when
+  it was never shown.  With ``HAPTIVISION_HAPTICS=pwm`` the motors get a
+  PWM setting instead of blink pulses, and each setting that vibrates is
+  scored as the priority ``pwm_setting()`` made it for;
+* false alarms: non-GREEN zone verdicts the oracle does not support at any
+  sample time of the zone, and motor pulses stronger than anything the
+  oracle shows within the preceding sweep.
+
+The oracle looks along the commanded servo angles, so readings taken while
+a servo is still slewing into position count against the script.  Keep the
+scenes closed within the TF-Luna's 8 m range: the script treats "no return"
+(distance 0) as RED.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import REPO_ROOT, revision
+from ..haptics import CARRIER_HZ
+from ..patterns import PATTERNS
+from ..sim.hardware import MOTOR_PINS, SimulatedHardware, _post_quit, restored_environ
+from ..sim.scene import DropOff, Post, Scene, Wall, room
+from ..sim.tfluna import TFLunaEmulator
+from ..telemetry import VERDICT_NAMES, ZONE_LABELS, SessionLog
+from ..zones import GREY_PRIORITY, POSITIONS, RED_PRIORITY, SWEEP_TILTS, YELLOW_PRIORITY, ZONE_MOTOR, sample_priority
+
+DEFAULT_SCRIPT = os.path.join(REPO_ROOT, "Pygame_Servo_Working_V10_6.py")
+
+TOLERANCE = 0.05 # Relative distance margin before an alarm counts as false
+SCORED_HAPTICS = ("blink", "wave", "pwm") # HAPTIVISION_HAPTICS modes whose motor output can be scored
+
+
+# (on-pulse length, priority) of every pattern that vibrates, shortest first
+PULSE_ON = sorted((max(on for on, _ in pattern.pulses), priority) for priority, pattern in PATTERNS.items()
+                  if any(on for on, _ in pattern.pulses))
+
+
+def pulse_priority(duration): # Pattern with the nearest on-pulse, None below half the shortest (GREEN's blink(0, 1))
+    if duration < PULSE_ON[0][0] / 2:
+        return None
+    for (on, priority), (next_on, _) in zip(PULSE_ON, PULSE_ON[1:]):
+        if duration < (on + next_on) / 2: # Halfway to the next longer pulse
+            return priority
+    return PULSE_ON[-1][1]
+
+
+def pwm_priority(update): # Priority a PwmMotors setting stands for (see haptics.pwm_setting), None when off
+    if not update.duty:
+        return None
+    if update.frequency != CARRIER_HZ: # Only RED pulses, below the carrier
+        return RED_PRIORITY
+    return GREY_PRIORITY if update.duty >= 1.0 else YELLOW_PRIORITY
+
+
+def motor_pulses(recorder, pin, haptics="blink", until=None):
+    """[(start, priority), ...] of a motor pin: its on-pulses, or with "pwm" haptics its vibrating settings."""
+    if haptics == "pwm":
+        pulses = [(e.t, pwm_priority(e)) for e in recorder.pwm_updates if e.pin == pin]
+    elif haptics in SCORED_HAPTICS: # gpiozero's blink thread or pigpiod's waveforms: pin edges either way
+        pulses = [(start, pulse_priority(end - start)) for start, end in recorder.on_intervals(pin, until=until)]
+    else:
+        raise ValueError(f"cannot score haptics mode {haptics!r} ({', '.join(SCORED_HAPTICS)})")
+    return [(t, priority) for t, priority in pulses if priority is not None]
+
+
+class Scenario:
+    def __init__(self, name, build, motion=None, duration=30.0, hazard=None, description=""):
+        self.name = name
+        self.build = build # () -> Scene
+        self.motion = motion # (scene, t) -> None, moves things to where they are t seconds in
+        self.duration = duration
+        self.hazard = hazard # (motor, priority) the run must end up signalling, None if nothing should
+        self.description = description
+
+    def scene_at(self, t, scene=None):
+        scene = scene if scene is not None else self.build()
+        if self.motion:
+            self.motion(scene, t)
+        return scene
+
+
+class ScriptedScene(Scene):
+    """Scene whose motion function is applied before every cast, timed from the first cast."""
+
+    def __init__(self, scenario, clock=time.monotonic):
+        base = scenario.build()
+        super().__init__(base.objects, base.sensor_x, base.sensor_y, base.sensor_height, base.heading,
+                         base.floor, base.floor_reflectivity)
+        self.scenario = scenario
+        self.clock = clock
+        self.t0 = None
+
+    def elapsed(self):
+        return self.clock() - self.t0 if self.t0 is not None else 0.0
+
+    def cast(self, pan_deg, tilt_deg, max_range=800.0):
+        if self.t0 is None:
+            self.t0 = self.clock()
+        self.scenario.scene_at(self.elapsed(), self)
+        return super().cast(pan_deg, tilt_deg, max_range)
+
+
+def _walk(speed, start=0.0, stop=None): # Sensor walking forward along +y
+    def motion(scene, t):
+        y = start + speed * t
+        scene.sensor_y = min(y, stop) if stop is not None else y
+    return motion
+
+
+def _crossing(post, x0, speed): # A post (person) walking along +x
+    def motion(scene, t):
+        scene.objects[post].x = x0 + speed * t
+    return motion
+
+
+def builtin_scenarios():
+    return {s.name: s for s in [
+        Scenario("approaching_wall", lambda: Scene(room(width=400, depth=600)),
+                 _walk(40.0, stop=530.0), duration=25.0, hazard=("center", 3),
+                 description="walk at 0.4 m/s towards a wall, stopping 70 cm short"),
+        Scenario("person_crossing", lambda: Scene([Post(-300, 80, radius=20, height=175)] + room(800, 600)),
+                 _crossing(0, -300.0, 30.0), duration=25.0, hazard=("center", 3),
+                 description="a person crosses left to right 80 cm in front"),
+        Scenario("doorway", lambda: Scene(room(width=400, depth=700) + [Wall(-200, 300, -45, 300), Wall(45, 300, 200, 300)]),
+                 _walk(25.0, stop=400.0), duration=25.0, hazard=None,
+                 description="walk through a 90 cm doorway 3 m ahead"),
+        Scenario("descending_stair", lambda: Scene(room(width=400, depth=600) + [DropOff(-200, 450, 200, 600, depth=180)]),
+                 _walk(20.0, stop=400.0), duration=25.0, hazard=("center", 2),
+                 description="walk towards the top of a stair going down, stopping 50 cm short"),
+        Scenario("curb_gap", lambda: Scene(room(width=800, depth=600) + [DropOff(-400, 450, 400, 600, depth=15)]),
+                 _walk(20.0, stop=400.0), duration=25.0, hazard=("center", 2),
+                 description="walk towards a 15 cm curb drop across the path"),
+    ]}
+
+
+class Oracle:
+    """Noise-free zone and motor verdicts for a scenario at any time."""
+
+    def __init__(self, scenario, step=0.05):
+        self.scenario = scenario
+        self.scene = scenario.build()
+        self.sensor = TFLunaEmulator(self.scene, noise_cm=0.0, noise_frac=0.0)
+        self.step = step
+        self._cache = {}
+
+    def distance(self, t, pan, tilt):
+        self.scenario.scene_at(t, self.scene)
+        return self.sensor.measure(90.0 * pan, 90.0 * tilt)[0]
+
+    def zone_verdicts(self, t, label, pan, tilt): # Verdicts reachable within the distance tolerance
+        d = self.distance(t, pan, tilt)
+        return {sample_priority(label, d * f) for f in (1.0 - TOLERANCE, 1.0, 1.0 + TOLERANCE)}
+
+    def motors(self, t): # {motor: highest priority any of its zones would report at t}
+        key = round(t / self.step)
+        if key not in self._cache:
+            result = dict.fromkeys(MOTOR_PINS, 0)
+            for (pan, _, label), tilt in zip(POSITIONS, SWEEP_TILTS):
+                motor = ZONE_MOTOR[label]
+                result[motor] = max(result[motor], max(self.zone_verdicts(key * self.step, label, pan, tilt)))
+            self._cache[key] = result
+        return self._cache[key]
+
+    def onset(self, motor, priority, until):
+        t = 0.0
+        while t <= until:
+            if self.motors(t)[motor] >= priority:
+                return t
+            t += self.step
+        return None
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return None
+    return {"p50": values[len(values) // 2], "max": values[-1]}
+
+
+def score(scenario, session, recorder, sweep_times, t0, t_end, haptics="blink"):
+    oracle = Oracle(scenario)
+    records = session.records
+    sweep_period = (sweep_times[-1] - sweep_times[0]) / (len(sweep_times) - 1) if len(sweep_times) > 1 else None
+    result = {"description": scenario.description, "duration_s": t_end - t0, "sweeps": len(sweep_times),
+              "sweep_rate_hz": 1.0 / sweep_period if sweep_period else 0.0, "zones": int(len(records))}
+
+    last_update, staleness = {}, {}
+    zone_alarms = zone_false = 0
+    for r in records:
+        label = ZONE_LABELS[r["label"] - 1]
+        t = float(r["t"])
+        if label in last_update:
+            staleness.setdefault(label, []).append(t - last_update[label])
+        last_update[label] = t
+        if r["verdict"]:
+            zone_alarms += 1
+            seen = set()
+            for dt in r["dt"][:max(1, r["n"])]: # Anywhere during the zone's reads
+                seen |= oracle.zone_verdicts(t + float(dt) - t0, label, float(r["pan"]), float(r["tilt"]))
+            if r["verdict"] not in seen:
+                zone_false += 1
+    result["zone_staleness_s"] = {label: _percentiles(v) for label, v in staleness.items()}
+    result["zone_alarms"] = zone_alarms
+    result["zone_false_alarms"] = zone_false
+    result["false_alarm_rate"] = zone_false / zone_alarms if zone_alarms else 0.0
+
+    window = sweep_period or 6.0
+    pulses, motor_false = {}, 0
+    for motor, pin in MOTOR_PINS.items():
+        for start, priority in motor_pulses(recorder, pin, haptics, until=t_end):
+            if start < t0:
+                continue
+            pulses.setdefault(motor, []).append((start - t0, priority))
+            rel = start - t0
+            support = max(oracle.motors(max(0.0, rel - k * oracle.step))[motor]
+                          for k in range(int(window / oracle.step) + 1))
+            if priority > support:
+                motor_false += 1
+    result["motor_pulses"] = sum(len(p) for p in pulses.values())
+    result["motor_false_alarms"] = motor_false
+
+    if scenario.hazard:
+        motor, priority = scenario.hazard
+        onset = oracle.onset(motor, priority, t_end - t0)
+        detected = next((t for t, p in pulses.get(motor, []) if onset is not None and t >= onset and p >= priority), None)
+        result["hazard"] = {"motor": motor, "pattern": VERDICT_NAMES[priority], "onset_s": onset,
+                            "detected_s": detected,
+                            "latency_s": detected - onset if detected is not None else None}
+    else:
+        result["hazard"] = None
+    return result
+
+
+def run_scenario(scenario, script=DEFAULT_SCRIPT, seed=0):
+    """Runs the script against one scenario in this process and scores it."""
+    haptics = os.environ.get("HAPTIVISION_HAPTICS", "blink")
+    with tempfile.TemporaryDirectory() as tmp, \
+            restored_environ("HAPTIVISION_TELEMETRY", "HAPTIVISION_CONSOLE") as environ:
+        log_path = os.path.join(tmp, "session.hvt")
+        environ["HAPTIVISION_TELEMETRY"] = log_path
+        environ.setdefault("HAPTIVISION_CONSOLE", "0")
+        hardware = SimulatedHardware(seed=seed)
+        scene = ScriptedScene(scenario)
+        hardware.lidar.scene = scene
+        hardware.add_sweep_listener(lambda n: scene.elapsed() >= scenario.duration and _post_quit())
+        with hardware:
+            hardware.run_script(script)
+        t_end = time.monotonic()
+        return score(scenario, SessionLog(log_path), hardware.recorder, hardware.sweep_times, scene.t0, t_end,
+                     haptics)
+
+
+def main(argv=None):
+    scenarios = builtin_scenarios()
+    parser = argparse.ArgumentParser(prog="python -m haptivision.bench.scenarios", description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"scenarios to run (default all: {', '.join(scenarios)})")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="navigation script under test")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the LiDAR noise")
+    parser.add_argument("--json", metavar="PATH", help="write the results here ('-' for stdout)")
+    parser.add_argument("--verbose", action="store_true", help="show the script's own output")
+    parser.add_argument("--worker", help=argparse.SUPPRESS) # Runs one scenario, writes its result to --json
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = run_scenario(scenarios[args.worker], args.script, args.seed)
+        with open(args.json, "w") as f:
+            json.dump(result, f)
+        return
+
+    for name in args.names:
+        if name not in scenarios:
+            parser.error(f"unknown scenario {name!r}")
+    haptics = os.environ.get("HAPTIVISION_HAPTICS", "blink")
+    if haptics not in SCORED_HAPTICS:
+        parser.error(f"HAPTIVISION_HAPTICS={haptics!r}: only {', '.join(SCORED_HAPTICS)} motor output can be scored")
+    results = {"revision": revision(), "script": os.path.basename(args.script), "seed": args.seed, "haptics": haptics,
+               "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "scenarios": {}}
+    output = None if args.verbose else subprocess.DEVNULL
+    for name in args.names or scenarios:
+        # A fresh process per scenario: gpiozero keeps its pin factory (and daemon connection) globally
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            path = tmp.name
+        try:
+            proc = subprocess.run([sys.executable, "-m", "haptivision.bench.scenarios", "--worker", name,
+                                   "--script", args.script, "--seed", str(args.seed), "--json", path],
+                                  stdout=output, stderr=output)
+            if proc.returncode:
+                results["scenarios"][name] = {"error": f"exit status {proc.returncode}"}
+            else:
+                with open(path) as f:
+                    results["scenarios"][name] = json.load(f)
+        finally:
+            os.unlink(path)
+        r = results["scenarios"][name]
+        if "error" in r:
+            print(f"{name:<18} FAILED ({r['error']})", file=sys.stderr)
+            continue
+        hazard = r["hazard"]
+        if hazard is None:
+            detection = "no hazard"
+        elif hazard["latency_s"] is None:
+            detection = f"{hazard['pattern']} on {hazard['motor']} MISSED"
+        else:
+            detection = f"{hazard['pattern']} on {hazard['motor']} after {hazard['latency_s']:.2f} s"
+        print(f"{name:<18} {r['sweep_rate_hz']:.3f} sweeps/s  {detection:<32} "
+              f"false alarms {r['zone_false_alarms']}/{r['zone_alarms']} zones, "
+              f"{r['motor_false_alarms']}/{r['motor_pulses']} pulses", file=sys.stderr)
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
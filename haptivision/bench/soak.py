@@ -0,0 +1,229 @@
+"""Long-run soak test of the navigation loop on simulated hardware.
+
+Runs the script for many sweeps on a ``VirtualClock`` (its sleeps cost no
+wall time) and samples, every few sweeps, the process RSS, the memory
+traced by ``tracemalloc``, live threads, open file descriptors and open I2C
+handles.  After a warm-up the trend of each metric is fitted with a straight
+line; the run fails if any keeps growing:
+
+* traced memory growing faster than the allocation budget (bytes per sweep);
+* RSS growing faster than ``--rss-budget`` bytes per sweep;
+* more threads, file descriptors or I2C handles at the end than the
+  steady-state level seen right after warm-up;
+* no zone verdict changes after warm-up: a loop that never changes priority
+  never runs the arbitration and pattern paths, so their leaks go unseen.
+
+The built-in scenes are static, so by default the soak cycles through all
+of them (``--scene all``), moving to the next every ``--scene-every``
+sweeps; each move changes what the zones see and the haptics follow.
+
+    python -m haptivision.bench.soak --sweeps 300 --json results/soak.json
+
+The top allocation sites that grew between the first and last steady-state
+snapshots are printed to point at the leak.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from . import REPO_ROOT, revision
+from ..sim import tfluna
+from ..sim.clock import VirtualClock
+from ..sim.hardware import SimulatedHardware, _post_quit, restored_environ
+from ..sim.scene import builtin_scenes, load_scene
+from ..telemetry import SessionLog
+
+DEFAULT_SCRIPT = os.path.join(REPO_ROOT, "Pygame_Servo_Working_V10_6.py")
+EXCLUDE = (tracemalloc.Filter(False, tracemalloc.__file__),) # Snapshots leave out tracemalloc's own bookkeeping
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 # Peak, not current, off Linux
+
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def slope(xs, ys): # Least squares slope of ys over xs
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mx, my = sum(xs) / n, sum(ys) / n
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else 0.0
+
+
+class SoakMonitor:
+    """Samples process resources from the sweep listener of a ``SimulatedHardware``.
+
+    tracemalloc is only started once the warm-up is over, so the traced size
+    is exactly what the loop allocated since and still keeps alive.
+    """
+
+    def __init__(self, sweeps, every=5, warmup=0.2, frames=5, clock=time.monotonic):
+        self.sweeps = sweeps
+        self.every = every
+        self.warmup_sweeps = max(every, int(sweeps * warmup))
+        self.frames = frames
+        self.clock = clock
+        self.warmup_t = None # Script time at the end of the warm-up
+        self.changes = None # Zone verdict changes after warm-up, from the session log
+        self.samples = []
+        self.first_snapshot = None
+        self.last_snapshot = None
+        self.started = time.perf_counter()
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            self.last_snapshot = tracemalloc.take_snapshot().filter_traces(EXCLUDE)
+            tracemalloc.stop()
+
+    def on_sweep(self, n):
+        if n == self.warmup_sweeps:
+            self.warmup_t = self.clock()
+            tracemalloc.start(self.frames)
+        if n % self.every == 0 or n >= self.sweeps:
+            self.sample(n)
+        if n == self.warmup_sweeps:
+            self.first_snapshot = tracemalloc.take_snapshot().filter_traces(EXCLUDE)
+        if n >= self.sweeps:
+            _post_quit()
+
+    def sample(self, n):
+        self.samples.append({"sweep": n, "wall_s": time.perf_counter() - self.started, "rss": rss_bytes(),
+                             "traced": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+                             "threads": threading.active_count(), "fds": open_fds(),
+                             "i2c_handles": tfluna.open_handles()})
+
+    def count_changes(self, session): # What the arbiter saw change: a zone's verdict differing from its last one
+        records, last, changes = session.records, {}, 0
+        for t, label, verdict in zip(records["t"].tolist(), records["label"].tolist(), records["verdict"].tolist()):
+            if verdict != last.get(label, verdict) and self.warmup_t is not None and t >= self.warmup_t:
+                changes += 1
+            last[label] = verdict
+        self.changes = changes
+        return changes
+
+    def steady(self):
+        return [s for s in self.samples if s["sweep"] >= self.warmup_sweeps]
+
+    def top_growth(self, limit=10):
+        if self.first_snapshot is None or self.last_snapshot is None:
+            return []
+        stats = self.last_snapshot.compare_to(self.first_snapshot, "traceback")
+        return [{"site": "\n".join(s.traceback.format()), "size_diff": s.size_diff, "count_diff": s.count_diff}
+                for s in stats[:limit] if s.size_diff > 0]
+
+    def verdict(self, budget, rss_budget, tolerance=2):
+        steady = self.steady()
+        checks = {}
+        if len(steady) < 3:
+            return {"ok": False, "error": "not enough samples after warm-up; raise --sweeps or lower --every"}
+        sweeps = [s["sweep"] for s in steady]
+        for metric, limit in (("traced", budget), ("rss", rss_budget)):
+            growth = slope(sweeps, [s[metric] or 0 for s in steady])
+            checks[metric] = {"bytes_per_sweep": growth, "limit": limit, "ok": growth <= limit}
+        quarter = max(1, len(steady) // 4)
+        for metric in ("threads", "fds", "i2c_handles"):
+            if steady[0][metric] is None:
+                continue
+            baseline = max(s[metric] for s in steady[:quarter])
+            final = max(s[metric] for s in steady[-quarter:])
+            checks[metric] = {"steady": baseline, "final": final, "ok": final <= baseline + tolerance}
+        if self.changes is not None:
+            checks["changes"] = {"count": self.changes, "ok": self.changes > 0}
+        return {"ok": all(c["ok"] for c in checks.values()), "checks": checks}
+
+
+def soak(script=DEFAULT_SCRIPT, sweeps=200, every=5, scene="all", seed=0, scene_every=5):
+    """Runs the soak in this process and returns the SoakMonitor."""
+    clock = VirtualClock(1000.0)
+    monitor = SoakMonitor(sweeps, every, clock=clock.monotonic)
+    scenes = [load_scene(name) for name in builtin_scenes()] if scene == "all" else [load_scene(scene)]
+    with tempfile.TemporaryDirectory() as tmp, \
+            restored_environ("HAPTIVISION_TELEMETRY", "HAPTIVISION_CONSOLE") as environ:
+        session = os.path.join(tmp, "soak.hvt")
+        environ["HAPTIVISION_TELEMETRY"] = session # Keep the writer thread in the loop
+        environ.setdefault("HAPTIVISION_CONSOLE", "0")
+        hardware = SimulatedHardware(scenes[0], seed=seed, clock=clock.monotonic, sleep=clock.sleep, max_events=100)
+        def next_scene(n): # The scenes are built once and reused, so moving between them allocates nothing
+            hardware.lidar.scene = scenes[n // scene_every % len(scenes)]
+        if len(scenes) > 1:
+            hardware.add_sweep_listener(next_scene)
+        hardware.add_sweep_listener(monitor.on_sweep)
+        try:
+            with hardware, clock.patch():
+                hardware.run_script(script)
+        finally:
+            monitor.stop()
+        if os.path.exists(session):
+            monitor.count_changes(SessionLog(session))
+    monitor.virtual_s = clock.monotonic() - 1000.0
+    return monitor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.bench.soak", description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="navigation script under test")
+    parser.add_argument("--sweeps", type=int, default=200, help="sweeps to run (virtual time)")
+    parser.add_argument("--every", type=int, default=5, help="sample resources every N sweeps")
+    parser.add_argument("--scene", default="all",
+                        help=f"built-in scene ({', '.join(builtin_scenes())}), a scene JSON file, or all of the "
+                             f"built-in ones in turn")
+    parser.add_argument("--scene-every", type=int, default=5, help="sweeps on each scene with --scene all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=2048,
+                        help="steady-state traced allocation growth allowed per sweep (bytes)")
+    parser.add_argument("--rss-budget", type=float, default=16384, help="RSS growth allowed per sweep (bytes)")
+    parser.add_argument("--json", metavar="PATH", help="write the samples and verdict here")
+    args = parser.parse_args(argv)
+
+    monitor = soak(args.script, args.sweeps, args.every, args.scene, args.seed, args.scene_every)
+    verdict = monitor.verdict(args.budget, args.rss_budget)
+    wall = time.perf_counter() - monitor.started
+    print(f"\n--- Soak: {len(monitor.samples) and monitor.samples[-1]['sweep']} sweeps, "
+          f"{monitor.virtual_s / 3600:.2f} h virtual in {wall:.0f} s ---", file=sys.stderr)
+    for metric, check in verdict.get("checks", {}).items():
+        if metric == "changes":
+            detail = f"{check['count']} verdict changes after warm-up"
+            print(f"  {metric:<12} {detail:<36} {'ok' if check['ok'] else 'NONE: pick a scene with hazards'}",
+                  file=sys.stderr)
+            continue
+        detail = (f"{check['bytes_per_sweep']:+.0f} B/sweep (limit {check['limit']:.0f})" if "bytes_per_sweep" in check
+                  else f"{check['steady']} -> {check['final']}")
+        print(f"  {metric:<12} {detail:<36} {'ok' if check['ok'] else 'GROWING'}", file=sys.stderr)
+    if "error" in verdict:
+        print(f"  {verdict['error']}", file=sys.stderr)
+    growth = monitor.top_growth()
+    if growth and not verdict["ok"]:
+        print("Top growing allocation sites:", file=sys.stderr)
+        for g in growth:
+            print(f"  {g['size_diff']:+8d} B {g['count_diff']:+6d} blocks", file=sys.stderr)
+            print("    " + g["site"].replace("\n", "\n    "), file=sys.stderr)
+
+    if args.json:
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"revision": revision(), "sweeps": args.sweeps, "virtual_s": monitor.virtual_s, "wall_s": wall,
+                       "verdict": verdict, "samples": monitor.samples, "top_growth": growth}, f, indent=2)
+    sys.exit(0 if verdict["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Local control channel of the resident navigation program.
+
+With ``HAPTIVISION_CONTROL`` set to a socket path the navigation script
+initializes everything once (pygame, pigpio, LiDAR, servo homing) and then
+waits in standby; ``Project_Start_Stop.py`` starts and stops the navigation
+over a Unix stream socket instead of launching a new interpreter per press.
+One line per connection, answered with one line:
+
+    resume [press_t]   start navigating (press_t: monotonic() of the button press)
+    pause              motors off, servos home, back to standby
+    toggle [press_t]   resume when in standby, pause otherwise
+    status             "active" or "standby", with the last start-up times
+    quit               leave the program
+
+    send("toggle %f" % monotonic())   # from any process on the Pi
+
+``StartupTimer`` measures from the press (``monotonic()`` is system wide on
+Linux, so the starter's clock and the script's agree) to the first zone
+verdict and the first motor command.
+"""
+import os
+import select
+import socket
+from time import monotonic
+
+DEFAULT_PATH = "/tmp/haptivision.sock"
+COMMANDS = ("resume", "pause", "toggle", "status", "quit")
+
+
+class StartupTimer:
+    def __init__(self, press_t=None, clock=monotonic):
+        self.clock = clock
+        self.press_t = None
+        self.first_verdict = None
+        self.first_command = None
+        if press_t is not None:
+            self.start(press_t)
+
+    def start(self, press_t=None):
+        self.press_t = self.clock() if press_t is None else press_t
+        self.first_verdict = self.first_command = None
+
+    def verdict(self): # True for the first zone verdict after the press
+        if self.first_verdict is None and self.press_t is not None:
+            self.first_verdict = self.clock() - self.press_t
+            return True
+        return False
+
+    def command(self): # True for the first motor command after the press
+        if self.first_command is None and self.press_t is not None:
+            self.first_command = self.clock() - self.press_t
+            return True
+        return False
+
+    def format_summary(self):
+        if self.press_t is None:
+            return "Start-up: no press recorded"
+        verdict = f"{self.first_verdict * 1000:.0f} ms" if self.first_verdict is not None else "-"
+        command = f"{self.first_command * 1000:.0f} ms" if self.first_command is not None else "none yet"
+        return f"Start-up: first zone verdict {verdict}, first motor command {command} after the press"
+
+
+class ControlServer:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if os.path.exists(path): # Left over from a run that did not close it
+            os.unlink(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(4)
+        self.state = "standby" # Reported by "status"; the script keeps it current
+
+    def pending(self): # True if a client is waiting, without blocking
+        return bool(select.select([self.sock], [], [], 0)[0])
+
+    def poll(self, timeout=0.0):
+        """[(command, argument or None), ...] received within ``timeout`` seconds; "status" is answered here."""
+        commands = []
+        while select.select([self.sock], [], [], timeout)[0]:
+            timeout = 0.0
+            conn, _ = self.sock.accept()
+            with conn:
+                conn.settimeout(1.0)
+                try:
+                    line = conn.makefile().readline().split()
+                except OSError:
+                    continue
+                command, arg = (line[0], line[1] if len(line) > 1 else None) if line else ("", None)
+                if command not in COMMANDS:
+                    reply = f"error unknown command {command!r}"
+                elif command == "status":
+                    reply = self.state
+                else:
+                    reply = "ok"
+                    commands.append((command, arg))
+                try:
+                    conn.sendall(reply.encode() + b"\n")
+                except OSError:
+                    pass
+        return commands
+
+    def close(self):
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def send(command, path=DEFAULT_PATH, timeout=2.0):
+    """Sends one command line and returns the reply (raises OSError if nothing listens on ``path``)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(command.encode() + b"\n")
+        return sock.makefile().readline().strip()
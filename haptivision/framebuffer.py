@@ -0,0 +1,153 @@
+"""Window output straight to a Linux framebuffer, for a Pi console without a desktop.
+
+The renderer draws into an offscreen surface (pygame's display is never
+initialized, only its fonts) and ``FramebufferOutput.write()`` copies the
+changed rects of it to ``/dev/fb0`` through a shared memory map.  The pixel
+format conversion (to the device's RGB565 or 32 bit layout, from the
+channel offsets the driver reports) is done with numpy; a 32 bit screen in
+the surface's own layout gets a plain copy.  With ``scale``
+below 1, or a screen smaller than the window, the frame is scaled down
+first and written at the reduced resolution:
+
+    output = FramebufferOutput("/dev/fb0")                            # geometry from the driver
+    output = FramebufferOutput("/tmp/fb.raw", size=(800, 480), bpp=16) # file stand-in, for tests
+    renderer = Renderer(zone_state, output=output).start()
+
+``HAPTIVISION_FRAMEBUFFER`` takes the same as ``FramebufferOutput.from_spec()``:
+``/dev/fb0`` or ``/tmp/fb.raw:800x480:16``.
+"""
+import fcntl
+import mmap
+import os
+import struct
+
+import numpy as np
+import pygame
+
+FBIOGET_VSCREENINFO = 0x4600
+VSCREENINFO_SIZE = 160 # struct fb_var_screeninfo
+# Bit offset and length of red, green and blue when the driver cannot be asked (a plain file)
+DEFAULT_LAYOUT = {16: ((11, 5), (5, 6), (0, 5)), 32: ((16, 8), (8, 8), (0, 8))} # RGB565, XRGB8888
+DTYPES = {16: np.uint16, 32: np.uint32}
+
+
+def screen_info(fd):
+    """(width, height, bits per pixel, ((red offset, length), (green ...), (blue ...))) of a framebuffer device."""
+    info = fcntl.ioctl(fd, FBIOGET_VSCREENINFO, bytes(VSCREENINFO_SIZE))
+    xres, yres, _, _, _, _, bpp, _ = struct.unpack_from("8I", info)
+    fields = struct.unpack_from("9I", info, 32) # red, green, blue: offset, length, msb_right
+    return xres, yres, bpp, tuple((fields[i], fields[i + 1]) for i in (0, 3, 6))
+
+
+def device_stride(path, width, bpp): # Bytes per line: the driver's, which can be more than width * bpp / 8
+    name = os.path.basename(os.path.realpath(path))
+    try:
+        with open(f"/sys/class/graphics/{name}/stride") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return width * bpp // 8
+
+
+class FramebufferOutput:
+    def __init__(self, path="/dev/fb0", size=None, bpp=None, scale=1.0):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | (os.O_CREAT if size else 0))
+        self.device = size is None # A real framebuffer: ask the driver for its geometry
+        if self.device:
+            try:
+                width, height, bpp, layout = screen_info(self.fd)
+            except OSError: # Not a framebuffer
+                os.close(self.fd)
+                raise
+            stride = device_stride(path, width, bpp)
+        else:
+            (width, height), bpp = size, bpp or 16
+            layout, stride = DEFAULT_LAYOUT.get(bpp), width * bpp // 8
+        if bpp not in DTYPES:
+            os.close(self.fd)
+            raise ValueError(f"{path}: {bpp} bits per pixel is not supported (16 or 32)")
+        if not self.device and os.fstat(self.fd).st_size < stride * height:
+            os.ftruncate(self.fd, stride * height)
+        self.size, self.bpp, self.stride, self.layout = (width, height), bpp, stride, layout
+        self.scale = scale
+        self.map = mmap.mmap(self.fd, stride * height, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        rows = np.frombuffer(self.map, np.uint8).reshape(height, stride)
+        self.pixels = rows[:, :width * bpp // 8].view(DTYPES[bpp]) # (height, width) of device pixels
+        self.frame = None # Scaled copy of the window, when it is written at a reduced resolution
+        self.factor = None
+        self.frames = 0
+        self._channels = None # How a surface pixel becomes a device pixel, from the first surface written
+        self._same = False # Surface pixels already in the device's format: copied without conversion
+
+    @classmethod
+    def from_spec(cls, spec, scale=1.0):
+        """``/dev/fb0`` (the driver's geometry) or ``PATH:WIDTHxHEIGHT[:BPP]`` (a file of that geometry)."""
+        path, _, rest = spec.partition(":")
+        if not rest:
+            return cls(path, scale=scale)
+        size, _, bpp = rest.partition(":")
+        width, height = (int(v) for v in size.lower().split("x"))
+        return cls(path, size=(width, height), bpp=int(bpp) if bpp else None, scale=scale)
+
+    def _target(self, surface): # The surface whose pixels go out: the window itself, or its scaled-down copy
+        if self.factor is None:
+            width, height = surface.get_size()
+            self.factor = min(self.scale, self.size[0] / width, self.size[1] / height, 1.0)
+            if self.factor < 1.0:
+                self.frame = pygame.Surface((int(width * self.factor), int(height * self.factor)), 0, surface)
+        if self.frame is None:
+            return surface
+        pygame.transform.smoothscale(surface, self.frame.get_size(), self.frame)
+        return self.frame
+
+    def _plan(self, surface): # Per channel (shift right, mask, shift left) from the surface's pixel to the device's
+        shifts = surface.get_shifts()[:3]
+        return [(shift + 8 - length, (1 << length) - 1, offset) for shift, (offset, length) in zip(shifts, self.layout)]
+
+    def _convert(self, pixels): # (height, width) surface pixels -> device pixels, in the scratch arrays
+        height, width = pixels.shape
+        out, channel = self._out[:height, :width], self._channel[:height, :width]
+        out.fill(0)
+        for right, mask, left in self._channels: # Each channel cut to its bit length, moved into place
+            np.right_shift(pixels, right, out=channel)
+            np.bitwise_and(channel, mask, out=channel)
+            np.left_shift(channel, left, out=channel)
+            np.bitwise_or(out, channel, out=out)
+        return out
+
+    def write(self, surface, dirty=None):
+        """Copies ``surface`` (the parts in ``dirty``, all of it if None) to the framebuffer."""
+        target = self._target(surface)
+        width, height = min(target.get_width(), self.size[0]), min(target.get_height(), self.size[1])
+        if dirty is None or target is not surface:
+            dirty = (pygame.Rect(0, 0, width, height),)
+        if self._channels is None:
+            self._channels = self._plan(target)
+            # The surface's own pixels already in the device's layout: a plain copy
+            self._same = self.bpp == 32 and target.get_bitsize() == 32 and \
+                all(right == left and mask == 0xFF for right, mask, left in self._channels)
+            if not self._same: # Scratch for the conversion, reused by every write
+                self._out, self._channel = np.empty((height, width), np.uint32), np.empty((height, width), np.uint32)
+        # (x, y) view of the surface, no copy; written rect by rect, a union would take in what did not change
+        pixels = pygame.surfarray.pixels2d(target)
+        for rect in dirty:
+            area = rect.clip(0, 0, width, height)
+            if not area.width or not area.height:
+                continue
+            block = pixels[area.left:area.right, area.top:area.bottom].swapaxes(0, 1)
+            np.copyto(self.pixels[area.top:area.bottom, area.left:area.right],
+                      block if self._same else self._convert(block), casting="unsafe")
+        del pixels # Unlocks the surface
+        self.frames += 1
+
+    def clear(self):
+        self.pixels.fill(0)
+
+    def close(self):
+        self.pixels = None
+        self.map.close()
+        os.close(self.fd)
+
+    def describe(self):
+        scale = f", frame scaled by {self.factor:.2f}" if self.factor is not None and self.factor < 1.0 else ""
+        return f"{self.path} {self.size[0]}x{self.size[1]} {self.bpp} bpp{scale}"
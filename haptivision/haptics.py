@@ -0,0 +1,160 @@
+"""Change-driven haptic arbitration over the zone -> motor map.
+
+``Arbiter`` compiles ``ZONE_MOTOR`` once into an index table (zone id ->
+motor index) and a tuple of zone ids per motor.  A zone update that does not
+change the zone's priority costs one comparison; a changed zone recomputes
+only its own motor's maximum, and a motor is commanded only when that
+maximum actually moves:
+
+    arbiter = Arbiter()
+    motor = arbiter.update(ZONE_IDS[label], priority)
+    if motor is not None:
+        play(motors[motor], arbiter.motor_priority[motor])
+
+Since a command is only sent on a transition, every pattern keeps running
+on its own until the next one (gpiozero's blink thread repeats it).  The
+counters show how much arbitration work each sweep did; in a static scene
+they drop to zero after the first sweep.
+
+``PwmMotors`` is the other output mode: the motors are gpiozero ``PWMLED``s
+on the pigpio pin factory, so pigpiod's DMA-timed PWM makes every pulse.
+Once per zone update ``pwm_setting()`` turns the motor's priority and its
+nearest return into a duty cycle (strength) and a PWM frequency (pulse
+rate), and only a changed setting is sent to the daemon.  The nearest
+return is taken only over the motor's zones at that priority, so a near
+GREEN floor zone does not set the strength of a far YELLOW warning.  The third mode,
+``patterns.WavePlayer``, plays the ``PATTERNS`` as pigpio waveforms.
+"""
+from .patterns import PATTERNS
+from .zones import GREEN_PRIORITY, GREY_PRIORITY, NEAR_CM, RED_PRIORITY, WARN_CM, YELLOW_PRIORITY, ZONE_IDS, \
+    ZONE_LABELS, ZONE_MOTOR, level_cm
+
+MOTORS = ("left", "center", "right")
+COUNTERS = ("zone_updates", "zone_changes", "recomputes", "commands")
+
+CARRIER_HZ = 800 # Smooth vibration: too fast for the motor to follow, so the duty cycle sets its strength
+PULSE_HZ = ((NEAR_CM // 4, 40), (NEAR_CM // 2, 20), (NEAR_CM, 10)) # RED pulse rate by nearest return (cm)
+DUTY_STEP = 1 / 16 # Duty cycles are rounded to this so sensor noise does not resend the same setting
+
+
+def play(device, priority): # Starts the pattern of a priority (see PATTERNS) on a gpiozero output device
+    pattern = PATTERNS.get(priority, PATTERNS[GREEN_PRIORITY])
+    (on_time, off_time), = pattern.pulses # blink() only repeats a single pulse; WavePlayer plays any pattern
+    if not off_time:
+        device.on()
+    elif not on_time:
+        device.off()
+    else:
+        device.blink(on_time=on_time, off_time=off_time, background=True)
+
+
+def pwm_setting(priority, nearest_cm):
+    """(duty cycle 0..1, PWM frequency Hz) of a motor, from its priority and nearest return (cm)."""
+    if priority == RED_PRIORITY: # Pulses that get faster and longer the closer the obstacle is
+        closeness = 1 - min(nearest_cm, NEAR_CM) / NEAR_CM
+        frequency = next((hz for limit, hz in PULSE_HZ if nearest_cm < limit), PULSE_HZ[-1][1])
+        return round((0.5 + 0.3 * closeness) / DUTY_STEP) * DUTY_STEP, frequency
+    if priority == GREY_PRIORITY: # Gap in the floor: full strength, continuous
+        return 1.0, CARRIER_HZ
+    if priority == YELLOW_PRIORITY: # Continuous, from 30% at WARN_CM up to full strength at 0 cm
+        closeness = 1 - min(nearest_cm, WARN_CM) / WARN_CM
+        return round((0.3 + 0.7 * closeness) / DUTY_STEP) * DUTY_STEP, CARRIER_HZ
+    return 0.0, CARRIER_HZ
+
+
+class PwmMotors:
+    """Hardware-timed PWM output: Python sets a strength and pulse rate, the pigpio daemon does the pulses."""
+
+    def __init__(self, devices, on_command=None):
+        self.devices = devices # gpiozero PWMLEDs on the pigpio pin factory, in the arbiter's motor order
+        self.on_command = on_command # Called with the motor index just before a new setting is sent
+        self.settings = [(0.0, device.frequency) for device in devices]
+        self.commands = 0
+
+    def update(self, motor, priority, level):
+        """Applies a motor's setting for its priority and proximity level; True if it changed."""
+        setting = pwm_setting(priority, level_cm(level))
+        current = self.settings[motor]
+        if setting == current:
+            return False
+        if self.on_command is not None:
+            self.on_command(motor)
+        device = self.devices[motor]
+        value, frequency = setting
+        if frequency != current[1]:
+            device.frequency = frequency
+        device.value = value
+        self.settings[motor] = setting
+        self.commands += 1
+        return True
+
+    def off(self):
+        for motor, device in enumerate(self.devices):
+            device.off()
+            self.settings[motor] = (0.0, self.settings[motor][1])
+
+
+class Arbiter:
+    def __init__(self, zone_motor_map=ZONE_MOTOR, motors=MOTORS, zones=len(ZONE_LABELS)):
+        self.motors = motors
+        motor_of_zone = [-1] * zones
+        for label, motor in zone_motor_map.items():
+            motor_of_zone[ZONE_IDS[label]] = motors.index(motor)
+        self.motor_of_zone = tuple(motor_of_zone) # Zone id -> motor index, -1 for zones no motor listens to
+        self.zones_of_motor = tuple(tuple(z for z, m in enumerate(motor_of_zone) if m == motor)
+                                    for motor in range(len(motors)))
+        self.zone_priority = [GREEN_PRIORITY] * zones
+        self.motor_priority = [GREEN_PRIORITY] * len(motors)
+        self.totals = dict.fromkeys(COUNTERS, 0)
+        self.last_sweep = dict.fromkeys(COUNTERS, 0)
+        self.sweeps = 0
+        self._mark = dict(self.totals)
+
+    def update(self, zone, priority):
+        """Records a zone verdict; returns the index of the motor to command, or None."""
+        totals = self.totals
+        totals["zone_updates"] += 1
+        if self.zone_priority[zone] == priority:
+            return None
+        self.zone_priority[zone] = priority
+        totals["zone_changes"] += 1
+        motor = self.motor_of_zone[zone]
+        if motor < 0:
+            return None
+        totals["recomputes"] += 1
+        zone_priority = self.zone_priority
+        current = max([zone_priority[z] for z in self.zones_of_motor[motor]])
+        if current == self.motor_priority[motor]:
+            return None
+        self.motor_priority[motor] = current
+        totals["commands"] += 1
+        return motor
+
+    def reset(self): # Every zone and motor back to GREEN, e.g. after the motors were stopped
+        self.zone_priority[:] = [GREEN_PRIORITY] * len(self.zone_priority)
+        self.motor_priority[:] = [GREEN_PRIORITY] * len(self.motor_priority)
+
+    def priorities(self): # (left, center, right) with the default motor order
+        return tuple(self.motor_priority)
+
+    def motor_of(self, zone): # Motor index of a zone id, -1 if it has none
+        return self.motor_of_zone[zone]
+
+    def motor_level(self, motor, levels): # Highest proximity level among the motor's zones at its current priority
+        priority, zone_priority = self.motor_priority[motor], self.zone_priority
+        return max([levels.item(zone) for zone in self.zones_of_motor[motor] if zone_priority[zone] == priority],
+                   default=0)
+
+    def sweep(self): # Closes the per-sweep counters
+        self.sweeps += 1
+        for name in COUNTERS:
+            self.last_sweep[name] = self.totals[name] - self._mark[name]
+            self._mark[name] = self.totals[name]
+
+    def format_summary(self):
+        totals = self.totals
+        per_sweep = " / ".join(f"{totals[name] / self.sweeps:.1f}" for name in COUNTERS) if self.sweeps else "-"
+        last = " / ".join(str(self.last_sweep[name]) for name in COUNTERS)
+        return (f"Haptic arbitration: {totals['zone_updates']} zone updates, {totals['zone_changes']} changes, "
+                f"{totals['recomputes']} motor recomputes, {totals['commands']} motor commands "
+                f"[per sweep {per_sweep}, last sweep {last}]")
@@ -0,0 +1,167 @@
+"""Hazard-to-vibration latency tracking.
+
+Every LiDAR sample, zone classification and motor transition gets a
+monotonic timestamp and a sequence id.  A hazard episode opens when a motor's
+priority rises to ``alert_priority`` (RED by default); its start is the first
+sample in the zone that satisfied the hazard test.  The episode closes on the
+first time the motor pin is actually driven high after the matching motor
+command, which includes the wait for the rest of the zone, the priority logic
+and gpiozero's blink thread start-up.
+
+    latency = LatencyTracker()
+    latency.watch_output(Motor_Left, "left")
+    ...
+    dist = lidar.read()
+    latency.classified(label, "left", priority, dist, lidar.times, HAZARD_TESTS.get(priority))
+"""
+import json
+import logging
+import threading
+from collections import deque
+from time import monotonic
+
+log = logging.getLogger("haptivision.latency")
+
+# onset -> last sample of the zone, -> verdict (includes the settle sleep after the read), -> motor command, -> pin high
+STAGES = ("wait", "classify", "arbitrate", "actuate")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return float("nan")
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+class LatencyTracker:
+    def __init__(self, alert_priority=3, window=1000, report_interval=10.0, log_path=None, clock=monotonic):
+        self.alert_priority = alert_priority
+        self.report_interval = report_interval
+        self.clock = clock
+        self.seq = 0
+        self.latencies = deque(maxlen=window)
+        self.stages = {stage: deque(maxlen=window) for stage in STAGES}
+        self.episodes = 0
+        self.zone_priority = {}
+        self.motor_priority = {}
+        self._pending = {} # motor -> open episode
+        self._motor_level = {}
+        self._lock = threading.Lock()
+        self._last_report = clock()
+        self._log_file = open(log_path, "a", buffering=1) if log_path else None
+
+    def _next_seq(self, n=1):
+        first = self.seq
+        self.seq += n
+        return first
+
+    def classified(self, label, motor, priority, dist, times, hazard_test=None):
+        """Zone verdict; opens an episode when the motor's priority rises to the alert level."""
+        now = self.clock()
+        with self._lock:
+            first_seq = self._next_seq(len(dist)) # One seq id per sample of the zone, then one for the verdict
+            result_seq = self._next_seq()
+            self.zone_priority[label] = (motor, priority)
+            previous = self.motor_priority.get(motor, 0)
+            current = max(p for m, p in self.zone_priority.values() if m == motor)
+            self.motor_priority[motor] = current
+            if priority < self.alert_priority or previous >= self.alert_priority or motor in self._pending:
+                return
+            onset = next((i for i, v in enumerate(dist) if hazard_test(v)), 0) if hazard_test else 0
+            self._pending[motor] = {
+                "zone": label, "priority": priority,
+                "onset_seq": first_seq + onset, "onset_t": times[onset] if len(times) else now,
+                "read_t": times[-1] if len(times) else now,
+                "result_seq": result_seq, "classified_t": now,
+                "command_t": None,
+            }
+
+    def reset(self): # Forgets priorities and open episodes, e.g. while navigation is paused
+        with self._lock:
+            self.zone_priority.clear()
+            self.motor_priority.clear()
+            self._pending.clear()
+            self._motor_level.clear()
+
+    def commanded(self, motor):
+        now = self.clock()
+        with self._lock:
+            episode = self._pending.get(motor)
+            if episode is not None and episode["command_t"] is None:
+                episode["command_t"] = now
+                episode["command_seq"] = self._next_seq()
+
+    def actuated(self, motor, level):
+        now = self.clock()
+        with self._lock:
+            previous = self._motor_level.get(motor, False)
+            self._motor_level[motor] = level
+            episode = self._pending.get(motor)
+            if not level or previous or episode is None or episode["command_t"] is None:
+                return
+            del self._pending[motor]
+            episode["motor"] = motor
+            episode["actuated_t"] = now
+            episode["actuated_seq"] = self._next_seq()
+            episode["latency"] = now - episode["onset_t"]
+            self.latencies.append(episode["latency"])
+            steps = (episode["onset_t"], episode["read_t"], episode["classified_t"], episode["command_t"], now)
+            for stage, start, end in zip(STAGES, steps, steps[1:]):
+                self.stages[stage].append(end - start)
+            self.episodes += 1
+        log.debug("hazard %s zone %s: %.1f ms", motor, episode["zone"], episode["latency"] * 1000)
+        if self._log_file:
+            self._log_file.write(json.dumps({"event": "episode", **episode}) + "\n")
+
+    def watch_output(self, device, motor):
+        """Hooks a gpiozero output device so its commands and real pin writes are timed.
+
+        Wraps ``blink``/``on``/``off`` (the motor command) and ``_write``, which
+        gpiozero calls from the blink thread when the pin actually changes.
+        """
+        write = device._write
+
+        def _write(value):
+            write(value)
+            self.actuated(motor, bool(value))
+
+        def command(method):
+            def wrapper(*args, **kwargs):
+                self.commanded(motor)
+                return method(*args, **kwargs)
+            return wrapper
+
+        device._write = _write
+        for name in ("blink", "on", "off"):
+            setattr(device, name, command(getattr(device, name)))
+        return device
+
+    def summary(self):
+        values = sorted(self.latencies)
+        result = {"episodes": self.episodes, "samples": self.seq,
+                  "p50_ms": percentile(values, 50) * 1000, "p90_ms": percentile(values, 90) * 1000,
+                  "p99_ms": percentile(values, 99) * 1000, "max_ms": (values[-1] if values else float("nan")) * 1000}
+        for stage in STAGES:
+            result[f"{stage}_p50_ms"] = percentile(sorted(self.stages[stage]), 50) * 1000
+        return result
+
+    def format_summary(self):
+        s = self.summary()
+        return (f"Hazard->vibration latency ({s['episodes']} episodes): p50 {s['p50_ms']:.0f} ms, "
+                f"p90 {s['p90_ms']:.0f} ms, p99 {s['p99_ms']:.0f} ms, max {s['max_ms']:.0f} ms "
+                f"[wait {s['wait_p50_ms']:.0f} / classify {s['classify_p50_ms']:.1f} / "
+                f"arbitrate {s['arbitrate_p50_ms']:.1f} / actuate {s['actuate_p50_ms']:.1f} ms]")
+
+    def maybe_report(self): # Call once per zone; logs the percentiles every report_interval seconds
+        now = self.clock()
+        if now - self._last_report < self.report_interval or not self.latencies:
+            return
+        self._last_report = now
+        log.info(self.format_summary())
+        if self._log_file:
+            self._log_file.write(json.dumps({"event": "summary", "t": now, **self.summary()}) + "\n")
+
+    def close(self):
+        if self._log_file:
+            self._log_file.close()
+            self._log_file = None
@@ -0,0 +1,104 @@
+"""TF-Luna zone reads over I2C into preallocated buffers.
+
+``LidarReader`` replaces the per-zone ``read_lidar_points`` of the scripts:
+the two ``i2c_msg`` objects, the bus handle and the sample arrays are made
+once, and every zone overwrites them in place::
+
+    lidar = LidarReader(0x10, count=20, clock=monotonic, sleep=sleep)
+    dist = lidar.read()            # lidar.distances, int32[count] (cm)
+    lidar.times, lidar.strengths   # float64[count], int32[count]
+
+The arrays are reused by the next ``read()``, so anything that keeps samples
+past the zone (the telemetry writer does) has to copy them.  With the real
+smbus2 the I2C_RDWR ioctl argument is built once too, and the reply bytes
+are read through a ctypes view of the message buffer instead of ``list(read)``.
+"""
+import ctypes
+import time
+
+import numpy as np
+
+READ_FRAME_CMD = (1, 2, 7) # Benewake "obtain data frame" command, answered with 7 bytes
+
+
+def _byte_view(msg): # Indexable view of a message's bytes that yields ints without copying them
+    buf = msg.buf
+    if isinstance(buf, (bytearray, memoryview)):
+        return buf
+    return ctypes.cast(buf, ctypes.POINTER(ctypes.c_uint8))
+
+
+class LidarReader:
+    def __init__(self, address, count=20, bus=1, pause=0.008, retry_pause=0.01, max_retries=3,
+                 clock=time.monotonic, sleep=time.sleep):
+        from smbus2 import SMBus, i2c_msg
+        self.address = address
+        self.count = count
+        self.bus_number = bus
+        self.pause = pause # Give sensor a small break between samples
+        self.retry_pause = retry_pause
+        self.max_retries = max_retries
+        self.clock = clock
+        self.sleep = sleep
+        self.failures = 0 # Zones that fell back to zeros after every retry failed
+        self.distances = np.zeros(count, np.int32)
+        self.strengths = np.zeros(count, np.int32)
+        self.times = np.zeros(count)
+        self._SMBus = SMBus
+        self._bus = None
+        self._write = i2c_msg.write(address, list(READ_FRAME_CMD))
+        self._read = i2c_msg.read(address, 7)
+        self._frame = _byte_view(self._read)
+        self._ioctl = None
+        try: # Prebuilt I2C_RDWR argument for the real smbus2 (its i2c_rdwr() builds one per call)
+            from fcntl import ioctl
+            from smbus2.smbus2 import I2C_RDWR, i2c_rdwr_ioctl_data
+            self._ioctl = (ioctl, I2C_RDWR, i2c_rdwr_ioctl_data.create(self._write, self._read))
+        except ImportError:
+            pass
+
+    def _open(self):
+        if self._bus is None:
+            self._bus = self._SMBus(self.bus_number)
+        return self._bus
+
+    def close(self):
+        if self._bus is not None:
+            self._bus.close()
+            self._bus = None
+
+    def _transfer(self, bus):
+        if self._ioctl is not None and getattr(bus, "fd", None) is not None:
+            ioctl, request, data = self._ioctl
+            ioctl(bus.fd, request, data)
+        else:
+            bus.i2c_rdwr(self._write, self._read)
+
+    def read(self):
+        """Reads one zone of samples into the buffers and returns ``distances``.
+
+        An I2C error closes the bus and starts the zone over; after
+        ``max_retries`` failures the buffers are zeroed (a zero distance is
+        treated as no return).
+        """
+        frame, dist, strengths, times = self._frame, self.distances, self.strengths, self.times
+        for attempt in range(self.max_retries):
+            try:
+                bus = self._open()
+                for i in range(self.count):
+                    self._transfer(bus)
+                    times[i] = self.clock() # Timestamp of each sample for the latency tracking
+                    dist[i] = (frame[3] << 8) | frame[2]
+                    strengths[i] = (frame[5] << 8) | frame[4]
+                    self.sleep(self.pause)
+                return dist
+            except OSError as e:
+                print(f"[Retry {attempt+1}/{self.max_retries}] I2C Error: {e}")
+                self.close() # Reopen the bus on the next attempt
+                self.sleep(self.retry_pause)
+        print("LiDAR read failed after retries. Returning fallback values.")
+        self.failures += 1
+        dist.fill(0)
+        strengths.fill(0)
+        times.fill(self.clock())
+        return dist
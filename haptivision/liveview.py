@@ -0,0 +1,242 @@
+"""Live view of the zone state on another machine: the wearable publishes, a viewer draws.
+
+The navigation loop hands the ``ZoneStore`` to ``LiveViewPublisher.publish()``
+after every zone update.  At most ``rate`` times a second that sends one UDP
+datagram with the zones whose ``seq`` moved since the last one (delta
+encoded: each zone's samples as int16 differences from what was last sent
+for it), zlib compressed.  Every ``keyframe`` seconds the datagram carries
+every zone written so far in full instead, so a viewer that joins late or
+lost a datagram catches up.  Nothing is drawn on the wearable, and a send
+that fails (no viewer, no network) is only counted:
+
+    HAPTIVISION_DISPLAY=0 HAPTIVISION_LIVEVIEW=192.168.1.20:5600 python3 Pygame_Servo_Working_V10_6.py
+
+The viewer fills a ``ZoneStore`` of its own from the datagrams and draws it
+with the same ``Renderer`` (V10_6 layout) as the wearable's window:
+
+    python -m haptivision.liveview --listen 0.0.0.0:5600 [--fps 15] [--heatmap 3]
+
+A datagram is a header and one record per zone, all little-endian::
+
+    magic     4s      b"HVLV"
+    version   u1
+    flags     u1      1: keyframe, the samples are absolute
+    samples   u2      samples per zone
+    packet    u4      datagram sequence number
+    t         f8      monotonic time of the wearable when sent (s)
+    zones     u1      number of records
+    -- zlib compressed records --
+    zone      u1      zone id (ZONE_IDS)
+    priority  u1      zone verdict: GREEN 0, YELLOW 1, GREY 2, RED 3
+    cm        i2[N]   distances (cm), minus the zone's previous ones unless a keyframe
+    levels    u1[N]   per-sample priorities
+"""
+import argparse
+import select
+import socket
+import struct
+import time
+import zlib
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+from .latency import percentile
+from .zones import nearest_return
+
+MAGIC = b"HVLV"
+VERSION = 1
+KEYFRAME = 1
+HEADER = struct.Struct("<4sBBHIdB") # magic, version, flags, samples per zone, packet, wearable time, records
+DEFAULT_PORT = 5600
+MAX_DATAGRAM = 60000 # Below UDP's 65507; more changed zones than fit go out as several datagrams
+
+
+def record_dtype(samples):
+    return np.dtype([("zone", "u1"), ("priority", "u1"), ("cm", "<i2", (samples,)), ("levels", "u1", (samples,))])
+
+
+def parse_address(address, host=""):
+    """("host", port) of "host:port", ":port" or "port"."""
+    name, _, port = address.rpartition(":")
+    return name or host, int(port) if port else DEFAULT_PORT
+
+
+class LiveViewPublisher:
+    def __init__(self, address, samples=20, zones=12, rate=15.0, keyframe=1.0, clock=time.monotonic, window=1000):
+        self.address = parse_address(address, "127.0.0.1") if isinstance(address, str) else address
+        self.samples = samples
+        self.interval = 1.0 / rate
+        self.keyframe = keyframe
+        self.clock = clock
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False) # A full socket buffer drops the datagram, never waits
+        self._records = np.zeros(zones, record_dtype(samples))
+        self._sent_cm = np.zeros((zones, samples), np.int32) # What the viewer has of every zone
+        self._sent_seq = np.zeros(zones, np.uint8)
+        self._known = np.zeros(zones, bool) # Zones sent at least once
+        self._per_datagram = max(1, (MAX_DATAGRAM - HEADER.size) // self._records.itemsize)
+        self._next_t = 0.0
+        self._keyframe_t = 0.0
+        self.packet = 0
+        self.updates = self.datagrams = self.keyframes = self.bytes = self.errors = 0
+        self.total_s = 0.0
+        self.send_times = deque(maxlen=window) # Seconds of the publish() calls that sent something
+
+    def publish(self, store):
+        """Sends the zones that changed since the last datagram, if one is due; False if nothing was sent."""
+        start = perf_counter()
+        self.updates += 1
+        now = self.clock()
+        if now < self._next_t:
+            self.total_s += perf_counter() - start
+            return False
+        self._next_t = now + self.interval
+        keyframe = now >= self._keyframe_t
+        changed = store.seq != self._sent_seq
+        zones = np.flatnonzero(changed | self._known if keyframe else changed)
+        if not zones.size:
+            self.total_s += perf_counter() - start
+            return False
+        cm = store.samples_cm[zones]
+        records = self._records[:zones.size]
+        records["zone"] = zones
+        records["priority"] = store.priority[zones]
+        records["cm"] = cm if keyframe else cm - self._sent_cm[zones]
+        records["levels"] = store.samples_priority[zones]
+        self._sent_cm[zones] = cm
+        self._sent_seq[zones] = store.seq[zones]
+        self._known[zones] = True
+        if keyframe:
+            self._keyframe_t = now + self.keyframe
+            self.keyframes += 1
+        for first in range(0, zones.size, self._per_datagram):
+            part = records[first:first + self._per_datagram]
+            self._send(HEADER.pack(MAGIC, VERSION, KEYFRAME if keyframe else 0, self.samples, self.packet, now,
+                                   part.size) + zlib.compress(part.tobytes(), 1))
+        elapsed = perf_counter() - start
+        self.total_s += elapsed
+        self.send_times.append(elapsed)
+        return True
+
+    def _send(self, datagram):
+        self.packet = (self.packet + 1) & 0xFFFFFFFF
+        try:
+            self.sock.sendto(datagram, self.address)
+        except OSError: # No viewer listening (ICMP refusal), network down or buffer full
+            self.errors += 1
+            return
+        self.datagrams += 1
+        self.bytes += len(datagram)
+
+    def close(self):
+        self.sock.close()
+
+    def format_summary(self):
+        values = sorted(self.send_times)
+        per_update = self.total_s / self.updates * 1e6 if self.updates else 0.0
+        return (f"Live view to {self.address[0]}:{self.address[1]}: {self.datagrams} datagrams "
+                f"({self.keyframes} keyframes, {self.bytes / 1024:.0f} KB, {self.errors} failed sends); "
+                f"{per_update:.0f} us per zone update, sending p50 {percentile(values, 50) * 1e6:.0f} us, "
+                f"max {(values[-1] if values else float('nan')) * 1e6:.0f} us")
+
+
+class LiveViewReceiver:
+    """Applies datagrams to a ``ZoneStore``; deltas only on top of the datagram right before them."""
+
+    def __init__(self, store):
+        self.store = store
+        self.samples = store.samples_cm.shape[1]
+        self._dtype = record_dtype(self.samples)
+        self._cm = np.zeros(store.samples_cm.shape, np.int32)
+        self._last = None # Sequence number of the last datagram applied; None: waiting for a keyframe
+        self.received = self.applied = self.lost = self.rejected = 0
+
+    def apply(self, datagram):
+        """Writes the zones of one datagram into the store; False if it was rejected or skipped."""
+        self.received += 1
+        if len(datagram) < HEADER.size:
+            self.rejected += 1
+            return False
+        magic, version, flags, samples, packet, _, count = HEADER.unpack_from(datagram)
+        if magic != MAGIC or version != VERSION or samples != self.samples:
+            self.rejected += 1
+            return False
+        keyframe = flags & KEYFRAME
+        if not keyframe and self._last is None:
+            return False
+        if not keyframe and packet != (self._last + 1) & 0xFFFFFFFF: # Missed one: the deltas no longer add up
+            self.lost += 1
+            self._last = None
+            return False
+        try:
+            records = np.frombuffer(zlib.decompress(datagram[HEADER.size:]), self._dtype, count)
+        except (zlib.error, ValueError):
+            self.rejected += 1
+            return False
+        self._last = packet
+        for zone, priority, cm, levels in zip(records["zone"].tolist(), records["priority"].tolist(),
+                                              records["cm"], records["levels"]):
+            dist = self._cm[zone]
+            if keyframe:
+                np.copyto(dist, cm)
+            else:
+                dist += cm
+            self.store.update(zone, priority, nearest_return(dist), dist, levels)
+        self.applied += 1
+        return True
+
+    def format_summary(self):
+        return (f"Live view: {self.received} datagrams received, {self.applied} applied, {self.lost} gaps "
+                f"(skipped to the next keyframe), {self.rejected} rejected")
+
+
+def view(listen, fps=15.0, heatmap=0.0, framebuffer=None):
+    """Receives on ``listen`` and draws until the window is closed or Ctrl-C."""
+    from .render import Renderer
+    from .state import ZoneStore
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(parse_address(listen))
+    print(f"Live view: waiting for the wearable on {sock.getsockname()[0]}:{sock.getsockname()[1]}")
+    receiver = renderer = None
+    try:
+        while renderer is None or not renderer.quit:
+            if not select.select([sock], [], [], 0.1)[0]:
+                continue
+            datagram = sock.recv(65536)
+            if receiver is None: # The first datagram tells how many samples a zone has
+                if len(datagram) < HEADER.size or datagram[:4] != MAGIC:
+                    continue
+                samples = HEADER.unpack_from(datagram)[3]
+                receiver = LiveViewReceiver(ZoneStore(samples=samples))
+                output = None
+                if framebuffer:
+                    from .framebuffer import FramebufferOutput
+                    output = FramebufferOutput.from_spec(framebuffer)
+                renderer = Renderer(receiver.store, fps=fps, heatmap=heatmap, output=output).start()
+            receiver.apply(datagram)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+        if renderer is not None:
+            print(receiver.format_summary())
+            try:
+                renderer.close()
+            finally:
+                print(renderer.format_summary())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.liveview", description=__doc__.splitlines()[0])
+    parser.add_argument("--listen", default=f"0.0.0.0:{DEFAULT_PORT}", help="host:port to receive on")
+    parser.add_argument("--fps", type=float, default=15.0, help="window frame rate")
+    parser.add_argument("--heatmap", type=float, default=0.0, help="half-life (s) of the heatmap of past returns")
+    parser.add_argument("--framebuffer", help="draw on this framebuffer instead of a window (see haptivision.framebuffer)")
+    args = parser.parse_args(argv)
+    view(args.listen, args.fps, args.heatmap, args.framebuffer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Declarative haptic patterns, compiled to pigpio waveforms.
+
+A ``Pattern`` is a pulse train (``(on_s, off_s)`` pairs) repeated
+``repeat`` times and followed by ``gap`` seconds of silence; that whole cycle
+loops until another pattern replaces it.  ``PATTERNS`` holds the one played
+for each zone priority, the same timings ``play()`` hands to gpiozero's
+``blink()``.
+
+pigpiod transmits one waveform at a time for all pins, so ``WavePlayer``
+compiles each combination of motor patterns (three motors, four priorities:
+64 waveforms, a few hundred pulses in all) once, over the least common
+multiple of their cycles.  Switching pattern is then one ``wave_send`` and
+the DMA engine keeps the timing, with no Python thread polling the pins:
+
+    waves = WavePlayer(factory.connection, (5, 13, 6))
+    waves.prepare()                       # compile everything up front
+    waves.play(arbiter.motor_priority)    # on every motor transition
+
+A motor whose priority rose switches at once; otherwise the new waveform
+takes over at the end of the current cycle, so a pattern that winds down is
+never cut mid-pulse.
+"""
+import itertools
+from collections import namedtuple
+from math import gcd
+from time import perf_counter
+
+from .zones import GREEN_PRIORITY, GREY_PRIORITY, RED_PRIORITY, YELLOW_PRIORITY
+
+Pattern = namedtuple("Pattern", "name priority pulses repeat gap", defaults=(1, 0.0))
+
+PATTERNS = {pattern.priority: pattern for pattern in (
+    Pattern("off", GREEN_PRIORITY, ((0.0, 1.0),)), # Stop Vibrations For Green Zones and To Handle Unknown Conditions
+    Pattern("slow", YELLOW_PRIORITY, ((0.2, 0.8),)), # Slow Vibration
+    Pattern("continuous", GREY_PRIORITY, ((1.0, 0.0),)), # Keep on Vibrating Continuosly
+    Pattern("rapid", RED_PRIORITY, ((0.05, 0.05),)), # Rapid Vibration
+)}
+
+MAX_PULSES = 2000 # Per waveform; pigpiod's default budget is 12000 pulses for all waveforms together
+WAVE_MODE_REPEAT, WAVE_MODE_REPEAT_SYNC = 1, 3 # pigpio.WAVE_MODE_*
+
+
+def pattern_edges(pattern):
+    """([(t_us, level), ...], cycle_us) of one cycle of a pattern; the first edge is at 0."""
+    edges, t = [], 0
+    segments = [(on, off) for _ in range(pattern.repeat) for on, off in pattern.pulses] + [(0.0, pattern.gap)]
+    for on, off in segments:
+        for level, length in ((1, round(on * 1e6)), (0, round(off * 1e6))):
+            if length <= 0:
+                continue
+            if not edges or edges[-1][1] != level:
+                edges.append((t, level))
+            t += length
+    if not edges:
+        raise ValueError(f"pattern {pattern.name!r} has no duration")
+    return edges, t
+
+
+def compile_pulses(pins, patterns):
+    """pigpio pulses ``[(gpio_on, gpio_off, delay_us), ...]`` playing ``patterns[i]`` on ``pins[i]``.
+
+    Covers the least common multiple of the cycles, so the waveform can
+    repeat as it is.
+    """
+    cycles = [pattern_edges(pattern) for pattern in patterns]
+    period = 1
+    for _, cycle in cycles:
+        period = period * cycle // gcd(period, cycle)
+    changes = {} # t_us -> [on mask, off mask]
+    for pin, (edges, cycle) in zip(pins, cycles):
+        if period // cycle * len(edges) > MAX_PULSES:
+            raise ValueError(f"patterns {[p.name for p in patterns]} need over {MAX_PULSES} pulses")
+        for start in range(0, period, cycle):
+            for t, level in edges:
+                changes.setdefault(start + t, [0, 0])[0 if level else 1] |= 1 << pin
+    times = sorted(changes)
+    if len(times) > MAX_PULSES:
+        raise ValueError(f"patterns {[p.name for p in patterns]} need over {MAX_PULSES} pulses")
+    return [(on, off, end - t) for t, end, (on, off) in
+            zip(times, times[1:] + [period], (changes[t] for t in times))]
+
+
+class WavePlayer:
+    """Plays one pattern per motor as a repeating pigpio waveform."""
+
+    def __init__(self, pi, pins, patterns=PATTERNS, on_command=None, on_actuate=None):
+        self.pi = pi # pigpio.pi, e.g. PiGPIOFactory().connection
+        self.pins = tuple(pins) # In the arbiter's motor order
+        self.patterns = patterns
+        self.on_command = on_command # Called with the motor index before its new pattern is sent
+        self.on_actuate = on_actuate # Called with the motor index and its first level once the wave is sent
+        self.waves = {} # Tuple of motor priorities -> pigpio wave id
+        self.current = (GREEN_PRIORITY,) * len(self.pins)
+        self.playing = None
+        self.commands = 0
+        self.compile_s = 0.0
+
+    def pattern(self, priority):
+        return self.patterns.get(priority, self.patterns[GREEN_PRIORITY])
+
+    def wave(self, priorities):
+        """Wave id of a combination of motor priorities, compiled on first use."""
+        wave_id = self.waves.get(priorities)
+        if wave_id is None:
+            import pigpio
+            start = perf_counter()
+            pulses = compile_pulses(self.pins, [self.pattern(p) for p in priorities])
+            self.pi.wave_add_new()
+            self.pi.wave_add_generic([pigpio.pulse(on, off, delay) for on, off, delay in pulses])
+            wave_id = self.waves[priorities] = self.pi.wave_create()
+            self.compile_s += perf_counter() - start
+        return wave_id
+
+    def prepare(self):
+        """Compiles every combination of the patterns' priorities; returns how many waveforms there are."""
+        for priorities in itertools.product(sorted(self.patterns), repeat=len(self.pins)):
+            self.wave(priorities)
+        return len(self.waves)
+
+    def play(self, priorities):
+        """Sends the waveform for these motor priorities; False if it is already playing."""
+        priorities = tuple(priorities)
+        previous = self.current
+        if priorities == previous:
+            return False
+        changed = [m for m, (old, new) in enumerate(zip(previous, priorities)) if old != new]
+        if self.on_command is not None:
+            for motor in changed:
+                self.on_command(motor)
+        wave_id = self.wave(priorities)
+        escalation = any(priorities[m] > previous[m] for m in changed)
+        self.pi.wave_send_using_mode(wave_id, WAVE_MODE_REPEAT if escalation or self.playing is None
+                                     else WAVE_MODE_REPEAT_SYNC)
+        self.current = priorities
+        self.playing = wave_id
+        self.commands += 1
+        if self.on_actuate is not None:
+            for motor in changed:
+                self.on_actuate(motor, pattern_edges(self.pattern(priorities[motor]))[0][0][1] == 1)
+        return True
+
+    def off(self):
+        self.pi.wave_tx_stop()
+        for pin in self.pins:
+            self.pi.write(pin, 0)
+        self.current = (GREEN_PRIORITY,) * len(self.pins)
+        self.playing = None
+
+    def close(self): # Stops the motors and frees the waveforms
+        self.off()
+        for wave_id in self.waves.values():
+            self.pi.wave_delete(wave_id)
+        self.waves.clear()
@@ -0,0 +1,182 @@
+"""Per-stage timing for the navigation loop.
+
+Stages are timed lap-style so the loop body does not need re-indenting:
+``mark()`` starts a lap and ``lap(name)`` records the time since the last
+mark/lap into that stage's histogram.  ``span(name)`` is the same thing as a
+context manager for code that is not a straight sequence.
+
+    profiler = Profiler(enabled=True)
+    profiler.mark()
+    dist = read_lidar_points(write, read)
+    profiler.lap("acquisition")
+    ...
+    profiler.sweep()
+    profiler.maybe_report()
+
+Histograms are preallocated HDR-style (log buckets with 64 linear
+sub-buckets each, under 1.6 % error), so recording is an index computation
+and an increment.  A disabled profiler swaps every hook for a no-op.
+"""
+import logging
+from time import perf_counter_ns
+
+log = logging.getLogger("haptivision.profile")
+
+SUB_BUCKETS = 64 # Linear sub-buckets per power of two
+MAX_SHIFT = 34 # Covers up to ~2**41 ns (about 36 minutes)
+BUCKETS = 2 * SUB_BUCKETS + MAX_SHIFT * SUB_BUCKETS
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def index(value):
+        if value < 2 * SUB_BUCKETS:
+            return value if value > 0 else 0
+        shift = min(value.bit_length() - 7, MAX_SHIFT) # Keeps the top 7 bits: 64..127
+        return 2 * SUB_BUCKETS + (shift - 1) * SUB_BUCKETS + min((value >> shift), 2 * SUB_BUCKETS - 1) - SUB_BUCKETS
+
+    @staticmethod
+    def value_at(index): # Midpoint of a bucket
+        if index < 2 * SUB_BUCKETS:
+            return index
+        shift = (index - 2 * SUB_BUCKETS) // SUB_BUCKETS + 1
+        sub = (index - 2 * SUB_BUCKETS) % SUB_BUCKETS + SUB_BUCKETS
+        return (sub << shift) + (1 << (shift - 1))
+
+    def record(self, value):
+        self.counts[self.index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * p / 100.0 + 0.5))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self.value_at(i), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def reset(self):
+        self.counts[:] = [0] * BUCKETS
+        self.count = self.total = self.max = 0
+
+
+class _Span:
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist):
+        self.hist = hist
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.record(perf_counter_ns() - self.start)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+def _noop(*args):
+    pass
+
+
+class Profiler:
+    def __init__(self, enabled=True, report_interval=30.0, stages=()):
+        self.enabled = enabled
+        self.report_interval = report_interval
+        self.histograms = {}
+        self._spans = {}
+        self.sweeps = 0
+        self._last = 0
+        self._window_start = perf_counter_ns()
+        self._window_sweeps = 0
+        self._last_report = self._window_start
+        for name in stages: # Preallocate so the first laps do not build histograms
+            self.histogram(name)
+        if not enabled:
+            self.mark = self.lap = self.sweep = self.maybe_report = _noop
+            self.span = lambda name: NULL_SPAN
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+            self._spans[name] = _Span(hist)
+        return hist
+
+    def mark(self):
+        self._last = perf_counter_ns()
+
+    def lap(self, name):
+        now = perf_counter_ns()
+        hist = self.histograms.get(name) or self.histogram(name)
+        hist.record(now - self._last)
+        self._last = now
+
+    def span(self, name):
+        span = self._spans.get(name)
+        if span is None:
+            self.histogram(name)
+            span = self._spans[name]
+        return span
+
+    def sweep(self):
+        self.sweeps += 1
+        self._window_sweeps += 1
+
+    def sweep_rate(self):
+        elapsed = (perf_counter_ns() - self._window_start) / 1e9
+        return self._window_sweeps / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        stages = {name: {"count": h.count, "p50_ms": h.percentile(50) / 1e6, "p95_ms": h.percentile(95) / 1e6,
+                         "max_ms": h.max / 1e6, "total_s": h.total / 1e9}
+                  for name, h in self.histograms.items() if h.count}
+        return {"sweeps": self.sweeps, "sweeps_per_s": self.sweep_rate(), "stages": stages}
+
+    def format_summary(self):
+        s = self.summary()
+        busy = sum(stage["total_s"] for stage in s["stages"].values()) or 1.0
+        lines = [f"Profile: {s['sweeps']} sweeps, {s['sweeps_per_s']:.2f} sweeps/s",
+                 f"  {'stage':<15}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'share':>8}"]
+        for name, stage in sorted(s["stages"].items(), key=lambda item: -item[1]["total_s"]):
+            lines.append(f"  {name:<15}{stage['count']:>7}{stage['p50_ms']:>10.2f}{stage['p95_ms']:>10.2f}"
+                         f"{stage['max_ms']:>10.2f}{stage['total_s'] / busy:>8.0%}")
+        return "\n".join(lines)
+
+    def maybe_report(self): # Logs the summary every report_interval seconds and starts a new sweep-rate window
+        now = perf_counter_ns()
+        if (now - self._last_report) / 1e9 < self.report_interval:
+            return
+        log.info(self.format_summary())
+        self._last_report = self._window_start = now
+        self._window_sweeps = 0
@@ -0,0 +1,646 @@
+"""Point cloud + navigation zones window drawing (V10_6 layout)."""
+import logging
+import threading
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+import pygame
+
+from .latency import percentile
+from .state import ZoneSnapshot
+from .zones import FLOOR_ZONES, SQUARE_ZONE, ZONE_ANGLES, ZONE_IDS, ZONE_LABELS
+
+log = logging.getLogger("haptivision.render")
+
+WIDTH, HEIGHT = 1720, 1000
+CAPTION = "HaptiVision Point Cloud + Navigation Zones V.1.0"
+
+BLACK = (0, 0, 0) # Set different colors to be use
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+GREY = (50, 50, 50)
+GREY2 = (128, 128, 128)
+WHITE = (255, 255, 255)
+MAGENTA = (255, 0, 255)
+YELLOW = (255, 255, 102)
+RED = (255, 102, 102)
+CENTER = (600, HEIGHT - 50)
+
+PRIORITY_COLORS = (GREEN, YELLOW, GREY, RED) # Navigation panel colour of each zone priority
+MARKERS = {"1st": "x", "2nd": "x", "3rd": "x", # Point cloud marker of each zone: its tilt level
+           "4th": "+", "5th": "+", "6th": "+", **{label: "o" for label in FLOOR_ZONES}}
+
+ZONE_POLYGONS = { # Vertices (top-left, top-right, bottom-right, bottom-left) of the navigation panel squares and rhomboids
+    "1st": np.array([[1330, 120], [1430, 120], [1430, 220], [1330, 220]]),
+    "2nd": np.array([[1440, 120], [1540, 120], [1540, 220], [1440, 220]]),
+    "3rd": np.array([[1550, 120], [1650, 120], [1650, 220], [1550, 220]]),
+    "4th": np.array([[1330, 230], [1430, 230], [1430, 330], [1330, 330]]),
+    "5th": np.array([[1440, 230], [1540, 230], [1540, 330], [1440, 330]]),
+    "6th": np.array([[1550, 230], [1650, 230], [1650, 330], [1550, 330]]),
+    "7th": np.array([[1325, 360], [1426, 360], [1356, 430], [1255, 430]]),
+    "8th": np.array([[1440, 360], [1537, 360], [1467, 430], [1370, 430]]),
+    "9th": np.array([[1551, 360], [1650, 360], [1580, 430], [1481, 430]]),
+}
+PANEL = [(vertices, ZONE_IDS[SQUARE_ZONE[square]]) for square, vertices in ZONE_POLYGONS.items()] # Square, zone id
+PANEL_RECT = pygame.Rect(1220, 70, 470, 410) # Frame of the navigation panel, everything of it is drawn inside
+LAYER_RECT = pygame.Rect(27, 72, 1176, 904) # Inside the point cloud frame: where the heatmap and the markers go
+ERASE_LIMIT = 1000 # Markers up to which erasing them one by one is cheaper than blitting the whole background
+
+
+def polar_to_screen(center, angle_deg, distance, scale=1): # Converts polar to screen rectangular to draw with pygame x, y
+    if distance < 400:
+        angle_rad = np.radians(angle_deg)
+        x = center[0] + scale * distance * 2 * np.cos(angle_rad)
+        y = center[1] - scale * distance * 2 * np.sin(angle_rad)
+        return int(x), int(y)
+    else:
+        angle_rad = np.radians(angle_deg) # Everything above 4 meters is limited to 4 meters for ease of visualization
+        x = center[0] + scale * 400 * 2 * np.cos(angle_rad)
+        y = center[1] - scale * 400 * 2 * np.sin(angle_rad)
+        return int(x), int(y)
+
+
+def get_color_for_distance(d, idx): # Colour of a point in the point cloud, for the sweep position idx it was read at
+    if idx in (0, 1, 2, 3, 4, 5, 9, 10, 11):
+        if d < 100:
+            return RED
+        elif 100 <= d < 200:
+            return YELLOW
+        return GREEN # Anything beyond 2m
+    elif idx in (6, 7, 8):
+        if d < 100: ##### Test bench values
+            return RED
+        elif d > 210: ####### Code to detect a Hole or Gap in front
+            return GREY
+        return GREEN
+
+
+def draw_marker(surface, shape, color, point):
+    if shape == "x": # Draw 2 lines to form a diagonal cross
+        pygame.draw.line(surface, color, (point[0] - 3, point[1] - 3), (point[0] + 3, point[1] + 3), 1)
+        pygame.draw.line(surface, color, (point[0] - 3, point[1] + 3), (point[0] + 3, point[1] - 3), 1)
+    elif shape == "+": # Draw 2 lines to form a orthogonal cross
+        pygame.draw.rect(surface, color, [point[0], point[1], 1, 8], 1)
+        pygame.draw.rect(surface, color, [point[0] - 4, point[1] + 4, 8, 1], 1)
+    elif shape == "o": # Draw a circle
+        pygame.draw.circle(surface, color, point, 4, 1)
+
+
+def marker_sprite(shape, color, like=None):
+    """(sprite, dx, dy): the marker drawn once, black as colour key, to be blitted at point + (dx, dy)."""
+    canvas = pygame.Surface((16, 16), 0, like) if like is not None else pygame.Surface((16, 16))
+    canvas.set_colorkey(BLACK)
+    draw_marker(canvas, shape, color, (8, 8))
+    bounds = canvas.get_bounding_rect()
+    sprite = canvas.subsurface(bounds).copy()
+    sprite.set_colorkey(BLACK, pygame.RLEACCEL)
+    return sprite, bounds.x - 8, bounds.y - 8
+
+
+def zone_points(label, dist, idx, center=CENTER): # [(screen point, colour), ...] for one zone's samples
+    start_angle, end_angle = ZONE_ANGLES[label]
+    angle_step = (end_angle - start_angle) / len(dist)
+    points = []
+    for i, d in enumerate(dist):
+        angle = start_angle + i * angle_step
+        scaled_d = min(d, 350)
+        points.append((polar_to_screen(center, angle, scaled_d, scale=1), get_color_for_distance(d, idx)))
+    return points
+
+
+class PointCloud:
+    """Screen points and sample levels of every zone's last read, in preallocated arrays.
+
+    ``update()`` projects a zone in place (same maths as zone_points(), with
+    the per-sample cos/sin worked out once), and ``items()`` gives the
+    ``(label, [(point, colour), ...])`` pairs of the points.
+
+    draw_frame() draws a PointCloud with one ``Surface.blits()`` call: every
+    (marker, colour) is a sprite rendered once, and each sample keeps a
+    ``[sprite, Rect]`` entry that ``update()`` rewrites in place, so a frame
+    costs one C loop over the entries however many samples a zone has.
+    """
+
+    def __init__(self, samples=20, center=CENTER):
+        self.samples = samples
+        self.center = center
+        n = len(ZONE_LABELS)
+        self.x = np.zeros((n, samples), np.int32)
+        self.y = np.zeros((n, samples), np.int32)
+        self.levels = np.zeros((n, samples), np.uint8) # Colour of each point as a priority (sample_priority())
+        self.filled = [False] * n # Zones not read yet have no points
+        self._row = {label: row for row, label in enumerate(ZONE_LABELS)}
+        self._x, self._y, self._levels = list(self.x), list(self.y), list(self.levels) # Row views, made once
+        self._cos, self._sin = [], []
+        for label in ZONE_LABELS:
+            start_angle, end_angle = ZONE_ANGLES[label]
+            angle_step = (end_angle - start_angle) / samples
+            angles = np.radians([start_angle + i * angle_step for i in range(samples)])
+            self._cos.append(np.cos(angles))
+            self._sin.append(np.sin(angles))
+        self._d = np.zeros(samples)
+        self._f = np.zeros(samples)
+        self._shapes = [MARKERS.get(label) for label in ZONE_LABELS]
+        self._entries = [[[None, pygame.Rect(0, 0, 0, 0)] for _ in range(samples)] for _ in ZONE_LABELS]
+        self._sequence = [] # Entries of the filled zones that have a marker, in draw order
+        self._sprites = None # (shape, priority) -> (sprite, dx, dy, w, h), made for the first surface drawn on
+
+    def update(self, label, dist, levels):
+        """Projects one zone's distances (cm); ``levels`` are its per-sample priorities."""
+        row = self._row[label]
+        d, f = self._d, self._f
+        np.copyto(d, dist) # Cast first: a ufunc that casts on the fly allocates a buffer
+        np.minimum(d, 350, out=d)
+        np.multiply(d, 2, out=d)
+        np.multiply(d, self._cos[row], out=f)
+        np.add(f, self.center[0], out=f)
+        np.copyto(self._x[row], f, casting="unsafe") # Truncates like int()
+        np.multiply(d, self._sin[row], out=f)
+        np.subtract(self.center[1], f, out=f)
+        np.copyto(self._y[row], f, casting="unsafe")
+        np.copyto(self._levels[row], levels)
+        if not self.filled[row]:
+            self.filled[row] = True
+            self._sequence = [entry for r, entries in enumerate(self._entries)
+                              if self.filled[r] and self._shapes[r] for entry in entries]
+        if self._sprites is not None:
+            self._place(row)
+
+    def _place(self, row): # Sprite and position of each sample of a zone, into its blit entries
+        shape = self._shapes[row]
+        if shape is None:
+            return
+        sprites, entries = self._sprites, self._entries[row]
+        x, y, levels = self._x[row], self._y[row], self._levels[row]
+        for i in range(self.samples):
+            sprite, dx, dy, w, h = sprites[shape, levels.item(i)]
+            entry = entries[i]
+            entry[0] = sprite
+            entry[1].update(x.item(i) + dx, y.item(i) + dy, w, h)
+
+    def blit_sequence(self, surface):
+        """The ``[sprite, Rect]`` entries of every point, for ``surface.blits()``."""
+        if self._sprites is None:
+            self._sprites = {}
+            for shape in set(MARKERS.values()):
+                for priority, color in enumerate(PRIORITY_COLORS):
+                    sprite, dx, dy = marker_sprite(shape, color, surface)
+                    self._sprites[shape, priority] = sprite, dx, dy, *sprite.get_size()
+            for row, filled in enumerate(self.filled):
+                if filled:
+                    self._place(row)
+        return self._sequence
+
+    def points(self, label): # (point, colour) of each sample, made one at a time as the draw loop asks for them
+        row = self._row[label]
+        if not self.filled[row]:
+            return
+        x, y, levels = self._x[row], self._y[row], self._levels[row]
+        for i in range(self.samples):
+            yield (x.item(i), y.item(i)), PRIORITY_COLORS[levels.item(i)]
+
+    def items(self):
+        for label in ZONE_LABELS:
+            yield label, self.points(label)
+
+
+class StaticText:
+    """Every caption, key and zone label of the window, rendered once (needs pygame.font initialised)."""
+
+    def __init__(self):
+        font1 = pygame.font.SysFont(None, 45)
+        font2 = pygame.font.SysFont(None, 25)
+        font3 = pygame.font.SysFont(None, 22)
+        self.panel = [(font.render(text, True, color), pos) for font, text, color, pos in (
+            (font1, "POINT CLOUD V.1.0", WHITE, (450, 15)),
+            (font2, "3m", WHITE, (1170, 955)),
+            (font2, "2m", WHITE, (970, 955)),
+            (font2, "1m", WHITE, (770, 955)),
+            (font2, "0m", WHITE, (570, 955)),
+            (font3, "-45°", GREY2, (100, 450)),
+            (font3, "-15°", GREY2, (415, 250)),
+            (font3, "15°", GREY2, (750, 250)),
+            (font3, "45°", GREY2, (1085, 440)),
+
+            (font1, "NAVIGATION ZONES V.1.0", WHITE, (1250, 15)),
+            (font3, "z", GREY2, (1309, 95)),
+            (font3, "x", GREY2, (1658, 330)),
+            (font3, "y", GREY2, (1230, 400)),
+
+            (font2, "COLOR Coding Key: ", WHITE, (1260, 510)),
+            (font3, "Green =  No Obstacles Detected, Distance > 2 Meters", GREEN, (1260, 540)),
+            (font3, "Yellow =  Obstacle Detected, Distance <= 2 Meters", YELLOW, (1260, 560)),
+            (font3, "Red =  Obstacle Detected, Distance <= 1 Meter", RED, (1260, 580)),
+            (font3, "Grey =  GAP Detected, Floor Level", GREY2, (1260, 600)),
+
+            (font2, "SHAPE Coding Key (Markers):", WHITE, (1260, 660)),
+            (font3, "X (Diagonal Cross) =  Top Tilt Level ", BLUE, (1260, 690)),
+            (font3, "+ (Orthogonal Cross) =  Middle Tilt Level ", BLUE, (1260, 710)),
+            (font3, "O (Circle) =  Bottom Tilt Level", BLUE, (1260, 730)),
+            (font3, "NOTE 1: Color encoding is used to visually represent distance", WHITE, (1220, 820)),
+            (font3, "thresholds, While different geometric markers represent 3 different", WHITE, (1220, 840)),
+            (font3, "vertical positions at where the LiDAR is aiming.", WHITE, (1220, 860)),
+            (font3, "NOTE 2: Zones 7, 8 and 9 do not include a warning region (Yellow). ", WHITE, (1220, 900)),
+            (font3, "NOTE 3: Distances above 4 meters are limited to 4 meters. ", WHITE, (1220, 940)),
+        )]
+        self.zones = [(font3.render(f"Zone {n}", True, GREY2), pos) for n, pos in ( # Drawn over the zone polygons
+            (1, (1355, 200)), (2, (1465, 200)), (3, (1575, 200)),
+            (6, (1355, 310)), (5, (1465, 310)), (4, (1575, 310)),
+            (7, (1300, 410)), (8, (1410, 410)), (9, (1520, 410)),
+        )]
+
+
+def draw_frame(screen, zones, zone_to_points, text=None):
+    """Draws the whole window: point cloud, grid, navigation zones and legend.
+
+    ``zones`` is a ZoneStore or ZoneSnapshot (the squares are painted from
+    its priorities); ``zone_to_points`` is a dict of zone_points() lists or
+    a PointCloud, whose markers go out in one batched blit.
+    Pass a StaticText made once; without one every call renders it again.
+    """
+    if text is None:
+        text = StaticText()
+    draw_background(screen, text)
+    draw_panel(screen, zones.priority, text)
+    draw_points(screen, zone_to_points)
+
+
+def draw_background(screen, text): # Grid, legend, 3D plot axes and frames: everything that never changes
+    screen.fill(BLACK)
+    pygame.draw.circle(screen, GREY, CENTER, 600, 1)
+    pygame.draw.circle(screen, GREY, CENTER, 400, 1)
+    pygame.draw.circle(screen, GREY, CENTER, 200, 1)
+    pygame.draw.line(screen, GREY, CENTER, (777, 260))
+    pygame.draw.line(screen, GREY, CENTER, (90, 460))
+    pygame.draw.line(screen, GREY, CENTER, (403, 260))
+    pygame.draw.line(screen, GREY, CENTER, (1120, 440))
+    pygame.draw.line(screen, GREY, (000, 950), (1200, 950))
+
+    for surface, pos in text.panel:
+        screen.blit(surface, pos)
+
+    pygame.draw.line(screen, GREY2, (1305, 105), (1305, 345)) # Draw Lines for the 3D Plot
+    pygame.draw.line(screen, GREY2, (1305, 345), (1660, 345))
+    pygame.draw.line(screen, GREY2, (1305, 345), (1228, 425))
+
+    pygame.draw.rect(screen, GREY2, (25, 70, 1180, 910), width=2) # Draw Grey Frames
+    pygame.draw.rect(screen, GREY2, PANEL_RECT, width=2)
+
+
+def draw_panel(surface, priority, text, origin=(0, 0)): # The zone squares and their labels; origin: where surface sits
+    ox, oy = origin
+    for vertices, zone in PANEL: # Each zone keeps its color until it gets updated with LiDAR dist values
+        if ox or oy:
+            vertices = vertices - origin
+        pygame.draw.polygon(surface, PRIORITY_COLORS[priority.item(zone)], vertices)
+
+    for label, (x, y) in text.zones:
+        surface.blit(label, (x - ox, y - oy))
+
+
+def draw_points(screen, zone_to_points):
+    if isinstance(zone_to_points, PointCloud):
+        screen.blits(zone_to_points.blit_sequence(screen), doreturn=False)
+        return
+    for label, points in zone_to_points.items():
+        shape = MARKERS.get(label)
+        for point, color in points:
+            draw_marker(screen, shape, color, point)
+
+
+class CachedFrame:
+    """draw_frame() from cached layers, touching only what changed since the last frame.
+
+    The background is drawn once, for the first screen.  The panel (its
+    frame, axes, squares and labels) is drawn again only when one of its
+    squares changes colour and is otherwise blitted as it is.  Drawing a
+    PointCloud to the same screen again only blits the background back
+    under the previous frame's markers, the panel if it changed, and the
+    new markers; ``draw()`` returns the rects that changed, for
+    ``pygame.display.update()``.  Same pixels as draw_frame().
+
+    With a ``PolarHeatmap`` the whole ``LAYER_RECT`` changes every frame:
+    its background is blitted back, then the heatmap, then the markers.
+    """
+
+    def __init__(self, text=None, heatmap=None):
+        self.text = text if text is not None else StaticText()
+        self.heatmap = heatmap
+        self.background = None
+        self.panel = None
+        self.panel_draws = 0 # Times the panel was drawn again
+        self.full_draws = 0 # Frames drawn from scratch
+        self._priorities = [None] * len(PANEL) # Square colours the cached panel shows
+        self._screen = None # Surface the markers below were drawn on
+        self._rects = [] # Where the markers of the last frame are
+        self._erase = [] # (background, rect, rect) per marker: blits the background back over it
+        self._before, self._after = pygame.Rect(0, 0, 0, 0), pygame.Rect(0, 0, 0, 0) # Around the old, new markers
+
+    def _update_panel(self, priority): # True if a square changed colour and the panel was drawn again
+        shown, changed = self._priorities, False
+        for square, (_, zone) in enumerate(PANEL):
+            if priority.item(zone) != shown[square]:
+                shown[square] = priority.item(zone)
+                changed = True
+        if changed:
+            self.panel.blit(self.background, (0, 0), PANEL_RECT)
+            draw_panel(self.panel, priority, self.text, PANEL_RECT.topleft)
+            self.panel_draws += 1
+        return changed
+
+    def draw(self, screen, zones, zone_to_points, full=False):
+        """Brings ``screen`` up to date; returns the rects of it that changed."""
+        if self.background is None:
+            self.background = pygame.Surface(screen.get_size(), 0, screen)
+            draw_background(self.background, self.text)
+            self.panel = self.background.subsurface(PANEL_RECT).copy()
+        panel_changed = self._update_panel(zones.priority)
+        cloud = isinstance(zone_to_points, PointCloud)
+        if self.heatmap is not None and not full and screen is self._screen:
+            screen.blit(self.background, LAYER_RECT, LAYER_RECT)
+            self.heatmap.draw(screen)
+            draw_points(screen, zone_to_points)
+            if panel_changed:
+                screen.blit(self.panel, PANEL_RECT)
+                return [LAYER_RECT, PANEL_RECT]
+            return [LAYER_RECT]
+        if full or not cloud or screen is not self._screen:
+            screen.blit(self.background, (0, 0))
+            screen.blit(self.panel, PANEL_RECT)
+            if self.heatmap is not None:
+                self.heatmap.draw(screen)
+            draw_points(screen, zone_to_points)
+            self._screen = None
+            self._rects = self._erase = []
+            if self.heatmap is not None: # Nothing to track, LAYER_RECT is drawn again every frame
+                self._screen = screen
+            elif cloud:
+                self._track(screen, zone_to_points.blit_sequence(screen))
+            self.full_draws += 1
+            return [screen.get_rect()]
+
+        dirty = [self._bounds(self._before)] if self._rects else []
+        screen.blits(self._erase, doreturn=False)
+        if panel_changed:
+            screen.blit(self.panel, PANEL_RECT)
+            dirty.append(PANEL_RECT)
+        sequence = zone_to_points.blit_sequence(screen)
+        screen.blits(sequence, doreturn=False)
+        self._track(screen, sequence)
+        if self._screen is None: # Grew past ERASE_LIMIT: not tracked, so all of it may have changed
+            return [screen.get_rect()]
+        if self._rects:
+            dirty.append(self._bounds(self._after))
+        return dirty
+
+    def _bounds(self, out): # Rect around every tracked marker, into out
+        out.update(self._rects[0])
+        out.unionall_ip(self._rects)
+        return out
+
+    def _track(self, screen, sequence): # Remembers where the markers just drawn are, to erase them next frame
+        if len(sequence) > ERASE_LIMIT: # The next frame starts from the whole background again
+            self._screen = None
+            return
+        self._screen = screen
+        if len(sequence) != len(self._rects):
+            self._rects = [pygame.Rect(rect) for _, rect in sequence]
+            self._erase = [(self.background, rect, rect) for rect in self._rects]
+            return
+        for rect, (_, drawn) in zip(self._rects, sequence):
+            rect.update(drawn)
+
+
+class PolarHeatmap:
+    """Where returns were seen lately, as a fading glow under the point cloud.
+
+    Hits are counted per (angle, range) bin of the sweep's polar plane in a
+    flat float32 array: ``add()`` puts a zone's samples in with one
+    ``np.add.at``, ``draw()`` multiplies every bin by ``decay`` (a
+    ``half_life`` in frames of ``fps``), gathers the bins under each
+    ``cell`` x ``cell`` pixel block of ``LAYER_RECT`` through a lookup made
+    once, and puts them on the screen with one ``surfarray.blit_array``,
+    a scale and a colour-keyed blit.  A frame costs the same however many
+    points went in.  Returns at or beyond ``max_range`` (the rim the point
+    cloud clamps to) and "no return" (0) are not counted.
+    """
+
+    def __init__(self, samples=20, half_life=3.0, fps=15, angle_step=2.0, range_step=5, max_range=350,
+                 saturation=6.0, cell=4, center=CENTER, rect=None):
+        rect = pygame.Rect(rect if rect is not None else LAYER_RECT)
+        self.rect = rect
+        self.range_step, self.max_range = range_step, max_range
+        self.saturation = saturation # Hits that make a bin fully lit
+        self.decay = 0.5 ** (1.0 / (half_life * fps))
+        angle_bins, self.range_bins = int(round(180 / angle_step)), max_range // range_step
+        self.heat = np.zeros(angle_bins * self.range_bins + 1, np.float32) # The last bin is "outside", always 0
+        self.points = 0 # Samples added so far
+        self._angle_base = {} # Zone label -> per-sample index of its angle's first bin
+        for label in ZONE_LABELS:
+            start_angle, end_angle = ZONE_ANGLES[label]
+            angle_step_zone = (end_angle - start_angle) / samples
+            angles = np.array([start_angle + i * angle_step_zone for i in range(samples)])
+            self._angle_base[label] = (np.clip(angles // angle_step, 0, angle_bins - 1) * self.range_bins).astype(np.intp)
+
+        # Bin under the centre of every cell of the layer (x, y order, like surfarray)
+        cx = rect.x + cell * np.arange(rect.width // cell) + cell / 2 - center[0]
+        cy = center[1] - (rect.y + cell * np.arange(rect.height // cell) + cell / 2)
+        dx, dy = np.meshgrid(cx, cy, indexing="ij")
+        distance = np.hypot(dx, dy) / 2 # Pixels to cm, as polar_to_screen() scales them
+        angle = np.degrees(np.arctan2(dy, dx))
+        inside = (angle >= 0) & (angle < 180) & (distance < max_range)
+        lookup = (angle // angle_step).astype(np.intp) * self.range_bins + (distance // range_step).astype(np.intp)
+        self._lookup = np.where(inside, lookup, len(self.heat) - 1)
+        self._cells = np.zeros(self._lookup.shape, np.float32)
+        self._index = np.zeros(self._lookup.shape, np.uint8)
+
+        palette = [(int(MAGENTA[0] * i / 255), 0, int(MAGENTA[2] * i / 255)) for i in range(256)] # Black to magenta
+        self.small = pygame.Surface(self._lookup.shape, 0, 8)
+        self.layer = pygame.Surface((self._lookup.shape[0] * cell, self._lookup.shape[1] * cell), 0, 8)
+        for surface in (self.small, self.layer):
+            surface.set_palette(palette)
+            surface.set_colorkey(0) # No heat: the background shows through
+
+    def add(self, label, dist):
+        """Counts one zone's distances (cm)."""
+        dist = np.asarray(dist)
+        valid = (dist > 0) & (dist < self.max_range)
+        np.add.at(self.heat, self._angle_base[label][valid] + dist[valid] // self.range_step, 1.0)
+        self.points += int(np.count_nonzero(valid))
+
+    def draw(self, screen):
+        """One frame older, then onto ``screen``."""
+        np.multiply(self.heat, self.decay, out=self.heat)
+        np.take(self.heat, self._lookup, out=self._cells)
+        np.multiply(self._cells, 255.0 / self.saturation, out=self._cells)
+        np.minimum(self._cells, 255.0, out=self._cells)
+        np.copyto(self._index, self._cells, casting="unsafe")
+        pygame.surfarray.blit_array(self.small, self._index)
+        pygame.transform.scale(self.small, self.layer.get_size(), self.layer)
+        screen.blit(self.layer, self.rect)
+
+
+class Renderer:
+    """Draws the window on a thread of its own at a fixed frame rate, from ``ZoneStore`` snapshots.
+
+    The navigation loop only writes the store (zone verdicts and their
+    samples, see ``ZoneStore(samples=...)``).  Once per frame this thread
+    copies it, projects the zones whose ``seq`` moved and draws through a
+    ``CachedFrame``; a frame with nothing new is not drawn again (unless a
+    ``heatmap`` half-life is set: the heatmap fades on every frame).  A
+    frame that overruns its slot makes the thread skip the slots it missed
+    instead of catching up, so a slow display update costs frames, never
+    sweep time.
+
+        renderer = Renderer(zone_state, fps=15).start()   # opens the window
+        ...
+        if renderer.quit: ...                             # window closed
+        renderer.close()
+
+    The thread opens the window and pumps its events itself (SDL wants a
+    window used from the thread that made it).  With an ``output`` (a
+    ``FramebufferOutput``) no window is opened: frames are drawn into an
+    offscreen surface and their dirty rects written to the output, and
+    ``quit`` is never set (stop the program with a signal or the control
+    socket).  It schedules frames with
+    ``perf_counter()`` and waits on an Event, so a ``VirtualClock`` patched
+    into ``time`` leaves it on real time.
+
+    An exception in the draw loop ends the thread (the navigation goes on
+    without a window): it is logged at once, kept in ``error`` and raised
+    again by ``close()``, as one raised opening the window is by ``start()``.
+    """
+
+    def __init__(self, store, fps=15, size=(WIDTH, HEIGHT), caption=CAPTION, window=1000, heatmap=0.0,
+                 output=None):
+        zones, samples = store.samples_cm.shape
+        self.store = store
+        self.fps = fps
+        self.period = 1.0 / fps
+        self.size, self.caption = size, caption
+        self.snapshot = ZoneSnapshot(zones, samples)
+        self._cm, self._priority = list(self.snapshot.samples_cm), list(self.snapshot.samples_priority) # Row views
+        self.cloud = PointCloud(samples=samples)
+        self.heatmap = PolarHeatmap(samples, half_life=heatmap, fps=fps) if heatmap else None # heatmap: half-life, s
+        self.output = output # None: a pygame window
+        self.frame = None # CachedFrame, made on the first draw (needs pygame.font)
+        self.dirty = []
+        self.screen = None
+        self._drawn_version = None
+        self._drawn_seq = [0] * zones # A zone that was never written has seq 0 and no points
+        self.frames = self.unchanged = self.skipped = 0
+        self.draw_times = deque(maxlen=window) # Seconds of draw + display update of the last frames
+        self.quit = False # Set when the window was closed
+        self.error = None
+        self.started = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def draw(self, screen, force=False):
+        """Draws the latest snapshot into ``screen``; False (nothing drawn) if it did not change since the last.
+
+        ``dirty`` is then left holding the rects of ``screen`` that changed; ``force`` draws all of it again.
+        """
+        snap = self.store.snapshot(self.snapshot, self._stop)
+        if snap is None: # Closing while a write was left half done
+            return False
+        if snap.version == self._drawn_version and not force and self.heatmap is None:
+            return False
+        seq, drawn, cloud, heatmap = snap.seq, self._drawn_seq, self.cloud, self.heatmap
+        for zone, label in enumerate(ZONE_LABELS):
+            if seq.item(zone) != drawn[zone]:
+                cloud.update(label, self._cm[zone], self._priority[zone])
+                if heatmap is not None:
+                    heatmap.add(label, self._cm[zone])
+                drawn[zone] = seq.item(zone)
+        if self.frame is None:
+            self.frame = CachedFrame(heatmap=heatmap)
+        self.dirty = self.frame.draw(screen, snap, cloud, full=force)
+        self._drawn_version = snap.version
+        return True
+
+    def start(self):
+        """Starts the thread and returns once the window is open (raises what opening it raised)."""
+        self._thread = threading.Thread(target=self._run, name="renderer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.screen is None: # The window did not open (an error of the draw loop is left to close())
+            raise self.error
+        return self
+
+    def _run(self):
+        try:
+            if self.output is None:
+                pygame.init()
+                self.screen = pygame.display.set_mode(self.size)
+                pygame.display.set_caption(self.caption)
+            else: # Offscreen: the display is never initialized, only the fonts for the captions
+                pygame.font.init()
+                self.screen = pygame.Surface(self.size)
+        except Exception as e:
+            self.error = e
+            return
+        finally:
+            self._ready.set()
+        try:
+            self._loop()
+        except Exception as e:
+            self.error = e
+            log.exception("Renderer stopped, the window is no longer updated")
+        finally:
+            if self.output is None:
+                pygame.display.quit()
+
+    def _loop(self):
+        period = self.period
+        self.started = next_t = perf_counter()
+        while not self._stop.is_set():
+            force = False
+            for event in pygame.event.get() if self.output is None else ():
+                if event.type == pygame.QUIT:
+                    self.quit = True
+                elif event.type == pygame.VIDEOEXPOSE: # Uncovered: draw it again even if nothing changed
+                    force = True
+            start = perf_counter()
+            if self.draw(self.screen, force):
+                if self.output is None:
+                    pygame.display.update(self.dirty)
+                else:
+                    self.output.write(self.screen, self.dirty)
+                self.frames += 1
+                self.draw_times.append(perf_counter() - start)
+            else:
+                self.unchanged += 1
+            next_t += period
+            now = perf_counter()
+            if now > next_t: # Overran: skip the missed frames instead of drawing them late
+                missed = int((now - next_t) / period) + 1
+                self.skipped += missed
+                next_t += missed * period
+            self._stop.wait(next_t - now)
+
+    def close(self, timeout=0.5):
+        """Stops the thread; raises the exception that ended its draw loop, if one did."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive(): # Stuck in a display call: leave the daemon thread and pygame to the exit
+                return
+        if self.output is not None:
+            self.output.close()
+        pygame.quit()
+        if self.error is not None:
+            raise self.error
+
+    def format_summary(self):
+        elapsed = perf_counter() - self.started if self.started is not None else 0.0
+        values = sorted(self.draw_times)
+        rate = (self.frames + self.unchanged) / elapsed if elapsed else 0.0
+        output = f" to {self.output.describe()}" if self.output is not None else ""
+        return (f"Renderer{output}: {rate:.1f} fps (target {self.fps:g}), {self.frames} frames drawn, "
+                f"{self.unchanged} unchanged, {self.skipped} skipped, panel drawn "
+                f"{self.frame.panel_draws if self.frame else 0} times; draw + update p50 "
+                f"{percentile(values, 50) * 1000:.1f} ms, p95 {percentile(values, 95) * 1000:.1f} ms, "
+                f"max {(values[-1] if values else float('nan')) * 1000:.1f} ms")
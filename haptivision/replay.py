@@ -0,0 +1,172 @@
+"""Replays a recorded session through a navigation script.
+
+A ``ReplayLidar`` stands in for the TF-Luna: every ``i2c_rdwr`` answers with
+the next recorded sample (distance and strength) instead of a live read, so
+the script's own classification, haptic and drawing code run on exactly the
+data the user walked through.  Servo and motor commands still go to the fake
+pigpio daemon from ``haptivision.sim``.
+
+In the default fast mode the script runs on a ``VirtualClock``: its sleeps
+return immediately and ``monotonic()`` follows the recorded sample times.
+``--realtime`` paces the samples at their original timing instead.
+
+The replay ends on the last recorded zone: the next read raises
+``ReplayEnd``, a ``Shutdown``, so the script's loop stops there and runs its
+normal stop sequence without classifying or logging a zone that was never
+recorded.
+
+    python -m haptivision.replay sessions/session-20261019-101500.hvt --output /tmp/replayed.hvt
+"""
+import argparse
+import os
+import time
+
+from .sim.clock import VirtualClock
+from .shutdown import Shutdown
+from .sim.hardware import SimulatedHardware, restored_environ
+from .sim.tfluna import I2C_M_RD, READ_FRAME_CMD, TFLUNA_ADDRESS, DIST_MODE_LONG
+from .telemetry import VERDICT_NAMES, ZONE_LABELS, SessionLog
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "Pygame_Servo_Working_V10_6.py")
+
+
+class ReplayEnd(Shutdown): # Stops the navigation loop like a SIGTERM, before the zone past the log is used
+    pass
+
+
+class ReplayLidar:
+    """Serves the samples of a ``SessionLog`` in order, one per I2C transaction."""
+
+    def __init__(self, session, pose=None, clock=time.monotonic, sleep=time.sleep, virtual=None,
+                 address=TFLUNA_ADDRESS):
+        self.session = session
+        self.records = session.records
+        self.pose = pose
+        self.clock = clock
+        self.sleep = sleep
+        self.virtual = virtual # VirtualClock to move to each sample's recorded time, None for real time
+        self.address = address
+        self.transactions = 0
+        self.errors = 0
+        self.record = 0 # Index of the record being served
+        self.sample = 0 # Index of the sample within it
+        self.pose_mismatches = 0
+        self.finished = False
+        self._command = None
+        self._t0 = None # (recorded time, local time) of the first sample, for real time pacing
+
+    def __len__(self):
+        return len(self.records)
+
+    def _check_pose(self, record):
+        if self.pose is None:
+            return
+        pan, tilt = self.pose.target("pan") / 90.0, self.pose.target("tilt") / 90.0
+        if abs(pan - record["pan"]) > 0.01 or abs(tilt - record["tilt"]) > 0.01:
+            self.pose_mismatches += 1
+
+    def next_sample(self): # (recorded time, distance, strength) or None once the log is used up
+        while self.record < len(self.records):
+            record = self.records[self.record]
+            if self.sample < record["n"]:
+                if self.sample == 0:
+                    self._check_pose(record)
+                k = self.sample
+                self.sample += 1
+                return float(record["t"] + record["dt"][k]), int(record["dist"][k]), int(record["strength"][k])
+            self.record += 1
+            self.sample = 0
+        self.finished = True
+        return None
+
+    def _pace(self, t):
+        if self.virtual is not None:
+            self.virtual.advance_to(t)
+            return
+        if self._t0 is None:
+            self._t0 = (t, self.clock())
+        wait = (t - self._t0[0]) - (self.clock() - self._t0[1])
+        if wait > 0:
+            self.sleep(wait)
+
+    def read(self, length):
+        if self._command != READ_FRAME_CMD:
+            return bytes(length)
+        sample = self.next_sample()
+        if sample is None: # Past the end: the session is over, no zone of zeros
+            raise ReplayEnd("end of replay")
+        t, dist, amp = sample
+        self._pace(t)
+        return bytes((1, DIST_MODE_LONG, dist & 0xFF, dist >> 8, amp & 0xFF, amp >> 8, 0))[:length]
+
+    def transfer(self, msgs): # Same entry point the fake SMBus uses for the emulator
+        self.transactions += 1
+        for msg in msgs:
+            if msg.flags & I2C_M_RD:
+                msg.buf[:] = self.read(msg.len)
+            else:
+                self._command = tuple(msg.buf)
+
+
+def replay(path, script=DEFAULT_SCRIPT, realtime=False, output=None):
+    """Runs ``script`` on the samples recorded in ``path``; returns (hardware, lidar, elapsed seconds)."""
+    session = SessionLog(path)
+    if not len(session):
+        raise ValueError(f"{path} has no zone records")
+    virtual = None if realtime else VirtualClock(session.records["t"][0] - 1.0)
+    clock = virtual.monotonic if virtual else time.monotonic
+    sleep = virtual.sleep if virtual else time.sleep
+    hardware = SimulatedHardware("empty", clock=clock, sleep=sleep)
+    lidar = ReplayLidar(session, hardware.pose, clock=clock, sleep=sleep, virtual=virtual)
+    hardware.lidar = lidar
+    start = time.perf_counter()
+    try:
+        with restored_environ("HAPTIVISION_TELEMETRY") as environ, hardware:
+            environ["HAPTIVISION_TELEMETRY"] = output or "0"
+            if virtual:
+                with virtual.patch():
+                    hardware.run_script(script)
+            else:
+                hardware.run_script(script)
+    except ReplayEnd: # A script without its own "except Shutdown" ends here
+        pass
+    return hardware, lidar, time.perf_counter() - start
+
+
+def compare(original, replayed):
+    """Zone verdicts that changed between two logs, as {(label, before, after): count}."""
+    a, b = original.records, replayed.records
+    n = min(len(a), len(b))
+    changed = {}
+    for label, before, after in zip(a["label"][:n], a["verdict"][:n], b["verdict"][:n]):
+        if before != after:
+            key = (ZONE_LABELS[label - 1], VERDICT_NAMES[before], VERDICT_NAMES[after])
+            changed[key] = changed.get(key, 0) + 1
+    return n, changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.replay", description=__doc__.splitlines()[0])
+    parser.add_argument("session", help="session log written by the navigation script (.hvt)")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="navigation script to replay through")
+    parser.add_argument("--realtime", action="store_true", help="keep the original sample timing")
+    parser.add_argument("--output", help="record the replayed run to this session log and compare verdicts")
+    args = parser.parse_args(argv)
+
+    hardware, lidar, elapsed = replay(args.session, args.script, args.realtime, args.output)
+    records = lidar.records
+    duration = float(records["t"][-1] - records["t"][0]) if len(records) else 0.0
+    print(f"\n--- Replay: {lidar.record + (lidar.sample > 0)} of {len(lidar)} zones, {duration:.1f} s of recording in {elapsed:.1f} s "
+          f"({duration / elapsed if elapsed else 0:.1f}x), {hardware.sweeps} sweeps ---")
+    if lidar.pose_mismatches:
+        print(f"Servo commands differed from the recording in {lidar.pose_mismatches} zones")
+    if args.output:
+        n, changed = compare(lidar.session, SessionLog(args.output))
+        print(f"Verdicts changed in {sum(changed.values())} of {n} zones")
+        for (label, before, after), count in sorted(changed.items()):
+            print(f"  {label}: {before} -> {after} x{count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""The navigation program as an object: hardware, display and main loop.
+
+Importing this module opens no device and imports neither pygame nor
+gpiozero or pigpio.  ``Navigator.start()`` does all of that -- pigpio
+connection, servos, motors, the window, the LiDAR bus -- and homes the
+servos; ``run()`` sweeps until a quit (window, control channel) or SIGTERM
+and then runs the timed stop sequence:
+
+    navigator = Navigator.from_env(session_dir="sessions")
+    navigator.start()
+    navigator.run()
+
+The options are the ``HAPTIVISION_*`` environment variables the script has
+always read (see ``from_env()``).  ``time.sleep``/``time.monotonic`` are
+looked up in ``start()``, so a ``VirtualClock`` patched in before then
+drives the whole loop.
+
+The window is drawn by a ``Renderer`` thread at ``fps`` frames a second
+(``HAPTIVISION_FPS``, 15 by default) from snapshots of the zone store, so
+the sweep never waits for a projection, a draw or a flip.  Headless
+(``display=False``, ``HAPTIVISION_DISPLAY=0``, the wearable build without a
+screen) never starts it: pygame's display and fonts are not initialized and
+the store keeps no samples; acquisition, classification and haptics run
+exactly as with the window.  It stops on SIGTERM, Ctrl-C or the control
+channel's "quit".  On a Pi console without a desktop the window can go
+straight to the Linux framebuffer instead (``framebuffer="/dev/fb0"``,
+``HAPTIVISION_FRAMEBUFFER``; see ``haptivision.framebuffer``), at a reduced
+resolution with ``fb_scale`` below 1 (``HAPTIVISION_FB_SCALE``).  With
+``liveview="host:port"`` (``HAPTIVISION_LIVEVIEW``) the zone state and
+samples also go out to a viewer on another machine, which does the drawing
+(see ``haptivision.liveview``); with ``display=False`` that is the only view.
+"""
+import os
+import time
+
+from .zones import HAZARD_TESTS, HOME, POSITIONS, TILT_AFTER, ZONE_IDS, ZONE_MOTOR, nearest_return
+
+ADDRESS = 0x10 # TF-Luna I2C address
+SERVO_PINS = (17, 18) # servo1 (pan), servo2 (tilt)
+MOTOR_PINS = (5, 13, 6) # left, center, right: the arbiter's motor order
+PROFILE_STAGES = ("acquisition", "classification", "haptics", "console") # Projection and drawing: see Renderer
+
+
+class Navigator:
+    def __init__(self, haptics="blink", telemetry_path=None, console_interval=5.0, audio=False, profile=False,
+                 latency_log=None, control_path=None, press_t=None, address=ADDRESS, display=True, fps=15.0,
+                 heatmap=0.0, framebuffer=None, fb_scale=1.0, liveview=None):
+        self.haptics = haptics # "blink", "pwm" (pigpio DMA PWM, strength follows the distance) or "wave"
+        self.telemetry_path = telemetry_path # None: no session log
+        self.console_interval = console_interval
+        self.audio = audio
+        self.profile = profile
+        self.latency_log = latency_log
+        self.control_path = control_path # Resident mode: wait in standby for the button on this socket
+        self.press_t = press_t # monotonic() of the button press that started the program
+        self.address = address
+        self.display = display # False: headless, no window, no point projection, no drawing
+        self.fps = fps # Frame rate of the window, independent of the sweep
+        self.heatmap = heatmap # Half-life (s) of the window's heatmap of past returns, 0: no heatmap
+        self.framebuffer = framebuffer # None: a pygame window; "/dev/fb0" or "PATH:WxH[:BPP]": that framebuffer
+        self.fb_scale = fb_scale # Framebuffer output scaled down by this (and to fit the screen)
+        self.liveview_address = liveview # "host:port" of a live viewer, None: no live view
+        self.started = False
+
+    @classmethod
+    def from_env(cls, environ=os.environ, session_dir="sessions"):
+        """Options from HAPTIVISION_HAPTICS, _TELEMETRY, _CONSOLE, _AUDIO, _PROFILE, _LATENCY_LOG, _CONTROL, _PRESS_T,
+        _DISPLAY, _FPS, _HEATMAP, _FRAMEBUFFER, _FB_SCALE and _LIVEVIEW."""
+        from .telemetry import default_session_path
+        telemetry_path = environ.get("HAPTIVISION_TELEMETRY") or None
+        if "HAPTIVISION_TELEMETRY" not in environ:
+            telemetry_path = default_session_path(session_dir)
+        return cls(haptics=environ.get("HAPTIVISION_HAPTICS", "blink"),
+                   telemetry_path=telemetry_path if telemetry_path != "0" else None,
+                   console_interval=float(environ.get("HAPTIVISION_CONSOLE", "5")),
+                   audio=environ.get("HAPTIVISION_AUDIO", "0") not in ("", "0"),
+                   profile=bool(environ.get("HAPTIVISION_PROFILE")),
+                   latency_log=environ.get("HAPTIVISION_LATENCY_LOG"),
+                   control_path=environ.get("HAPTIVISION_CONTROL") or None,
+                   press_t=float(environ["HAPTIVISION_PRESS_T"]) if environ.get("HAPTIVISION_PRESS_T") else None,
+                   display=environ.get("HAPTIVISION_DISPLAY", "1") not in ("", "0"),
+                   fps=float(environ.get("HAPTIVISION_FPS", "15")),
+                   heatmap=float(environ.get("HAPTIVISION_HEATMAP") or 0),
+                   framebuffer=environ.get("HAPTIVISION_FRAMEBUFFER") or None,
+                   fb_scale=float(environ.get("HAPTIVISION_FB_SCALE") or 1),
+                   liveview=environ.get("HAPTIVISION_LIVEVIEW") or None)
+
+    def start(self):
+        """Connects to the hardware, opens the window (unless headless) and homes the servos."""
+        from gpiozero import LED, PWMLED, Servo
+        from gpiozero.pins.pigpio import PiGPIOFactory
+        from .audio import AudioCues
+        from .control import ControlServer, StartupTimer
+        from .haptics import CARRIER_HZ, MOTORS, Arbiter, PwmMotors, play
+        from .latency import LatencyTracker
+        from .lidar import LidarReader
+        from .patterns import WavePlayer
+        from .profiling import Profiler
+        from .state import ZoneStore
+        from .telemetry import RateLimitedConsole, TelemetryWriter
+        from .zones import ZoneClassifier
+
+        self.sleep, self.clock = time.sleep, time.monotonic
+        self._play = play
+        self.factory = factory = PiGPIOFactory()
+        self.servo1 = Servo(SERVO_PINS[0], min_pulse_width=0.0005, max_pulse_width=0.0025, pin_factory=factory)
+        self.servo2 = Servo(SERVO_PINS[1], min_pulse_width=0.0005, max_pulse_width=0.0025, pin_factory=factory)
+        if self.haptics == "pwm":
+            self.motors = tuple(PWMLED(pin, frequency=CARRIER_HZ, pin_factory=factory) for pin in MOTOR_PINS)
+        else:
+            self.motors = tuple(LED(pin) for pin in MOTOR_PINS)
+
+        self.latency = latency = LatencyTracker(log_path=self.latency_log, clock=self.clock) # Hazard-to-vibration latency KPI
+        for device, motor in zip(self.motors, MOTORS):
+            latency.watch_output(device, motor)
+        self.profiler = Profiler(enabled=self.profile, stages=PROFILE_STAGES) # Per-stage timings, off by default
+        # Binary session log of every zone update and a periodic console summary
+        self.telemetry = TelemetryWriter(self.telemetry_path) if self.telemetry_path else None
+        self.console = RateLimitedConsole(interval=self.console_interval, clock=self.clock)
+
+        # The I2C messages, bus handle and sample buffers are made once and reused by every zone
+        self.lidar = LidarReader(self.address, count=20, clock=self.clock, sleep=self.sleep)
+        self.classifier = ZoneClassifier(samples=self.lidar.count)
+        # Proximity level, priority, age and sequence of every zone, indexed by zone id; with the window also
+        # every zone's last samples, which the renderer (or the live viewer) draws the point cloud from
+        self.zone_state = ZoneStore(samples=self.lidar.count if self.display or self.liveview_address else 0)
+        self.liveview = None
+        if self.liveview_address: # Rate limited to the window's frame rate
+            from .liveview import LiveViewPublisher
+            self.liveview = LiveViewPublisher(self.liveview_address, samples=self.lidar.count, rate=self.fps,
+                                              clock=self.clock)
+        self.renderer = None
+        if self.display:
+            self.open_window()
+        self.cues = AudioCues(clock=self.clock) if self.audio else None # Stereo audio cues, off by default (mixer only)
+
+        self.servo1.value, self.servo2.value = HOME # Initial servo positions (Home)
+        self.tilt = HOME[1]
+        self.sleep(0.5)
+
+        self.arbiter = Arbiter() # Motor priorities, recomputed only when one of their zones changes
+        self.pwm = PwmMotors(self.motors, on_command=lambda m: latency.commanded(MOTORS[m])) \
+            if self.haptics == "pwm" else None
+        self.waves = None
+        if self.haptics == "wave": # Every combination of motor patterns is compiled once, before the first sweep
+            self.waves = WavePlayer(factory.connection, MOTOR_PINS, on_command=lambda m: latency.commanded(MOTORS[m]),
+                                    on_actuate=lambda m, level: latency.actuated(MOTORS[m], level))
+            print(f"Haptic waveforms: {self.waves.prepare()} compiled in {self.waves.compile_s * 1000:.0f} ms")
+
+        # Resident mode: everything above is done once, then the program waits in standby for the button
+        self.control = ControlServer(self.control_path) if self.control_path else None
+        self.startup = StartupTimer(self.press_t, clock=self.clock)
+        self.active = self.control is None or self.press_t is not None # Started by a press: navigate at once
+        self.running = True
+        if self.control is not None:
+            print(f"{'Navigating' if self.active else 'Standby'}: the button is taken on {self.control.path}")
+        self.started = True
+        return self
+
+    def open_window(self): # Point Cloud + Navigation Zones Visualizations, drawn on the renderer's thread
+        from .render import Renderer
+        output = None
+        if self.framebuffer:
+            from .framebuffer import FramebufferOutput
+            output = FramebufferOutput.from_spec(self.framebuffer, scale=self.fb_scale)
+            print(f"Window output: {output.describe()}")
+        self.renderer = Renderer(self.zone_state, fps=self.fps, heatmap=self.heatmap, output=output).start()
+
+    # Main loop -----------------------------------------------------------
+
+    def run(self):
+        """Sweeps until quit or SIGTERM, then stops safely and prints the summaries."""
+        from .shutdown import Shutdown, StopSignal
+        if not self.started:
+            self.start()
+        self.stop = StopSignal(clock=self.clock) # SIGTERM ends the loop at once, the stop sequence is timed
+        try:
+            while self.running:
+                if self.control is not None:
+                    self.handle_commands()
+                if not self.active:
+                    self.handle_events()
+                    continue
+                self.sweep()
+        except Shutdown: # SIGTERM from Project_Start_Stop (or Ctrl-C): stop now, not at the end of the sweep
+            pass
+        self.shutdown()
+        self.close()
+
+    def handle_commands(self): # Button commands; in standby the program waits here
+        control = self.control
+        for command, arg in control.poll(0.0 if self.active else 0.1):
+            if command == "toggle":
+                command = "pause" if self.active else "resume"
+            if command == "resume" and not self.active:
+                self.active = True
+                self.startup.start(float(arg) if arg else None)
+            elif command == "pause" and self.active:
+                self.pause()
+            elif command == "quit":
+                self.running = False
+        control.state = f"{'active' if self.active else 'standby'}; {self.startup.format_summary()}"
+
+    def handle_events(self): # The renderer pumps the window's events
+        if self.renderer is not None and self.renderer.quit:
+            self.running = False
+
+    def motors_off(self):
+        if self.waves is not None:
+            self.waves.off()
+        if self.pwm is not None:
+            self.pwm.off()
+        for device in self.motors: # Patterns repeat until told otherwise
+            device.off()
+        if self.cues is not None:
+            self.cues.stop()
+
+    def pause(self):
+        self.active = False
+        self.motors_off()
+        self.arbiter.reset() # So the first hazard after a resume is a transition again
+        self.latency.reset()
+        self.servo1.value, self.servo2.value = HOME # Park at home, where the next sweep starts
+        self.tilt = HOME[1]
+        print(f"Paused. {self.startup.format_summary()}")
+
+    def sweep(self):
+        """One sweep of the zones; False if a button command cut it short (then it is not counted)."""
+        profiler = self.profiler
+        if self.tilt != HOME[1]: # A sweep cut short left the tilt mid-sweep: zone 1 is scanned from home
+            self.servo2.value = self.tilt = HOME[1]
+            self.sleep(0.25)
+        for idx, (pos, delay, label) in enumerate(POSITIONS): # Servos Positions and Delays
+            if self.control is not None and self.control.pending(): # Answer the button before the next zone
+                self.handle_events()
+                return False
+            self.zone(idx, pos, delay, label)
+            if idx in TILT_AFTER: # Values for Servo2, which gives the proper Tilt (Vertical Scan)
+                self.servo2.value = self.tilt = TILT_AFTER[idx]
+                self.sleep(0.25)
+
+        self.sleep(0.01)
+        self.arbiter.sweep()
+        profiler.sweep()
+        profiler.maybe_report()
+        self.handle_events()
+        return True
+
+    def zone(self, idx, pos, delay, label):
+        profiler, lidar, arbiter, startup = self.profiler, self.lidar, self.arbiter, self.startup
+        self.servo1.value = pos
+
+        profiler.mark()
+        dist = lidar.read() # Overwrites lidar.distances, lidar.times and lidar.strengths
+        profiler.lap("acquisition")
+        self.sleep(delay)
+        profiler.mark()
+
+        zone_id = ZONE_IDS[label]
+        zone_priority = self.classifier(label, dist)
+        verdict_t = self.clock() if self.cues is not None else None
+        nearest_cm = nearest_return(dist)
+        self.zone_state.update(zone_id, zone_priority, nearest_cm, dist, self.classifier.levels) # Haptic feedback Priority levels     RED = 3   GREY = 2    YELLOW = 1    GREEN = 0
+        self.latency.classified(label, ZONE_MOTOR[label], zone_priority, dist, lidar.times, HAZARD_TESTS.get(zone_priority))
+        if startup.verdict():
+            print(startup.format_summary())
+        profiler.lap("classification")
+
+        # Code to Handle Prioritization for the Haptic feedback  RED = 3   GREY = 2    YELLOW = 1    GREEN = 0
+        motor = arbiter.update(zone_id, zone_priority) # Left: zones 1, 6 and 7  Center: 2, 5 and 8  Right: 3, 4 and 9
+        if self.pwm is not None: # Strength follows the distance too, so the zone's motor is set on every update (sent if it changed)
+            zone_motor = arbiter.motor_of(zone_id)
+            if zone_motor >= 0:
+                self.pwm.update(zone_motor, arbiter.motor_priority[zone_motor],
+                                arbiter.motor_level(zone_motor, self.zone_state.level))
+        elif motor is not None and self.waves is not None: # pigpiod plays all three patterns as one waveform
+            self.waves.play(arbiter.motor_priority)
+        elif motor is not None: # Only a change of the motor's priority starts a new pattern
+            self._play(self.motors[motor], arbiter.motor_priority[motor])
+        if motor is not None and self.cues is not None: # The same transitions, as a tone from the motor's side
+            self.cues.play(motor, arbiter.motor_priority[motor], verdict_t)
+        if motor is not None and startup.command():
+            print(startup.format_summary())
+        profiler.lap("haptics")
+
+        if self.telemetry:
+            self.telemetry.log(idx, label, pos, self.tilt, dist, lidar.strengths, lidar.times, zone_priority,
+                               arbiter.priorities())
+        self.console.zone(label, nearest_cm, zone_priority)
+        if self.liveview is not None:
+            self.liveview.publish(self.zone_state)
+        profiler.lap("console") # Console and live view
+        self.latency.maybe_report()
+
+    # Stop ----------------------------------------------------------------
+
+    def shutdown(self):
+        """Motors off first, then park the servos, then let go of pigpio, within the stop deadline."""
+        from .shutdown import PARK_S
+        stop = self.stop
+        stop.begin("quit")
+        self.motors_off()
+        stop.step("motors off")
+        self.servo1.value, self.servo2.value = HOME
+        self.sleep(max(0.0, min(PARK_S, stop.remaining() - 0.02)))
+        stop.step("servos parked")
+        if self.waves is not None:
+            self.waves.close()
+        for device in (*self.motors, self.servo1, self.servo2):
+            device.close()
+        self.factory.close()
+        stop.step("pigpio released")
+        stop.log()
+
+    def close(self): # Everything that is not time critical: logs, sensor bus, summaries, window
+        if self.telemetry:
+            self.telemetry.close()
+            print(f"Session log: {self.telemetry.path} ({self.telemetry.written} zone records, "
+                  f"{self.telemetry.dropped} dropped)")
+        self.lidar.close()
+        print(self.arbiter.format_summary())
+        if self.cues is not None:
+            print(self.cues.format_summary())
+            self.cues.close()
+        print(self.latency.format_summary())
+        if self.profiler.enabled:
+            print(self.profiler.format_summary())
+        self.latency.close()
+        if self.control is not None:
+            self.control.close()
+        if self.liveview is not None:
+            self.liveview.close()
+            print(self.liveview.format_summary())
+        if self.renderer is not None:
+            try:
+                self.renderer.close() # Raises what stopped the window, if anything did
+            finally:
+                print(self.renderer.format_summary())
@@ -0,0 +1,133 @@
+"""Bounded, safe stop of the navigation program.
+
+``StopSignal`` turns SIGTERM (and SIGINT) into a ``Shutdown`` exception in
+the main loop, so a stop no longer waits for the zone, the settle sleep or
+the sweep to finish.  The exception is never raised in the middle of a
+pigpio command (the request is sent but its reply not yet read, which
+would leave every later reply off by one) nor in the middle of a
+``ZoneStore`` write (its seqlock would stay odd and the renderer's
+snapshot would never finish): the handler then retries on a 1 ms timer.
+The script's stop sequence runs after the loop and is timed step by step
+against ``DEADLINE_S``:
+
+    stop = StopSignal()
+    try:
+        while running: ...
+    except Shutdown:
+        pass
+    stop.begin("quit")   # after a signal the clock already runs from the signal
+    ... motors off ...
+    stop.step("motors off")
+
+``stop_process()`` is the supervisor side: SIGTERM, wait up to the deadline
+plus a margin, then SIGKILL and ``force_safe()``, which silences the motor
+pins and servo pulses straight through pigpiod (its DMA PWM and waveforms
+outlive a killed client).
+"""
+import logging
+import signal
+import subprocess
+from time import monotonic
+
+log = logging.getLogger("haptivision.shutdown")
+
+DEADLINE_S = 0.15 # From the stop request to the motors off, servos parked and pigpio released
+PARK_S = 0.1 # Servo travel allowed for parking, within the deadline
+# Never unwind from inside these: pigpio (socket request sent, reply not read yet), the zone store (seqlock odd)
+UNSAFE_MODULES = ("pigpio", "haptivision.state")
+
+
+class Shutdown(BaseException): # Like KeyboardInterrupt, not caught by "except Exception"
+    pass
+
+
+def _inside(frame, modules):
+    while frame is not None:
+        if frame.f_globals.get("__name__") in modules:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class StopSignal:
+    def __init__(self, signals=(signal.SIGTERM, signal.SIGINT), deadline=DEADLINE_S, clock=monotonic, retry=0.001):
+        self.deadline = deadline
+        self.clock = clock
+        self.retry = retry
+        self.requested_t = None
+        self.reason = None
+        self.steps = [] # [(step, seconds since the request), ...]
+        self._stopping = False
+        for signum in signals:
+            signal.signal(signum, self._handler)
+        signal.signal(signal.SIGALRM, self._handler) # The retry timer
+
+    def _handler(self, signum, frame):
+        if signum != signal.SIGALRM and self.requested_t is None:
+            self.requested_t = self.clock()
+            self.reason = signal.Signals(signum).name
+        if self._stopping or self.requested_t is None: # Already stopping, or a stray timer
+            return
+        if _inside(frame, UNSAFE_MODULES): # Let the pigpio command or the store write finish first
+            signal.setitimer(signal.ITIMER_REAL, self.retry)
+            return
+        self._stopping = True
+        raise Shutdown(self.reason)
+
+    def begin(self, reason):
+        """The stop sequence starts: no Shutdown is raised any more, the clock runs from the signal if one came."""
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        self._stopping = True
+        if self.requested_t is None:
+            self.requested_t = self.clock()
+            self.reason = reason
+
+    def step(self, name):
+        self.steps.append((name, self.clock() - self.requested_t))
+
+    def remaining(self):
+        return self.deadline - (self.clock() - self.requested_t)
+
+    def format_summary(self):
+        if self.requested_t is None:
+            return "Stop: not requested"
+        steps = ", ".join(f"{name} {t * 1000:.1f} ms" for name, t in self.steps)
+        total = self.steps[-1][1] if self.steps else 0.0
+        verdict = "ok" if total <= self.deadline else "LATE"
+        return f"Stop ({self.reason}): {steps} [deadline {self.deadline * 1000:.0f} ms, {verdict}]"
+
+    def log(self):
+        log.info(self.format_summary())
+
+
+def force_safe(motor_pins, servo_pins=()):
+    """Motor pins low, waveforms and servo pulses off, through a fresh pigpio connection."""
+    import pigpio
+    pi = pigpio.pi()
+    if not pi.connected:
+        return False
+    try:
+        pi.wave_tx_stop()
+        for pin in motor_pins:
+            pi.write(pin, 0)
+        for pin in servo_pins:
+            pi.set_servo_pulsewidth(pin, 0)
+    finally:
+        pi.stop()
+    return True
+
+
+def stop_process(process, deadline=DEADLINE_S, margin=1.0, motor_pins=(), servo_pins=()):
+    """SIGTERM, then SIGKILL once ``deadline + margin`` has passed; returns (seconds to exit, killed)."""
+    start = monotonic()
+    process.terminate()
+    try:
+        process.wait(timeout=deadline + margin) # The margin covers interpreter teardown after the stop sequence
+        return monotonic() - start, False
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    log.warning("navigation program did not stop within %.0f ms, killed", (deadline + margin) * 1000)
+    if motor_pins or servo_pins:
+        force_safe(motor_pins, servo_pins)
+    return monotonic() - start, True
@@ -0,0 +1 @@
+"""Stand-ins for the Pi hardware so the navigation scripts can run on a plain Linux box."""
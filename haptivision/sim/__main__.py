@@ -0,0 +1,46 @@
+"""Run a navigation script against simulated hardware.
+
+    python -m haptivision.sim Complete_Vibration_Test.py --scene hallway --sweeps 3
+"""
+import argparse
+import time
+
+from .hardware import MOTOR_PINS, PAN_PIN, TILT_PIN, SimulatedHardware
+from .scene import builtin_scenes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m haptivision.sim", description=__doc__.splitlines()[0])
+    parser.add_argument("script", help="script to run, e.g. Pygame_Servo_Working_V10_6.py")
+    parser.add_argument("--scene", default="room",
+                        help=f"built-in scene ({', '.join(builtin_scenes())}) or a scene JSON file")
+    parser.add_argument("--sweeps", type=int, default=None, help="quit after this many full sweeps")
+    parser.add_argument("--seed", type=int, default=None, help="seed for LiDAR noise")
+    parser.add_argument("--i2c-error-rate", type=float, default=0.0, help="probability of an I2C NACK per read")
+    parser.add_argument("--record", metavar="CSV", help="write every pin transition / PWM update here")
+    args = parser.parse_args(argv)
+
+    hardware = SimulatedHardware(args.scene, seed=args.seed, error_rate=args.i2c_error_rate)
+    start = time.monotonic()
+    with hardware:
+        try:
+            hardware.run_script(args.script, sweeps=args.sweeps)
+        except KeyboardInterrupt:
+            pass
+    elapsed = time.monotonic() - start
+
+    recorder = hardware.recorder
+    print(f"\n--- Simulated run: {elapsed:.1f} s, {hardware.sweeps} sweeps "
+          f"({hardware.sweeps / elapsed if elapsed else 0:.2f}/s) ---")
+    print(f"LiDAR: {hardware.lidar.transactions} I2C transactions, {hardware.lidar.errors} injected errors")
+    print(f"Servos: pan {recorder.command_rate(PAN_PIN):.1f} cmd/s, tilt {recorder.command_rate(TILT_PIN):.1f} cmd/s")
+    for name, pin in MOTOR_PINS.items():
+        print(f"Motor {name}: {len(recorder.edges(pin))} edges")
+    print(recorder.summary())
+    if args.record:
+        recorder.write_csv(args.record)
+        print(f"Pin log written to {args.record}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Virtual time for running the scripts faster than the wall clock.
+
+The scripts do ``from time import sleep, monotonic`` at import, so patching
+the ``time`` module before the script is run is enough to move them onto a
+``VirtualClock``: ``sleep()`` advances the clock instead of blocking, and
+``monotonic()`` returns the virtual time.  Threads that wait on
+``threading.Event`` (gpiozero's blink threads) keep using real time.
+"""
+import threading
+import time
+
+_real_sleep = time.sleep
+
+
+class VirtualClock:
+    def __init__(self, start=0.0):
+        self._now = float(start)
+        self._lock = threading.Lock()
+        self.slept = 0.0 # Total virtual time handed out by sleep()
+
+    def monotonic(self):
+        return self._now
+
+    __call__ = monotonic
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            with self._lock:
+                self._now += seconds
+                self.slept += seconds
+        _real_sleep(0) # Still yield the GIL like a real sleep would
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += max(0.0, seconds)
+
+    def advance_to(self, t): # Never goes backwards
+        with self._lock:
+            if t > self._now:
+                self._now = t
+
+    def patch(self):
+        """Context manager that points ``time.sleep``/``time.monotonic`` at this clock."""
+        return _Patch(self)
+
+
+class _Patch:
+    def __init__(self, clock):
+        self.clock = clock
+        self._saved = None
+
+    def __enter__(self):
+        self._saved = time.sleep, time.monotonic
+        time.sleep, time.monotonic = self.clock.sleep, self.clock.monotonic
+        return self.clock
+
+    def __exit__(self, *exc):
+        time.sleep, time.monotonic = self._saved
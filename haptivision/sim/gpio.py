@@ -0,0 +1,245 @@
+"""Pin transition recorder and an RPi.GPIO stand-in that writes into it.
+
+Everything that drives a pin in simulation (the fake pigpio daemon behind
+gpiozero, or the ``RPi.GPIO`` shim) reports into one ``PinRecorder``, which
+keeps timestamped level changes and PWM/servo updates so tests can measure
+servo command rates, motor pattern timing and end-to-end latency.
+"""
+import sys
+import threading
+import time
+import types
+from collections import deque, namedtuple
+from itertools import chain
+
+Transition = namedtuple("Transition", "t pin level source")
+PwmUpdate = namedtuple("PwmUpdate", "t pin frequency duty source") # duty is a 0..1 fraction
+
+
+class PinRecorder:
+    def __init__(self, clock=time.monotonic, max_events=None):
+        self.clock = clock
+        self.transitions = deque(maxlen=max_events) # max_events keeps only the most recent, for long runs
+        self.pwm_updates = deque(maxlen=max_events)
+        self.levels = {}
+        self._pwm_state = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, func): # func(event) with a Transition or PwmUpdate
+        self._listeners.append(func)
+
+    def _notify(self, event):
+        for func in self._listeners:
+            func(event)
+
+    def level(self, pin, level, source="", t=None): # t: when it happened, if not now (waveform playback)
+        level = 1 if level else 0
+        with self._lock:
+            if self.levels.get(pin) == level:
+                return None
+            self.levels[pin] = level
+            event = Transition(self.clock() if t is None else t, pin, level, source)
+            self.transitions.append(event)
+        self._notify(event)
+        return event
+
+    def pwm(self, pin, frequency, duty, source=""):
+        with self._lock:
+            if self._pwm_state.get(pin) == (frequency, duty):
+                return None
+            self._pwm_state[pin] = (frequency, duty)
+            event = PwmUpdate(self.clock(), pin, frequency, duty, source)
+            self.pwm_updates.append(event)
+        self._notify(event)
+        return event
+
+    def clear(self):
+        with self._lock:
+            self.transitions.clear()
+            self.pwm_updates.clear()
+
+    def edges(self, pin, since=None):
+        return [e for e in self.transitions if e.pin == pin and (since is None or e.t >= since)]
+
+    def on_intervals(self, pin, until=None): # [(t_on, t_off), ...]; an interval still open ends at `until`
+        intervals, start = [], None
+        for e in self.edges(pin):
+            if e.level and start is None:
+                start = e.t
+            elif not e.level and start is not None:
+                intervals.append((start, e.t))
+                start = None
+        if start is not None:
+            intervals.append((start, until if until is not None else self.clock()))
+        return intervals
+
+    def pulse_widths(self, pin): # Servo pulse widths in seconds as [(t, width), ...]
+        return [(e.t, e.duty / e.frequency) for e in self.pwm_updates
+                if e.pin == pin and e.frequency]
+
+    def command_rate(self, pin, window=None): # PWM/servo updates per second on a pin
+        updates = [e.t for e in self.pwm_updates if e.pin == pin]
+        if window is not None and updates:
+            updates = [t for t in updates if t >= updates[-1] - window]
+        if len(updates) < 2 or updates[-1] == updates[0]:
+            return 0.0
+        return (len(updates) - 1) / (updates[-1] - updates[0])
+
+    def summary(self):
+        pins = sorted({e.pin for e in self.transitions} | {e.pin for e in self.pwm_updates})
+        lines = []
+        for pin in pins:
+            edges = self.edges(pin)
+            pwm = [e for e in self.pwm_updates if e.pin == pin]
+            on = sum(b - a for a, b in self.on_intervals(pin))
+            lines.append(f"GPIO {pin:2d}: {len(edges)} edges, {on:.2f} s on, "
+                         f"{len(pwm)} PWM updates ({self.command_rate(pin):.1f}/s)")
+        return "\n".join(lines)
+
+    def write_csv(self, path):
+        with self._lock: # Both logs whole: adding the deques would cut the result to one deque's max_events
+            events = sorted(chain(self.transitions, self.pwm_updates), key=lambda e: e.t)
+        with open(path, "w") as f:
+            f.write("t,pin,kind,level,frequency,duty,source\n")
+            for e in events:
+                if isinstance(e, Transition):
+                    f.write(f"{e.t:.6f},{e.pin},level,{e.level},,,{e.source}\n")
+                else:
+                    f.write(f"{e.t:.6f},{e.pin},pwm,,{e.frequency},{e.duty:.6f},{e.source}\n")
+
+
+class _GPIOShim:
+    """Module-like object mirroring the RPi.GPIO API the scripts use."""
+
+    BCM, BOARD = 11, 10
+    OUT, IN = 0, 1
+    LOW, HIGH = 0, 1
+    PUD_OFF, PUD_DOWN, PUD_UP = 20, 21, 22
+    RISING, FALLING, BOTH = 31, 32, 33
+    VERSION = "0.7.1-haptivision-sim"
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.RPI_INFO = {"P1_REVISION": 3, "TYPE": "Simulated"}
+        self._mode = None
+        self._setup = {}
+        self._callbacks = {}
+        self._last_event = {}
+        self._event_flags = {}
+
+    class PWM:
+        def __init__(self, channel, frequency):
+            self._gpio = _current_shim
+            self.channel = channel
+            self.frequency = float(frequency)
+            self.duty = 0.0
+            self.running = False
+
+        def start(self, duty):
+            self.running = True
+            self.ChangeDutyCycle(duty)
+
+        def ChangeDutyCycle(self, duty):
+            self.duty = float(duty)
+            if self.running:
+                self._gpio.recorder.pwm(self.channel, self.frequency, self.duty / 100.0, "RPi.GPIO")
+
+        def ChangeFrequency(self, frequency):
+            self.frequency = float(frequency)
+            self.ChangeDutyCycle(self.duty)
+
+        def stop(self):
+            self.running = False
+            self._gpio.recorder.pwm(self.channel, self.frequency, 0.0, "RPi.GPIO")
+
+    def setmode(self, mode):
+        self._mode = mode
+
+    def getmode(self):
+        return self._mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, pull_up_down=None, initial=None):
+        if self._mode is None:
+            raise RuntimeError("Please set pin numbering mode using GPIO.setmode(GPIO.BOARD) or GPIO.setmode(GPIO.BCM)")
+        for pin in channel if isinstance(channel, (list, tuple)) else (channel,):
+            self._setup[pin] = direction
+            if direction == self.IN:
+                self.recorder.levels.setdefault(pin, 1 if pull_up_down == self.PUD_UP else 0)
+            elif initial is not None:
+                self.recorder.level(pin, initial, "RPi.GPIO")
+
+    def output(self, channel, value):
+        for pin in channel if isinstance(channel, (list, tuple)) else (channel,):
+            if self._setup.get(pin) != self.OUT:
+                raise RuntimeError("The GPIO channel has not been set up as an OUTPUT")
+            self.recorder.level(pin, value, "RPi.GPIO")
+
+    def input(self, channel):
+        return self.recorder.levels.get(channel, 0)
+
+    def gpio_function(self, channel):
+        return self._setup.get(channel, self.IN)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        self._callbacks[channel] = [edge, [callback] if callback else [], (bouncetime or 0) / 1000.0]
+
+    def add_event_callback(self, channel, callback):
+        self._callbacks[channel][1].append(callback)
+
+    def remove_event_detect(self, channel):
+        self._callbacks.pop(channel, None)
+
+    def event_detected(self, channel):
+        return self._event_flags.pop(channel, False)
+
+    def cleanup(self, channel=None):
+        pins = list(self._setup) if channel is None else [channel]
+        for pin in pins:
+            if self._setup.pop(pin, None) == self.OUT:
+                self.recorder.level(pin, 0, "RPi.GPIO cleanup")
+            self._callbacks.pop(pin, None)
+
+    # Simulation side: drive an input pin as if something external changed it
+    def drive_input(self, channel, level):
+        event = self.recorder.level(channel, level, "external")
+        if event is None or channel not in self._callbacks:
+            return
+        edge, callbacks, bounce = self._callbacks[channel]
+        if edge == self.RISING and not level or edge == self.FALLING and level:
+            return
+        last = self._last_event.get(channel)
+        if last is not None and event.t - last < bounce:
+            return
+        self._last_event[channel] = event.t
+        self._event_flags[channel] = True
+        for callback in callbacks: # RPi.GPIO runs callbacks on its own thread
+            threading.Thread(target=callback, args=(channel,), daemon=True).start()
+
+    def press(self, channel, hold=0.05): # Active-low push button with the internal pull-up
+        self.drive_input(channel, 0)
+        time.sleep(hold)
+        self.drive_input(channel, 1)
+
+
+_current_shim = None
+
+
+def install_rpi_gpio(recorder):
+    """Registers the shim as ``RPi.GPIO`` (and ``RPi``) and returns it."""
+    global _current_shim
+    shim = _GPIOShim(recorder)
+    _current_shim = shim
+    package = types.ModuleType("RPi")
+    package.__path__ = []
+    module = types.ModuleType("RPi.GPIO")
+    for name in dir(shim):
+        if not name.startswith("_"):
+            setattr(module, name, getattr(shim, name))
+    package.GPIO = module
+    sys.modules["RPi"] = package
+    sys.modules["RPi.GPIO"] = module
+    return shim
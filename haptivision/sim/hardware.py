@@ -0,0 +1,133 @@
+"""Wires the fake LiDAR, fake pigpio daemon and RPi.GPIO shim into one simulated Pi."""
+import os
+import runpy
+import signal
+import sys
+import time
+from contextlib import contextmanager
+
+from . import tfluna
+from .gpio import PinRecorder, PwmUpdate, install_rpi_gpio
+from .pigpiod import FakePigpiod
+from .scene import Scene, load_scene
+from .tfluna import ServoPose, TFLunaEmulator
+
+PAN_PIN, TILT_PIN = 17, 18 # servo1 / servo2 in the scripts
+MOTOR_PINS = {"left": 5, "center": 13, "right": 6}
+
+
+class SimulatedHardware:
+    """Everything a navigation script expects to find on the Pi.
+
+    Servo PWM seen by the fake daemon moves the emulated sensor head, so the
+    LiDAR answers for wherever the script pointed it.  A sweep is counted each
+    time the tilt servo returns to where it was when the first LiDAR read
+    happened (its home position).
+    """
+
+    def __init__(self, scene="room", seed=None, clock=time.monotonic, sleep=time.sleep,
+                 servo_min_pulse=0.0005, servo_max_pulse=0.0025, slew_rate=600.0, max_events=None,
+                 **lidar_options):
+        if not isinstance(scene, Scene):
+            scene = load_scene(scene)
+        self.clock = clock
+        self.recorder = PinRecorder(clock=clock, max_events=max_events)
+        self.pose = ServoPose(slew_rate=slew_rate, clock=clock)
+        self.lidar = TFLunaEmulator(scene, self.pose, seed=seed, clock=clock, sleep=sleep, **lidar_options)
+        self.daemon = FakePigpiod(self.recorder, clock=clock)
+        self.gpio = None
+        self.servo_mid = (servo_min_pulse + servo_max_pulse) / 2.0
+        self.servo_half_span = (servo_max_pulse - servo_min_pulse) / 2.0
+        self.sweeps = 0
+        self.sweep_times = []
+        self._tilt_home = None
+        self._tilt_last = None
+        self._sweep_listeners = []
+        self.recorder.add_listener(self._on_pin_event)
+
+    @property
+    def scene(self):
+        return self.lidar.scene
+
+    def start(self):
+        self.daemon.start()
+        os.environ["PIGPIO_ADDR"] = self.daemon.address[0]
+        os.environ["PIGPIO_PORT"] = str(self.daemon.port)
+        os.environ["GPIOZERO_PIN_FACTORY"] = "pigpio" # So plain LED(5) also goes through the fake daemon
+        if not os.environ.get("DISPLAY"):
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy") # No speakers either, but pygame.mixer still runs
+        tfluna.install(self.lidar)
+        self.gpio = install_rpi_gpio(self.recorder)
+        return self
+
+    def stop(self):
+        tfluna.detach()
+        self.daemon.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_sweep_listener(self, func): # func(sweep_count)
+        self._sweep_listeners.append(func)
+
+    def servo_value(self, event): # gpiozero Servo.value for a PWM update, None when detached
+        if not event.frequency or not event.duty:
+            return None
+        return (event.duty / event.frequency - self.servo_mid) / self.servo_half_span
+
+    def _on_pin_event(self, event):
+        if not isinstance(event, PwmUpdate) or event.pin not in (PAN_PIN, TILT_PIN):
+            return
+        value = self.servo_value(event)
+        if value is None:
+            return
+        if event.pin == PAN_PIN:
+            self.pose.set_servo_value("pan", value)
+            return
+        self.pose.set_servo_value("tilt", value)
+        value = round(value, 3)
+        if self.lidar.transactions == 0: # Still homing
+            self._tilt_home = value
+        elif value == self._tilt_home and self._tilt_last != self._tilt_home:
+            self.sweeps += 1
+            self.sweep_times.append(event.t)
+            for func in self._sweep_listeners:
+                func(self.sweeps)
+        self._tilt_last = value
+
+    def run_script(self, path, sweeps=None):
+        """Runs a navigation script in this process; with ``sweeps`` it is asked to quit after that many."""
+        if sweeps is not None:
+            self.add_sweep_listener(lambda n: n >= sweeps and _post_quit())
+        argv, sys.argv = sys.argv, [path]
+        sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+        try:
+            runpy.run_path(path, run_name="__main__")
+        finally:
+            sys.path.pop(0)
+            sys.argv = argv
+
+
+def _post_quit(): # pygame.event.post is safe from other threads once the script ran pygame.init()
+    pygame = sys.modules.get("pygame")
+    if pygame is not None and pygame.get_init():
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+    else: # Headless, no event queue: Ctrl-C, which the navigation runtime turns into its normal stop
+        os.kill(os.getpid(), signal.SIGINT)
+
+
+@contextmanager
+def restored_environ(*names): # The benches set HAPTIVISION_* for the script; the caller's values come back after
+    saved = {name: os.environ.get(name) for name in names}
+    try:
+        yield os.environ
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
@@ -0,0 +1,379 @@
+"""Local stand-in for the pigpio daemon.
+
+Speaks enough of the pigpiod socket protocol (16 byte ``cmd, p1, p2, p3``
+requests, 16 byte replies, 12 byte notification reports) for the real
+``pigpio`` client and gpiozero's ``PiGPIOFactory`` to drive servos and
+outputs against it.  Every level change and PWM update is written to a
+``PinRecorder`` with a timestamp.
+
+Waveforms (``wave_add_generic``, ``wave_create``, ``wave_send_*``) are played
+back lazily: each command first replays the pulses that came due since the
+last one, recording every edge at the time the DMA engine would have made
+it.  Pulses added with ``wave_add_generic`` are appended one after another
+rather than merged by their start time, which is all one call per waveform
+needs.
+
+    recorder = PinRecorder()
+    daemon = FakePigpiod(recorder).start()   # listens on 127.0.0.1, free port
+    os.environ["PIGPIO_PORT"] = str(daemon.port)
+"""
+import itertools
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+from .gpio import PinRecorder
+
+# Command numbers from pigpio.py
+CMD_MODES, CMD_MODEG, CMD_PUD, CMD_READ, CMD_WRITE = 0, 1, 2, 3, 4
+CMD_PWM, CMD_PRS, CMD_PFS, CMD_SERVO, CMD_WDOG = 5, 6, 7, 8, 9
+CMD_BR1, CMD_BR2, CMD_BC1, CMD_BC2, CMD_BS1, CMD_BS2 = 10, 11, 12, 13, 14, 15
+CMD_TICK, CMD_HWVER, CMD_NO, CMD_NB, CMD_NP, CMD_NC = 16, 17, 18, 19, 20, 21
+CMD_PRG, CMD_PFG, CMD_PRRG, CMD_PIGPV = 22, 23, 24, 26
+CMD_GDC, CMD_GPW, CMD_FG, CMD_NOIB, CMD_EVM = 83, 84, 97, 99, 115
+CMD_WVCLR, CMD_WVAG, CMD_WVBSY, CMD_WVHLT = 27, 28, 32, 33
+CMD_WVCRE, CMD_WVDEL, CMD_WVTX, CMD_WVTXR, CMD_WVNEW, CMD_WVTXM, CMD_WVTAT = 49, 50, 51, 52, 53, 100, 101
+
+INPUT, OUTPUT = 0, 1
+PUD_OFF, PUD_DOWN, PUD_UP = 0, 1, 2
+PI_BAD_GPIO = -3
+PI_BAD_DUTYCYCLE = -8
+PI_BAD_PULSEWIDTH = -7
+PI_BAD_HANDLE = -25
+PI_BAD_WAVE_MODE = -33
+PI_BAD_WAVE_ID = -66
+PI_EMPTY_WAVEFORM = -69
+NO_TX_WAVE = 9999
+PI_UNKNOWN_COMMAND = -88
+
+PWM_FREQUENCIES = (8000, 4000, 2000, 1600, 1000, 800, 500, 400, 320, 250, 200, 160, 100, 80, 50, 40, 20, 10)
+WAVE_MODE_ONE_SHOT, WAVE_MODE_REPEAT, WAVE_MODE_ONE_SHOT_SYNC, WAVE_MODE_REPEAT_SYNC = range(4)
+HARDWARE_REVISION = 0xa02082 # Raspberry Pi 3 Model B
+PIGPIO_VERSION = 79
+
+
+class PinState:
+    __slots__ = ("mode", "pud", "level", "pwm_range", "pwm_frequency", "dutycycle", "pulsewidth")
+
+    def __init__(self):
+        self.mode = INPUT
+        self.pud = PUD_OFF
+        self.level = 0
+        self.pwm_range = 255
+        self.pwm_frequency = 800
+        self.dutycycle = 0
+        self.pulsewidth = 0
+
+
+class FakePigpiod:
+    def __init__(self, recorder=None, host="127.0.0.1", port=0, clock=time.monotonic):
+        self.recorder = recorder if recorder is not None else PinRecorder(clock=clock)
+        self.clock = clock
+        self.pins = [PinState() for _ in range(54)]
+        self.commands = 0
+        self._t0 = clock()
+        self._lock = threading.RLock()
+        self._notifiers = {} # handle -> [socket, monitored bits, sequence]
+        self._next_handle = 0
+        self._new_wave = [] # Pulses (gpio_on, gpio_off, delay_us) added since the last wave_create
+        self.waves = {} # wave id -> tuple of pulses
+        self._tx = None # [wave id, time of the next pulse, its index, repeat] while a wave is transmitting
+        self._tx_next = None # (wave id, repeat) waiting for the current cycle to end
+        self._server = _Server((host, port), _Handler)
+        self._server.daemon_state = self
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-pigpiod", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._advance(self.clock())
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            for sock, _, _ in self._notifiers.values():
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self._notifiers.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def tick(self): # Microseconds since the daemon started, wrapping like the real 32 bit tick
+        return int((self.clock() - self._t0) * 1e6) & 0xFFFFFFFF
+
+    def levels(self):
+        return sum(pin.level << i for i, pin in enumerate(self.pins[:32]))
+
+    # Pin changes ---------------------------------------------------------
+
+    def _set_level(self, gpio, level, source, t=None):
+        pin = self.pins[gpio]
+        if pin.level == level:
+            return
+        pin.level = level
+        self.recorder.level(gpio, level, source, t)
+        self._report(1 << gpio)
+
+    def _stop_pwm(self, gpio):
+        pin = self.pins[gpio]
+        if pin.dutycycle or pin.pulsewidth:
+            pin.dutycycle = pin.pulsewidth = 0
+            self.recorder.pwm(gpio, pin.pwm_frequency, 0.0, "pigpio")
+
+    def _record_pwm(self, gpio):
+        pin = self.pins[gpio]
+        self.recorder.pwm(gpio, pin.pwm_frequency, pin.dutycycle / pin.pwm_range, "pigpio")
+
+    def drive_input(self, gpio, level): # Simulation side: an external signal on an input pin
+        with self._lock:
+            self._set_level(gpio, 1 if level else 0, "external")
+
+    def _report(self, changed_bits):
+        levels = self.levels()
+        tick = self.tick()
+        for handle, notifier in list(self._notifiers.items()):
+            sock, bits, seq = notifier
+            if not bits & changed_bits:
+                continue
+            notifier[2] = (seq + 1) & 0xFFFF
+            try:
+                sock.sendall(struct.pack("HHII", seq, 0, tick, levels))
+            except OSError:
+                self._notifiers.pop(handle, None)
+
+    # Waveforms -----------------------------------------------------------
+
+    def _advance(self, now): # Applies the wave pulses due up to now
+        while self._tx is not None:
+            wave_id, t, index, repeat = self._tx
+            if t > now:
+                return
+            pulses = self.waves[wave_id]
+            if index == len(pulses): # End of a cycle: a synced wave takes over here
+                if self._tx_next is not None:
+                    self._tx = [self._tx_next[0], t, 0, self._tx_next[1]]
+                    self._tx_next = None
+                elif repeat and any(delay for _, _, delay in pulses):
+                    self._tx[2] = 0
+                else:
+                    self._tx = None
+                continue
+            on, off, delay = pulses[index]
+            for gpio in range(32):
+                if on & (1 << gpio):
+                    self._set_level(gpio, 1, "pigpio wave", t)
+                elif off & (1 << gpio):
+                    self._set_level(gpio, 0, "pigpio wave", t)
+            self._tx[1:3] = t + delay / 1e6, index + 1
+
+    def _send_wave(self, wave_id, mode):
+        if wave_id not in self.waves:
+            return PI_BAD_WAVE_ID
+        if mode not in (WAVE_MODE_ONE_SHOT, WAVE_MODE_REPEAT, WAVE_MODE_ONE_SHOT_SYNC, WAVE_MODE_REPEAT_SYNC):
+            return PI_BAD_WAVE_MODE
+        repeat = mode in (WAVE_MODE_REPEAT, WAVE_MODE_REPEAT_SYNC)
+        if mode >= WAVE_MODE_ONE_SHOT_SYNC and self._tx is not None:
+            self._tx_next = (wave_id, repeat)
+        else:
+            self._tx = [wave_id, self.clock(), 0, repeat]
+            self._tx_next = None
+            self._advance(self.clock())
+        return 3 * len(self.waves[wave_id]) # DMA control blocks, roughly
+
+    def _wave_command(self, cmd, p1, p2, ext):
+        if cmd == CMD_WVNEW:
+            self._new_wave = []
+            return 0
+        if cmd == CMD_WVAG:
+            self._new_wave.extend(struct.iter_unpack("III", ext))
+            return len(self._new_wave)
+        if cmd == CMD_WVCRE:
+            if not self._new_wave:
+                return PI_EMPTY_WAVEFORM
+            wave_id = next(i for i in itertools.count() if i not in self.waves)
+            self.waves[wave_id] = tuple(self._new_wave)
+            self._new_wave = []
+            return wave_id
+        if cmd == CMD_WVDEL:
+            if p1 not in self.waves:
+                return PI_BAD_WAVE_ID
+            if self._tx is not None and self._tx[0] == p1:
+                self._tx = None
+            del self.waves[p1]
+            return 0
+        if cmd == CMD_WVCLR:
+            self.waves.clear()
+            self._new_wave = []
+            self._tx = self._tx_next = None
+            return 0
+        if cmd == CMD_WVHLT:
+            self._tx = self._tx_next = None
+            return 0
+        if cmd == CMD_WVBSY:
+            return 1 if self._tx is not None else 0
+        if cmd == CMD_WVTAT:
+            return self._tx[0] if self._tx is not None else NO_TX_WAVE
+        if cmd == CMD_WVTX:
+            return self._send_wave(p1, WAVE_MODE_ONE_SHOT)
+        if cmd == CMD_WVTXR:
+            return self._send_wave(p1, WAVE_MODE_REPEAT)
+        return self._send_wave(p1, p2) # CMD_WVTXM
+
+    # Command dispatch ----------------------------------------------------
+
+    def execute(self, cmd, p1, p2, ext, sock):
+        with self._lock:
+            self.commands += 1
+            self._advance(self.clock())
+            if cmd == CMD_NOIB:
+                handle = self._next_handle
+                self._next_handle += 1
+                self._notifiers[handle] = [sock, 0, 0]
+                return handle
+            if cmd in (CMD_NB, CMD_NP, CMD_NC):
+                if p1 not in self._notifiers:
+                    return PI_BAD_HANDLE
+                if cmd == CMD_NB:
+                    self._notifiers[p1][1] = p2
+                elif cmd == CMD_NP:
+                    self._notifiers[p1][1] = 0
+                else:
+                    del self._notifiers[p1]
+                return 0
+            if cmd == CMD_TICK:
+                return self.tick()
+            if cmd == CMD_HWVER:
+                return HARDWARE_REVISION
+            if cmd == CMD_PIGPV:
+                return PIGPIO_VERSION
+            if cmd == CMD_BR1:
+                return self.levels()
+            if cmd == CMD_BR2:
+                return 0
+            if cmd in (CMD_BC1, CMD_BS1):
+                for gpio in range(32):
+                    if p1 & (1 << gpio):
+                        self._set_level(gpio, 1 if cmd == CMD_BS1 else 0, "pigpio")
+                return 0
+            if cmd in (CMD_BC2, CMD_BS2, CMD_WDOG, CMD_FG, CMD_EVM, CMD_NO):
+                return 0
+            if cmd in (CMD_WVCLR, CMD_WVAG, CMD_WVBSY, CMD_WVHLT, CMD_WVCRE, CMD_WVDEL, CMD_WVTX, CMD_WVTXR,
+                       CMD_WVNEW, CMD_WVTXM, CMD_WVTAT):
+                return self._wave_command(cmd, p1, p2, ext)
+            return self._pin_command(cmd, p1, p2, ext)
+
+    def _pin_command(self, cmd, gpio, value, ext):
+        if gpio >= len(self.pins):
+            return PI_BAD_GPIO
+        pin = self.pins[gpio]
+        if cmd == CMD_MODES:
+            pin.mode = value
+            return 0
+        if cmd == CMD_MODEG:
+            return pin.mode
+        if cmd == CMD_PUD:
+            pin.pud = value
+            if pin.mode == INPUT and value != PUD_OFF:
+                self._set_level(gpio, 1 if value == PUD_UP else 0, "pull")
+            return 0
+        if cmd == CMD_READ:
+            return pin.level
+        if cmd == CMD_WRITE: # Like pigpiod, a write switches the pin to output and stops PWM/servo
+            pin.mode = OUTPUT
+            self._stop_pwm(gpio)
+            self._set_level(gpio, 1 if value else 0, "pigpio")
+            return 0
+        if cmd == CMD_PWM:
+            if value > pin.pwm_range:
+                return PI_BAD_DUTYCYCLE
+            pin.mode = OUTPUT
+            pin.dutycycle = value
+            pin.pulsewidth = 0
+            self._record_pwm(gpio)
+            return 0
+        if cmd == CMD_PRS:
+            pin.pwm_range = max(25, min(40000, value))
+            if pin.dutycycle:
+                self._record_pwm(gpio)
+            return pin.pwm_range
+        if cmd == CMD_PFS:
+            pin.pwm_frequency = min(PWM_FREQUENCIES, key=lambda f: abs(f - value))
+            if pin.dutycycle:
+                self._record_pwm(gpio)
+            return pin.pwm_frequency
+        if cmd == CMD_SERVO:
+            if value and not 500 <= value <= 2500:
+                return PI_BAD_PULSEWIDTH
+            pin.mode = OUTPUT
+            pin.pulsewidth = value
+            pin.dutycycle = 0
+            self.recorder.pwm(gpio, 50, value / 20000.0, "pigpio servo")
+            return 0
+        if cmd == CMD_PRG or cmd == CMD_PRRG:
+            return pin.pwm_range
+        if cmd == CMD_PFG:
+            return pin.pwm_frequency
+        if cmd == CMD_GDC:
+            return pin.dutycycle
+        if cmd == CMD_GPW:
+            return pin.pulsewidth
+        return PI_UNKNOWN_COMMAND
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def _recv_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            try:
+                chunk = self.request.recv(size - len(data))
+            except OSError: # Client went away (script exited without closing pigpio)
+                return None
+            if not chunk:
+                return None
+            data.extend(chunk)
+        return bytes(data)
+
+    def handle(self):
+        state = self.server.daemon_state
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        notify_handle = None
+        while True:
+            header = self._recv_exact(16)
+            if header is None:
+                break
+            cmd, p1, p2, p3 = struct.unpack("IIII", header)
+            ext = self._recv_exact(p3) if p3 else b""
+            if p3 and ext is None:
+                break
+            if notify_handle is not None and cmd == CMD_NC: # The client closing its notification socket
+                state.execute(CMD_NC, notify_handle, 0, b"", self.request)
+                break
+            with state._lock: # Keep replies from interleaving with notification reports
+                res = state.execute(cmd, p1, p2, ext, self.request)
+                self.request.sendall(struct.pack("IIII", cmd, p1, p2, res & 0xFFFFFFFF))
+            if cmd == CMD_NOIB:
+                notify_handle = res
@@ -0,0 +1,225 @@
+"""Small 3D scenes the TF-Luna emulator ray-casts against.
+
+All lengths are in centimetres, the same unit the TF-Luna reports.  World axes:
+x to the right, y straight ahead, z up, with the floor at z = 0.
+"""
+import json
+import math
+
+EPS = 1e-6
+
+
+class Wall: # Vertical rectangle standing on the floor between two floor points
+    kind = "wall"
+
+    def __init__(self, x1, y1, x2, y2, height=250.0, reflectivity=0.8):
+        self.x1, self.y1, self.x2, self.y2 = float(x1), float(y1), float(x2), float(y2)
+        self.height = float(height)
+        self.reflectivity = float(reflectivity)
+
+    def intersect(self, origin, direction):
+        ox, oy, oz = origin
+        dx, dy, dz = direction
+        ex, ey = self.x2 - self.x1, self.y2 - self.y1
+        denom = dx * ey - dy * ex
+        if abs(denom) < EPS: # Ray parallel to the wall
+            return None
+        fx, fy = self.x1 - ox, self.y1 - oy
+        t = (fx * ey - fy * ex) / denom
+        s = (fx * dy - fy * dx) / denom
+        if t <= EPS or not 0.0 <= s <= 1.0:
+            return None
+        z = oz + t * dz
+        if not 0.0 <= z <= self.height:
+            return None
+        length = math.hypot(ex, ey)
+        cos_inc = abs(dx * ey - dy * ex) / length # |d . n| with n the horizontal wall normal
+        return t, cos_inc, self.reflectivity
+
+    def to_dict(self):
+        return {"type": self.kind, "x1": self.x1, "y1": self.y1, "x2": self.x2, "y2": self.y2,
+                "height": self.height, "reflectivity": self.reflectivity}
+
+
+class Post: # Vertical cylinder: poles, chair legs, or a person with a bigger radius
+    kind = "post"
+
+    def __init__(self, x, y, radius=5.0, height=200.0, reflectivity=0.6):
+        self.x, self.y = float(x), float(y)
+        self.radius = float(radius)
+        self.height = float(height)
+        self.reflectivity = float(reflectivity)
+
+    def intersect(self, origin, direction):
+        ox, oy, oz = origin
+        dx, dy, dz = direction
+        a = dx * dx + dy * dy
+        if a < EPS: # Looking straight up or down
+            return None
+        fx, fy = ox - self.x, oy - self.y
+        b = 2.0 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - self.radius * self.radius
+        disc = b * b - 4.0 * a * c
+        if disc < 0.0:
+            return None
+        t = (-b - math.sqrt(disc)) / (2.0 * a)
+        if t <= EPS:
+            return None
+        z = oz + t * dz
+        if not 0.0 <= z <= self.height:
+            return None
+        nx = (fx + t * dx) / self.radius
+        ny = (fy + t * dy) / self.radius
+        return t, abs(dx * nx + dy * ny), self.reflectivity
+
+    def to_dict(self):
+        return {"type": self.kind, "x": self.x, "y": self.y, "radius": self.radius,
+                "height": self.height, "reflectivity": self.reflectivity}
+
+
+class DropOff: # Rectangular hole in the floor: a curb gap, the top of a stair going down, a ditch
+    kind = "dropoff"
+
+    def __init__(self, x_min, y_min, x_max, y_max, depth=20.0, reflectivity=0.5):
+        self.x_min, self.y_min = float(min(x_min, x_max)), float(min(y_min, y_max))
+        self.x_max, self.y_max = float(max(x_min, x_max)), float(max(y_min, y_max))
+        self.depth = float(depth)
+        self.reflectivity = float(reflectivity)
+
+    def contains(self, x, y):
+        return self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max
+
+    def intersect_below(self, origin, direction, t_enter):
+        # The ray already dropped into the hole at t_enter; find the bottom or the far side face
+        ox, oy, oz = origin
+        dx, dy, dz = direction
+        t_bottom = (-self.depth - oz) / dz
+        x, y = ox + t_bottom * dx, oy + t_bottom * dy
+        if self.contains(x, y):
+            return t_bottom, abs(dz), self.reflectivity
+        best = None
+        for axis, bound in ((0, self.x_min), (0, self.x_max), (1, self.y_min), (1, self.y_max)):
+            d = dx if axis == 0 else dy
+            if abs(d) < EPS:
+                continue
+            t = (bound - (ox if axis == 0 else oy)) / d
+            if not t_enter < t < t_bottom:
+                continue
+            other = oy + t * dy if axis == 0 else ox + t * dx
+            lo, hi = (self.y_min, self.y_max) if axis == 0 else (self.x_min, self.x_max)
+            if lo <= other <= hi and (best is None or t < best[0]):
+                best = (t, abs(d), self.reflectivity)
+        return best
+
+    def to_dict(self):
+        return {"type": self.kind, "x_min": self.x_min, "y_min": self.y_min, "x_max": self.x_max,
+                "y_max": self.y_max, "depth": self.depth, "reflectivity": self.reflectivity}
+
+
+OBJECT_TYPES = {cls.kind: cls for cls in (Wall, Post, DropOff)}
+
+
+class Scene:
+    """Static or scripted world plus the pose of the sensor head in it.
+
+    Objects and the sensor pose are plain attributes, so a scenario can move a
+    post (a person crossing) or walk the sensor forward between reads.
+    """
+
+    def __init__(self, objects=(), sensor_x=0.0, sensor_y=0.0, sensor_height=120.0,
+                 heading=0.0, floor=True, floor_reflectivity=0.7):
+        self.objects = list(objects)
+        self.sensor_x = float(sensor_x)
+        self.sensor_y = float(sensor_y)
+        self.sensor_height = float(sensor_height)
+        self.heading = float(heading) # Degrees, positive turns left, 0 looks along +y
+        self.floor = floor
+        self.floor_reflectivity = float(floor_reflectivity)
+
+    def add(self, obj):
+        self.objects.append(obj)
+        return obj
+
+    def ray(self, pan_deg, tilt_deg): # Pan is positive to the left, tilt positive up
+        yaw = math.radians(self.heading + pan_deg)
+        pitch = math.radians(tilt_deg)
+        direction = (-math.sin(yaw) * math.cos(pitch), math.cos(yaw) * math.cos(pitch), math.sin(pitch))
+        return (self.sensor_x, self.sensor_y, self.sensor_height), direction
+
+    def cast(self, pan_deg, tilt_deg, max_range=800.0):
+        """Returns (distance_cm, cos_incidence, reflectivity) of the first hit, or None."""
+        origin, direction = self.ray(pan_deg, tilt_deg)
+        best = None
+        for obj in self.objects:
+            if isinstance(obj, DropOff):
+                continue
+            hit = obj.intersect(origin, direction)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+
+        if self.floor and direction[2] < -EPS:
+            t_floor = -origin[2] / direction[2]
+            if best is None or t_floor < best[0]:
+                x = origin[0] + t_floor * direction[0]
+                y = origin[1] + t_floor * direction[1]
+                hole = next((o for o in self.objects if isinstance(o, DropOff) and o.contains(x, y)), None)
+                if hole is None:
+                    best = (t_floor, -direction[2], self.floor_reflectivity)
+                else:
+                    hit = hole.intersect_below(origin, direction, t_floor)
+                    if hit is not None and (best is None or hit[0] < best[0]):
+                        best = hit
+
+        if best is None or best[0] > max_range:
+            return None
+        return best
+
+    def to_dict(self):
+        return {"sensor": {"x": self.sensor_x, "y": self.sensor_y, "height": self.sensor_height,
+                           "heading": self.heading},
+                "floor": self.floor, "floor_reflectivity": self.floor_reflectivity,
+                "objects": [obj.to_dict() for obj in self.objects]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sensor = data.get("sensor", {})
+        objects = []
+        for spec in data.get("objects", []):
+            spec = dict(spec)
+            kind = spec.pop("type")
+            if kind not in OBJECT_TYPES:
+                raise ValueError(f"Unknown scene object type: {kind!r}")
+            objects.append(OBJECT_TYPES[kind](**spec))
+        return cls(objects,
+                   sensor_x=sensor.get("x", 0.0), sensor_y=sensor.get("y", 0.0),
+                   sensor_height=sensor.get("height", 120.0), heading=sensor.get("heading", 0.0),
+                   floor=data.get("floor", True),
+                   floor_reflectivity=data.get("floor_reflectivity", 0.7))
+
+
+def room(width=400.0, depth=600.0, height=250.0, behind=50.0): # Four walls around the sensor
+    half = width / 2.0
+    return [Wall(-half, depth, half, depth, height), # Front
+            Wall(-half, -behind, -half, depth, height), # Left
+            Wall(half, -behind, half, depth, height), # Right
+            Wall(-half, -behind, half, -behind, height)] # Back
+
+
+def builtin_scenes():
+    return {
+        "empty": lambda: Scene(),
+        "room": lambda: Scene(room()),
+        "hallway": lambda: Scene(room(width=180, depth=1000) + [Post(-60, 250, radius=20, height=175)]),
+        "posts": lambda: Scene(room(width=600, depth=800) + [Post(-80, 150, 3, 80), Post(40, 120, 3, 80),
+                                                             Post(100, 300, 8, 250)]),
+        "curb": lambda: Scene(room(width=800, depth=1200) + [DropOff(-400, 150, 400, 400, depth=15)]),
+        "stairs": lambda: Scene(room(width=300, depth=800) + [DropOff(-150, 120, 150, 800, depth=180)]),
+    }
+
+
+def load_scene(name_or_path): # A built-in scene name or the path of a JSON file written by Scene.to_dict()
+    scenes = builtin_scenes()
+    if name_or_path in scenes:
+        return scenes[name_or_path]()
+    with open(name_or_path) as f:
+        return Scene.from_dict(json.load(f))
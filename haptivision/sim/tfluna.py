@@ -0,0 +1,253 @@
+"""I2C-level TF-Luna emulator and a drop-in fake of the bits of smbus2 the scripts use.
+
+The navigation scripts talk to the LiDAR like this::
+
+    write = i2c_msg.write(address, [1, 2, 7])
+    read = i2c_msg.read(address, 7)
+    with SMBus(1) as bus:
+        bus.i2c_rdwr(write, read)
+        data = list(read)          # [trig, mode, dist_l, dist_h, amp_l, amp_h, 0]
+
+``install()`` puts a fake ``smbus2`` module in ``sys.modules`` whose ``SMBus``
+routes that exchange to a ``TFLunaEmulator``.  The emulator ray-casts the
+current pan/tilt angles against a ``Scene`` and answers with a 7 byte frame,
+so ``read_lidar_points`` and everything after it run unchanged.
+"""
+import errno
+import math
+import random
+import sys
+import threading
+import time
+import types
+
+from .scene import Scene
+
+I2C_M_RD = 0x0001
+TFLUNA_ADDRESS = 0x10
+READ_FRAME_CMD = (1, 2, 7) # Benewake "obtain data frame" command, answered with 7 bytes
+DIST_MODE_LONG = 0x07
+
+
+class ServoPose:
+    """Pan/tilt angles of the sensor head, following servo commands at a finite slew rate.
+
+    Angles are in degrees: pan positive to the left, tilt positive up, which
+    matches gpiozero ``Servo.value * 90`` for the way servo1/servo2 are mounted.
+    """
+
+    def __init__(self, pan=0.0, tilt=0.0, slew_rate=600.0, clock=time.monotonic):
+        self.slew_rate = float(slew_rate) # deg/s, ~0.1 s/60 deg for an SG90/MG90 class servo
+        self.clock = clock
+        now = clock()
+        self._axes = {"pan": [pan, pan, now], "tilt": [tilt, tilt, now]} # from, target, command time
+        self._lock = threading.Lock()
+
+    def _position(self, axis, now):
+        start, target, t0 = self._axes[axis]
+        if self.slew_rate <= 0:
+            return target
+        travel = self.slew_rate * (now - t0)
+        if travel >= abs(target - start):
+            return target
+        return start + math.copysign(travel, target - start)
+
+    def command(self, axis, degrees):
+        with self._lock:
+            now = self.clock()
+            self._axes[axis] = [self._position(axis, now), float(degrees), now]
+
+    def set_pan(self, degrees):
+        self.command("pan", degrees)
+
+    def set_tilt(self, degrees):
+        self.command("tilt", degrees)
+
+    def set_servo_value(self, axis, value): # gpiozero Servo.value in -1..1
+        self.command(axis, 90.0 * value)
+
+    def target(self, axis): # Last commanded angle, wherever the head is right now
+        with self._lock:
+            return self._axes[axis][1]
+
+    def angles(self):
+        with self._lock:
+            now = self.clock()
+            return self._position("pan", now), self._position("tilt", now)
+
+
+class TFLunaEmulator:
+    """Answers TF-Luna I2C transactions with frames ray-cast from a scene.
+
+    The sensor produces a new measurement every ``1 / frame_rate`` seconds; reads
+    in between return the last frame with the trigger flag cleared, like the
+    real device when it is polled faster than its output rate.
+    """
+
+    def __init__(self, scene=None, pose=None, address=TFLUNA_ADDRESS, frame_rate=100.0,
+                 latency=0.0012, latency_jitter=0.0002, noise_cm=2.0, noise_frac=0.01,
+                 min_range=20, max_range=800, amp_scale=8000.0, dropout_rate=0.0,
+                 error_rate=0.0, seed=None, clock=time.monotonic, sleep=time.sleep):
+        self.scene = scene if scene is not None else Scene()
+        self.pose = pose if pose is not None else ServoPose(clock=clock)
+        self.address = address
+        self.frame_period = 1.0 / frame_rate
+        self.latency = latency # Seconds per i2c_rdwr at 100 kHz (3 byte write + 7 byte read)
+        self.latency_jitter = latency_jitter
+        self.noise_cm = noise_cm
+        self.noise_frac = noise_frac
+        self.min_range = min_range
+        self.max_range = max_range
+        self.amp_scale = amp_scale # Amp of a white target head-on at 1 m
+        self.dropout_rate = dropout_rate
+        self.error_rate = error_rate # Probability of an OSError (NACK) per transaction
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.sleep = sleep
+        self.transactions = 0
+        self.errors = 0
+        self._command = None
+        self._frame_index = None
+        self._frame = bytes(7)
+
+    def measure(self, pan_deg, tilt_deg): # One noisy (distance_cm, amp) sample, (0, amp) when unreliable
+        hit = self.scene.cast(pan_deg, tilt_deg, self.max_range)
+        if hit is None or self.rng.random() < self.dropout_rate:
+            return 0, self.rng.randint(0, 60)
+        distance, cos_inc, reflectivity = hit
+        meters = max(distance, self.min_range) / 100.0
+        amp = int(self.amp_scale * reflectivity * max(cos_inc, 0.05) / (meters * meters))
+        if amp < 100: # Below this the TF-Luna flags the reading as unreliable and outputs 0
+            return 0, amp
+        sigma = self.noise_cm + self.noise_frac * distance
+        distance = int(round(distance + self.rng.gauss(0.0, sigma)))
+        return max(self.min_range, min(self.max_range, distance)), min(amp, 65535)
+
+    def _current_frame(self):
+        now = self.clock()
+        index = int(now / self.frame_period)
+        if index == self._frame_index:
+            return bytes((0,)) + self._frame[1:] # Same measurement, trigger flag cleared
+        self._frame_index = index
+        dist, amp = self.measure(*self.pose.angles())
+        self._frame = bytes((1, DIST_MODE_LONG, dist & 0xFF, dist >> 8, amp & 0xFF, amp >> 8, 0))
+        return self._frame
+
+    def write(self, data):
+        self._command = tuple(data)
+
+    def read(self, length):
+        if self._command != READ_FRAME_CMD:
+            return bytes(length)
+        return self._current_frame()[:length].ljust(length, b"\0")
+
+    def transfer(self, msgs): # Called once per i2c_rdwr(); pays the bus time, then plays the messages
+        self.transactions += 1
+        delay = self.latency + self.rng.uniform(-self.latency_jitter, self.latency_jitter)
+        if delay > 0:
+            self.sleep(delay)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")
+        for msg in msgs:
+            if msg.flags & I2C_M_RD:
+                msg.buf[:] = self.read(msg.len)
+            else:
+                self.write(msg.buf)
+
+
+class i2c_msg: # Same surface as smbus2.i2c_msg for what the scripts touch
+    def __init__(self, addr, flags, buf):
+        self.addr = addr
+        self.flags = flags
+        self.buf = buf
+
+    @property
+    def len(self):
+        return len(self.buf)
+
+    @staticmethod
+    def write(address, buf):
+        return i2c_msg(address, 0, bytearray(buf))
+
+    @staticmethod
+    def read(address, length):
+        return i2c_msg(address, I2C_M_RD, bytearray(length))
+
+    def __iter__(self):
+        return iter(self.buf)
+
+    def __len__(self):
+        return len(self.buf)
+
+    def __bytes__(self):
+        return bytes(self.buf)
+
+    def __repr__(self):
+        return f"i2c_msg({self.addr:#04x}, {self.flags}, {list(self.buf)})"
+
+
+_devices = {} # (bus, address) -> emulator
+_open_handles = 0 # Number of fake SMBus objects currently open, like /dev/i2c-N descriptors
+_handle_lock = threading.Lock()
+
+
+def attach(device, bus=1, address=None):
+    _devices[(bus, device.address if address is None else address)] = device
+    return device
+
+
+def detach(bus=1, address=TFLUNA_ADDRESS):
+    _devices.pop((bus, address), None)
+
+
+def open_handles():
+    return _open_handles
+
+
+class SMBus:
+    def __init__(self, bus=None, force=False):
+        self.bus = None
+        if bus is not None:
+            self.open(bus)
+
+    def open(self, bus):
+        global _open_handles
+        if not any(key[0] == bus for key in _devices):
+            raise FileNotFoundError(errno.ENOENT, f"No such file or directory: '/dev/i2c-{bus}'")
+        if self.bus is None:
+            with _handle_lock:
+                _open_handles += 1
+        self.bus = bus
+
+    def close(self):
+        global _open_handles
+        if self.bus is not None:
+            with _handle_lock:
+                _open_handles -= 1
+            self.bus = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def i2c_rdwr(self, *msgs):
+        device = _devices.get((self.bus, msgs[0].addr)) if msgs else None
+        if device is None:
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")
+        device.transfer(msgs)
+
+
+def install(device=None, bus=1):
+    """Registers the fake as ``smbus2`` so ``from smbus2 import SMBus, i2c_msg`` picks it up."""
+    if device is not None:
+        attach(device, bus)
+    module = types.ModuleType("smbus2")
+    module.SMBus = SMBus
+    module.i2c_msg = i2c_msg
+    module.I2C_M_RD = I2C_M_RD
+    module.__doc__ = "HaptiVision fake smbus2 (haptivision.sim.tfluna)"
+    sys.modules["smbus2"] = module
+    return module
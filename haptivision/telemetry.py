@@ -0,0 +1,207 @@
+"""Binary session log of every zone update, plus a rate-limited console summary.
+
+A session file is a 64 byte header followed by fixed-size little-endian
+records, one per zone update::
+
+    t         f8      monotonic time of the first sample (s)
+    seq       u4      record sequence number
+    zone      u1      position index in the sweep (0..11)
+    label     u1      zone label number (1 for "1st" ... 12 for "12th")
+    verdict   u1      zone priority: GREEN 0, YELLOW 1, GREY 2, RED 3
+    n         u1      number of valid samples
+    pan       f4      servo1 command
+    tilt      f4      servo2 command
+    motors    u1[3]   motor priorities (left, center, right)
+    dt        f4[N]   sample time offsets from t (s)
+    dist      u2[N]   distances (cm)
+    strength  u2[N]   signal strengths
+
+The loop copies each update straight into a preallocated ring of records
+with the same numpy layout as the file, and a background writer thread
+writes the filled part of the ring out as raw bytes, so logging neither
+allocates nor takes a lock.  ``SessionLog`` memory-maps a file into a numpy
+structured array.
+"""
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+from .zones import PRIORITY_NAMES, ZONE_LABELS
+
+MAGIC = b"HVTL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIdd") # magic, version, samples per record, record size, wall start, monotonic start
+HEADER_SIZE = 64
+VERDICT_NAMES = PRIORITY_NAMES
+
+
+def record_dtype(samples):
+    import numpy as np
+    return np.dtype([("t", "<f8"), ("seq", "<u4"), ("zone", "u1"), ("label", "u1"), ("verdict", "u1"),
+                     ("n", "u1"), ("pan", "<f4"), ("tilt", "<f4"), ("motors", "u1", (3,)),
+                     ("dt", "<f4", (samples,)), ("dist", "<u2", (samples,)), ("strength", "<u2", (samples,))])
+
+
+def default_session_path(directory="sessions"):
+    return os.path.join(directory, time.strftime("session-%Y%m%d-%H%M%S.hvt"))
+
+
+class TelemetryWriter:
+    def __init__(self, path, samples=20, max_queue=4096, flush_interval=0.25):
+        import numpy as np
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.samples = samples
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.queued = 0
+        self._np = np
+        self._ring = np.zeros(max_queue, record_dtype(samples)) # Oldest records are dropped if the writer falls behind
+        self._columns = tuple(self._ring[name] for name in self._ring.dtype.names)
+        self._next = 0 # Sequence number of the next record for the writer thread
+        self._f8 = np.zeros(samples) # Scratch for the casts into the record, so log() does not allocate
+        self._i4 = np.zeros(samples, np.int32)
+        self._label_ids = {label: i + 1 for i, label in enumerate(ZONE_LABELS)}
+        self._stop = False
+        self._wake = threading.Event()
+        self._file = open(path, "wb")
+        header = HEADER.pack(MAGIC, VERSION, samples, self._ring.itemsize, time.time(), time.monotonic())
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self):
+        return self._next - self.written
+
+    def log(self, zone, label, pan, tilt, dist, strengths, times, verdict, motors):
+        """Copies one zone update into the ring; the sample arrays can be reused right after."""
+        np = self._np
+        slot = self.queued % len(self._ring)
+        t, seq, zones, labels, verdicts, counts, pans, tilts, motor_rows, dt, dists, strength_rows = self._columns
+        n = min(len(dist), self.samples)
+        t0 = times[0] if len(times) else 0.0
+        t[slot] = t0
+        seq[slot] = self.queued & 0xFFFFFFFF
+        zones[slot] = zone
+        labels[slot] = self._label_ids[label] if isinstance(label, str) else label
+        verdicts[slot] = verdict
+        counts[slot] = n
+        pans[slot] = pan
+        tilts[slot] = tilt
+        motor_rows[slot] = motors
+        if n == self.samples and len(times) == n and len(strengths) == n:
+            np.subtract(times, t0, out=self._f8)
+            np.copyto(dt[slot], self._f8, casting="unsafe")
+            np.copyto(self._i4, dist, casting="unsafe")
+            np.minimum(self._i4, 0xFFFF, out=self._i4)
+            np.copyto(dists[slot], self._i4, casting="unsafe")
+            np.copyto(strength_rows[slot], strengths, casting="unsafe")
+        else: # Short or failed read: zero the tail of the record
+            dt[slot] = 0
+            dists[slot] = 0
+            strength_rows[slot] = 0
+            m = min(len(times), n)
+            dt[slot, :m] = np.subtract(times[:m], t0)
+            dists[slot, :n] = np.minimum(dist[:n], 0xFFFF)
+            m = min(len(strengths), n)
+            strength_rows[slot, :m] = strengths[:m]
+        self.queued += 1 # Publishes the record to the writer thread
+
+    def _drain(self):
+        size = len(self._ring)
+        head = self.queued
+        start = max(self._next, head - size)
+        if start >= head:
+            return
+        first, last = start % size, (head - 1) % size + 1
+        if first < last:
+            data = self._ring[first:last].tobytes()
+        else:
+            data = self._ring[first:].tobytes() + self._ring[:last].tobytes()
+        valid = max(start, self.queued + 1 - size) # Slots the loop may have reused while they were copied
+        if valid >= head:
+            self._next = head
+            return
+        self._file.write(data[(valid - start) * self._ring.itemsize:])
+        self._file.flush()
+        self.written += head - valid
+        self._next = head
+
+    def _run(self):
+        while True:
+            self._drain()
+            if self._stop and self._next >= self.queued:
+                break
+            self._wake.wait(self.flush_interval)
+
+    def close(self):
+        if self._stop:
+            return
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+
+
+class SessionLog:
+    """Read side: ``SessionLog(path).records`` is a numpy memmap of the records."""
+
+    def __init__(self, path):
+        import numpy as np
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, samples, record_size, wall_start, mono_start = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a HaptiVision session log")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported session log version {version}")
+        self.samples = samples
+        self.wall_start = wall_start
+        self.mono_start = mono_start
+        dtype = record_dtype(samples)
+        if dtype.itemsize != record_size:
+            raise ValueError(f"{path}: record size {record_size} does not match {dtype.itemsize}")
+        count = (os.path.getsize(path) - HEADER_SIZE) // record_size # A torn last record is ignored
+        if count > 0:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def sample_times(self): # Absolute monotonic time of every sample, shape (records, N)
+        return self.records["t"][:, None] + self.records["dt"]
+
+    def wall_times(self): # Record times as Unix time
+        return self.records["t"] - self.mono_start + self.wall_start
+
+
+class RateLimitedConsole:
+    """Replaces the per-zone print() dumps with one summary line every ``interval`` seconds."""
+
+    def __init__(self, interval=5.0, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.zones = {}
+        self.updates = 0
+        self._last = clock()
+
+    def zone(self, label, nearest_cm, verdict): # nearest_cm: the zone's nearest valid return (zones.nearest_return)
+        self.updates += 1
+        if self.interval <= 0:
+            return
+        self.zones[label] = (nearest_cm, verdict)
+        now = self.clock()
+        if now - self._last < self.interval:
+            return
+        rate = self.updates / (now - self._last)
+        self._last = now
+        self.updates = 0
+        parts = [f"{name}:{VERDICT_NAMES[v][0]}{d}" for name, (d, v) in self.zones.items()]
+        print(f"[{rate:.1f} zones/s] min cm per zone " + " ".join(parts))
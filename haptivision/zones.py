@@ -0,0 +1,126 @@
+"""Zone layout of the navigation sweep and the rules that classify a zone.
+
+Priorities follow the haptic feedback levels used by the scripts:
+RED = 3, GREY = 2, YELLOW = 1, GREEN = 0.
+
+Importing this module does not import numpy; ``ZoneClassifier`` does when
+one is made.
+"""
+
+ZONE_LABELS = ("1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "9th", "10th", "11th", "12th")
+ZONE_IDS = {label: i for i, label in enumerate(ZONE_LABELS)} # Integer zone id, used to index zone state arrays
+
+GREEN_PRIORITY, YELLOW_PRIORITY, GREY_PRIORITY, RED_PRIORITY = 0, 1, 2, 3
+PRIORITY_NAMES = ("GREEN", "YELLOW", "GREY", "RED")
+
+POSITIONS = [(0.16, 0.125, "1st"), (-0.16, 0.125, "2nd"), (-0.5, 0.125, "3rd"), # Servo1 value, delay and zone
+             (-0.16, 0.125, "4th"), (0.16, 0.125, "5th"), (0.5, 0.125, "6th"),  # of each position in a sweep
+             (0.16, 0.125, "7th"), (-0.16, 0.125, "8th"), (-0.5, 0.125, "9th"),
+             (-0.16, 0.125, "4th"), (0.16, 0.125, "5th"), (0.5, 0.125, "6th")]
+TILT_AFTER = {2: -0.2, 5: -0.6, 8: -0.2, 11: 0.1} # Servo2 value set once these positions are done
+HOME = (0.5, 0.1) # Servo1 and servo2 values at start up
+SWEEP_TILTS = (0.1,) * 3 + (-0.2,) * 3 + (-0.6,) * 3 + (-0.2,) * 3 # Servo2 value in force at each position
+
+ZONE_ANGLES = { # Angle ranges for each zone (degrees) 12 in total ( 4 different passes)
+    "1st": (135, 105), "2nd": (105, 75), "3rd": (75, 45),
+    "4th": (45, 75), "5th": (75, 105), "6th": (105, 135),
+    "7th": (135, 105), "8th": (105, 75), "9th": (75, 45),
+    "10th": (45, 75), "11th": (75, 105), "12th": (105, 135),
+}
+
+ZONE_MOTOR = { # Motor that each zone's priority feeds
+    "1st": "left", "6th": "left", "7th": "left",
+    "2nd": "center", "5th": "center", "8th": "center",
+    "3rd": "right", "4th": "right", "9th": "right",
+}
+MOTOR_ZONES = {motor: tuple(label for label, m in ZONE_MOTOR.items() if m == motor)
+               for motor in ("left", "center", "right")}
+
+DISPLAY_ZONE = {label: label for label in ZONE_LABELS} # Square of the navigation panel a zone is painted on
+DISPLAY_ZONE["4th"], DISPLAY_ZONE["6th"] = "6th", "4th" # The middle row is scanned right to left
+SQUARE_ZONE = {square: label for label, square in DISPLAY_ZONE.items()} # Zone painted on each square
+
+FLOOR_ZONES = ("7th", "8th", "9th") # Bottom tilt: no YELLOW warning, GREY for a gap in the floor
+NEAR_CM = 100 # RED below this
+WARN_CM = 200 # YELLOW from NEAR_CM up to this
+GAP_CM = 210 # Floor zones: anything further than this is a GAP (test bench value)
+MIN_HITS = 3 # Samples that must agree before a zone changes colour
+RANGE_CM = 800 # TF-Luna range; anything further is proximity level 0
+
+HAZARD_TESTS = { # Sample tests behind each priority level, used to find the sample where a hazard first showed up
+    RED_PRIORITY: lambda v: v < NEAR_CM,
+    GREY_PRIORITY: lambda v: v > GAP_CM,
+    YELLOW_PRIORITY: lambda v: NEAR_CM <= v < WARN_CM,
+}
+
+
+def proximity_level(nearest_cm): # 0..255, higher is closer
+    nearest_cm = min(max(int(nearest_cm), 0), RANGE_CM)
+    return 255 - nearest_cm * 255 // RANGE_CM
+
+
+def nearest_return(dist): # Nearest valid return (cm) of a sample array; 0 cm is a dropout, RANGE_CM if all are
+    return int(dist.min(initial=RANGE_CM, where=dist > 0))
+
+
+def level_cm(level): # Back to a distance, within RANGE_CM / 255 (about 3 cm)
+    return (255 - level) * RANGE_CM // 255
+
+
+def classify_zone(label, dist):
+    """Priority of one zone from its distance samples (cm)."""
+    if label in FLOOR_ZONES: # Here we know that everything would be below 200mm, so only < 100 and the gap count
+        count_1 = sum(1 for v in dist if v < NEAR_CM)
+        count_2 = sum(1 for v in dist if v > GAP_CM)
+        if count_1 >= MIN_HITS:
+            return RED_PRIORITY
+        elif count_2 >= MIN_HITS:
+            return GREY_PRIORITY
+        return GREEN_PRIORITY
+    count_1 = sum(1 for v in dist if NEAR_CM <= v < WARN_CM)
+    count_2 = sum(1 for v in dist if v < NEAR_CM)
+    if count_2 >= MIN_HITS:
+        return RED_PRIORITY
+    elif count_1 >= MIN_HITS:
+        return YELLOW_PRIORITY
+    return GREEN_PRIORITY
+
+
+def sample_priority(label, d): # The same thresholds applied to a single sample
+    if d < NEAR_CM:
+        return RED_PRIORITY
+    if label in FLOOR_ZONES:
+        return GREY_PRIORITY if d > GAP_CM else GREEN_PRIORITY
+    return YELLOW_PRIORITY if d < WARN_CM else GREEN_PRIORITY
+
+
+class ZoneClassifier:
+    """classify_zone() over a fixed-size numpy sample buffer, without allocating.
+
+    ``levels`` keeps sample_priority() of every sample of the last zone
+    classified; the renderer colours the point cloud from it.
+    """
+
+    def __init__(self, samples=20):
+        import numpy as np
+        self._np = np
+        self.levels = np.zeros(samples, np.uint8)
+        self._mask = np.zeros(samples, bool)
+
+    def __call__(self, label, dist):
+        np, levels, mask = self._np, self.levels, self._mask
+        floor = label in FLOOR_ZONES
+        levels.fill(GREEN_PRIORITY)
+        if floor: # No YELLOW on the floor, only the gap test
+            np.greater(dist, GAP_CM, out=mask)
+            np.copyto(levels, GREY_PRIORITY, where=mask)
+        else:
+            np.less(dist, WARN_CM, out=mask)
+            np.copyto(levels, YELLOW_PRIORITY, where=mask)
+        np.less(dist, NEAR_CM, out=mask)
+        np.copyto(levels, RED_PRIORITY, where=mask)
+        if np.count_nonzero(mask) >= MIN_HITS:
+            return RED_PRIORITY
+        warning = GREY_PRIORITY if floor else YELLOW_PRIORITY
+        np.equal(levels, warning, out=mask)
+        return warning if np.count_nonzero(mask) >= MIN_HITS else GREEN_PRIORITY
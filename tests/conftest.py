@@ -0,0 +1,13 @@
+import signal
+
+import pytest
+
+
+@pytest.fixture
+def signals():
+    """Puts back the handlers StopSignal installs, and cancels a retry timer it left running."""
+    saved = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM)}
+    yield
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    for signum, handler in saved.items():
+        signal.signal(signum, handler)
@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("gpiozero")
+pytest.importorskip("pigpio")
+
+from haptivision.bench import alloc
+from haptivision.runtime import Navigator
+
+
+def test_steady_state_sweep_stays_within_the_allocation_budget(signals):
+    ok, worst = alloc.check(alloc.measure(sweeps=5))
+    assert ok, f"over budget {alloc.BUDGET}: {worst}"
+
+
+def test_a_zone_update_that_keeps_allocating_goes_over_budget(monkeypatch, signals):
+    kept = []
+    zone = Navigator.zone
+
+    def leaky_zone(self, *args):
+        zone(self, *args)
+        kept.append([args]) # Two blocks kept per zone update
+
+    monkeypatch.setattr(Navigator, "zone", leaky_zone)
+    ok, worst = alloc.check(alloc.measure(sweeps=2))
+    assert not ok and worst["allocations"] > alloc.BUDGET["allocations"]
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import haptivision.framebuffer as framebuffer
+from haptivision.framebuffer import FramebufferOutput
+
+WIDTH, HEIGHT = 7, 5
+
+
+def known_surface():
+    surface = pygame.Surface((WIDTH, HEIGHT), 0, 32)
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            surface.set_at((x, y), (x * 37 % 256, y * 61 % 256, (x * y * 23 + 5) % 256))
+    return surface
+
+
+def reference(surface, bpp, layout): # Pixel by pixel, each channel cut to its length and moved to its offset
+    out = np.zeros((HEIGHT, WIDTH), framebuffer.DTYPES[bpp])
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            rgb = surface.get_at((x, y))[:3]
+            out[y, x] = sum((value >> (8 - length)) << offset for value, (offset, length) in zip(rgb, layout))
+    return out
+
+
+@pytest.fixture
+def device(tmp_path, monkeypatch):
+    """A regular file standing in for /dev/fb0, with the geometry and stride its "driver" reports."""
+    def make(bpp, layout, stride):
+        path = tmp_path / f"fb{bpp}"
+        path.write_bytes(b"\xee" * stride * HEIGHT) # Padding bytes must come out untouched
+        monkeypatch.setattr(framebuffer, "screen_info", lambda fd: (WIDTH, HEIGHT, bpp, layout))
+        monkeypatch.setattr(framebuffer, "device_stride", lambda path, width, bpp: stride)
+        return str(path)
+    return make
+
+
+@pytest.mark.parametrize("bpp, layout", [
+    (16, ((11, 5), (5, 6), (0, 5))), # RGB565
+    (32, ((16, 8), (8, 8), (0, 8))), # XRGB8888, the surface's own layout: a plain copy
+    (32, ((0, 8), (8, 8), (16, 8))), # XBGR8888: the channels swap places
+])
+def test_write_converts_to_the_device_layout_and_keeps_the_stride_padding(device, bpp, layout):
+    row = WIDTH * bpp // 8
+    stride = row + 12
+    path = device(bpp, layout, stride)
+    surface = known_surface()
+    output = FramebufferOutput(path)
+    output.write(surface)
+    output.close()
+    data = np.frombuffer(open(path, "rb").read(), np.uint8).reshape(HEIGHT, stride)
+    pixels = data[:, :row].copy().view(framebuffer.DTYPES[bpp])
+    expected = reference(surface, bpp, layout)
+    if bpp == 32: # The X byte is whatever the surface holds there
+        pixels &= 0xFFFFFF
+    np.testing.assert_array_equal(pixels, expected)
+    assert (data[:, row:] == 0xEE).all()
+
+
+def test_file_spec_writes_rgb565_only_inside_the_dirty_rects(tmp_path):
+    surface = known_surface()
+    output = FramebufferOutput.from_spec(f"{tmp_path / 'fb.raw'}:{WIDTH}x{HEIGHT}:16")
+    output.write(surface, dirty=[pygame.Rect(2, 1, 3, 2)])
+    pixels = output.pixels.copy()
+    output.close()
+    expected = np.zeros((HEIGHT, WIDTH), np.uint16)
+    expected[1:3, 2:5] = reference(surface, 16, framebuffer.DEFAULT_LAYOUT[16])[1:3, 2:5]
+    np.testing.assert_array_equal(pixels, expected)
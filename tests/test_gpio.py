@@ -0,0 +1,14 @@
+from haptivision.sim.gpio import PinRecorder
+
+
+def test_write_csv_keeps_both_bounded_logs(tmp_path):
+    t = iter(range(100))
+    recorder = PinRecorder(clock=lambda: float(next(t)), max_events=3)
+    for i in range(3):
+        recorder.level(5, i % 2)
+        recorder.pwm(17, 50, 0.05 + i / 100)
+    path = tmp_path / "pins.csv"
+    recorder.write_csv(path)
+    rows = path.read_text().splitlines()[1:]
+    assert len(rows) == 6 # 3 transitions and 3 PWM updates, not max_events of them in all
+    assert [float(row.split(",")[0]) for row in rows] == sorted(float(row.split(",")[0]) for row in rows)
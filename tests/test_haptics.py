@@ -0,0 +1,31 @@
+import numpy as np
+
+from haptivision.haptics import Arbiter, pwm_setting
+from haptivision.state import ZoneStore
+from haptivision.zones import GREEN_PRIORITY, RED_PRIORITY, YELLOW_PRIORITY, ZONE_IDS, level_cm, nearest_return
+
+
+def update(store, arbiter, label, priority, dist):
+    dist = np.array(dist, np.int32)
+    store.update(ZONE_IDS[label], priority, nearest_return(dist), dist)
+    arbiter.update(ZONE_IDS[label], priority)
+
+
+def test_motor_level_only_from_zones_at_the_motor_priority():
+    store, arbiter = ZoneStore(), Arbiter()
+    update(store, arbiter, "2nd", YELLOW_PRIORITY, [190] * 20) # Far obstacle ahead
+    update(store, arbiter, "8th", GREEN_PRIORITY, [140] * 20) # Floor, nearer but no hazard
+    center = arbiter.motor_of(ZONE_IDS["2nd"])
+    assert arbiter.motor_priority[center] == YELLOW_PRIORITY
+    assert abs(level_cm(arbiter.motor_level(center, store.level)) - 190) <= 4
+    assert pwm_setting(YELLOW_PRIORITY, level_cm(arbiter.motor_level(center, store.level)))[0] < 0.4
+
+
+def test_dropouts_do_not_count_as_the_nearest_return():
+    assert nearest_return(np.array([0, 0, 150, 180], np.int32)) == 150
+    assert nearest_return(np.zeros(20, np.int32)) == 800 # Nothing valid: as far as the sensor reaches
+    store, arbiter = ZoneStore(), Arbiter()
+    update(store, arbiter, "2nd", RED_PRIORITY, [0] + [90] * 19)
+    center = arbiter.motor_of(ZONE_IDS["2nd"])
+    duty, _ = pwm_setting(RED_PRIORITY, level_cm(arbiter.motor_level(center, store.level)))
+    assert duty < 0.6 # 90 cm, not the full strength of a 0 cm return
@@ -0,0 +1,17 @@
+from haptivision.latency import LatencyTracker
+
+
+def test_episode_starts_at_the_first_hazard_sample():
+    t = [10.0]
+    latency = LatencyTracker(clock=lambda: t[0])
+    dist = [300, 300, 40, 40]
+    times = [9.0, 9.1, 9.2, 9.3]
+    latency.classified("zone1", "left", 3, dist, times, lambda cm: 0 < cm < 50)
+    assert latency.seq == len(dist) + 1 # The zone's samples and its verdict
+    episode = latency._pending["left"]
+    assert episode["onset_seq"] == 2 and episode["onset_t"] == 9.2 and episode["result_seq"] == 4
+    t[0] = 10.1
+    latency.commanded("left")
+    t[0] = 10.2
+    latency.actuated("left", True)
+    assert latency.episodes == 1 and abs(latency.latencies[0] - 1.0) < 1e-9
@@ -0,0 +1,66 @@
+import socket
+
+import numpy as np
+import pytest
+
+from haptivision.liveview import LiveViewPublisher, LiveViewReceiver
+from haptivision.state import ZoneStore
+from haptivision.zones import nearest_return
+
+
+@pytest.fixture
+def link():
+    """(publisher, receiving socket, fake clock) on 127.0.0.1."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(2.0)
+    t = [0.0]
+    publisher = LiveViewPublisher(sock.getsockname(), samples=20, rate=10.0, keyframe=1.0, clock=lambda: t[0])
+    yield publisher, sock, t
+    publisher.close()
+    sock.close()
+
+
+def write(store, rng, zones):
+    for zone in zones:
+        dist, levels = rng.integers(0, 800, 20).astype(np.int32), rng.integers(0, 4, 20).astype(np.uint8)
+        store.update(zone, int(rng.integers(0, 4)), nearest_return(dist), dist, levels)
+
+
+def test_a_lost_datagram_is_detected_and_the_next_keyframe_restores_the_frame(link):
+    publisher, sock, t = link
+    rng = np.random.default_rng(0)
+    sent, received = ZoneStore(samples=20), ZoneStore(samples=20)
+    receiver = LiveViewReceiver(received)
+
+    write(sent, rng, range(12))
+    assert publisher.publish(sent) # Keyframe
+    assert receiver.apply(sock.recv(65536))
+    np.testing.assert_array_equal(received.samples_cm, sent.samples_cm)
+
+    t[0] = 0.2
+    write(sent, rng, (1, 4))
+    assert publisher.publish(sent)
+    sock.recv(65536) # Lost on the way
+    frame = received.samples_cm.copy()
+
+    t[0] = 0.4
+    write(sent, rng, (1, 7))
+    assert publisher.publish(sent)
+    assert not receiver.apply(sock.recv(65536)) # Its packet number is one past the next expected
+    assert receiver.lost == 1
+    np.testing.assert_array_equal(received.samples_cm, frame) # No delta applied on top of the gap
+
+    t[0] = 0.6
+    write(sent, rng, (2,))
+    assert publisher.publish(sent)
+    assert not receiver.apply(sock.recv(65536)) # Still waiting for a keyframe
+    np.testing.assert_array_equal(received.samples_cm, frame)
+
+    t[0] = 1.0
+    assert publisher.publish(sent) # Keyframe, nothing changed since the last datagram
+    assert receiver.apply(sock.recv(65536))
+    np.testing.assert_array_equal(received.samples_cm, sent.samples_cm)
+    np.testing.assert_array_equal(received.samples_priority, sent.samples_priority)
+    np.testing.assert_array_equal(received.priority, sent.priority)
+    assert receiver.applied == 2
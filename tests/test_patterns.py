@@ -0,0 +1,92 @@
+import pytest
+
+from haptivision.patterns import (MAX_PULSES, PATTERNS, WAVE_MODE_REPEAT, WAVE_MODE_REPEAT_SYNC, Pattern,
+                                  WavePlayer, compile_pulses, pattern_edges)
+from haptivision.zones import GREEN_PRIORITY, GREY_PRIORITY, RED_PRIORITY, YELLOW_PRIORITY
+
+PINS = (5, 13, 6)
+
+
+def pin_edges(pulses, pin): # [(t_us, level), ...] of one pin over a compiled waveform
+    edges, t = [], 0
+    for on, off, delay in pulses:
+        if on & (1 << pin):
+            edges.append((t, 1))
+        elif off & (1 << pin):
+            edges.append((t, 0))
+        t += delay
+    return edges
+
+
+def test_waveform_covers_the_lcm_of_the_cycles_with_each_motors_own_edges():
+    patterns = [PATTERNS[RED_PRIORITY], PATTERNS[YELLOW_PRIORITY], Pattern("third", RED_PRIORITY, ((0.1, 0.2),))]
+    pulses = compile_pulses(PINS, patterns)
+    cycles = [pattern_edges(p)[1] for p in patterns] # 100 ms, 1 s, 300 ms
+    assert sum(delay for _, _, delay in pulses) == 3_000_000 # Their least common multiple
+    for pin, pattern, cycle in zip(PINS, patterns, cycles):
+        edges, _ = pattern_edges(pattern)
+        expected = [(start + t, level) for start in range(0, 3_000_000, cycle) for t, level in edges]
+        assert pin_edges(pulses, pin) == expected, pattern.name
+
+
+def test_waveform_over_max_pulses_is_refused():
+    fast, slow = Pattern("fast", RED_PRIORITY, ((0.0001, 0.0001),)), Pattern("slow", YELLOW_PRIORITY, ((1.0, 1.0),))
+    assert 2 * 2.0 / 0.0002 > MAX_PULSES
+    with pytest.raises(ValueError):
+        compile_pulses(PINS[:2], [fast, slow])
+
+
+@pytest.fixture
+def player():
+    pigpio = pytest.importorskip("pigpio")
+    from haptivision.sim.clock import VirtualClock
+    from haptivision.sim.pigpiod import FakePigpiod
+    clock = VirtualClock(100.0)
+    with FakePigpiod(clock=clock.monotonic) as daemon:
+        pi = pigpio.pi("127.0.0.1", daemon.port)
+        player = WavePlayer(pi, PINS)
+        player.clock, player.recorder, player.modes = clock, daemon.recorder, []
+        send = pi.wave_send_using_mode
+        pi.wave_send_using_mode = lambda wave_id, mode: (player.modes.append(mode), send(wave_id, mode))[1]
+        yield player
+        player.close()
+        pi.stop()
+
+
+def run(player, seconds): # Lets the waveform play, then has the daemon catch up with it
+    player.clock.advance(seconds)
+    player.pi.get_current_tick()
+
+
+def test_wave_player_drives_the_pins_with_the_patterns(player):
+    assert player.prepare() == len(PATTERNS) ** len(PINS)
+    start = player.clock.monotonic()
+    player.play((RED_PRIORITY, YELLOW_PRIORITY, GREY_PRIORITY))
+    run(player, 2.0)
+    for pin, priority in zip(PINS, (RED_PRIORITY, YELLOW_PRIORITY, GREY_PRIORITY)):
+        (on, off), = PATTERNS[priority].pulses
+        intervals = player.recorder.on_intervals(pin, until=start + 2.0)
+        assert intervals and all(b - a == pytest.approx(on, abs=1e-6) for a, b in intervals[:-1]), pin
+        assert all(b - a == pytest.approx(on + off, abs=1e-6) for (a, _), (b, _) in zip(intervals, intervals[1:]))
+    assert player.recorder.on_intervals(PINS[2], until=start + 2.0) == [(pytest.approx(start), start + 2.0)]
+
+
+def test_escalation_switches_at_once_and_a_wind_down_at_the_end_of_the_waveform(player):
+    player.play((YELLOW_PRIORITY, GREEN_PRIORITY, GREEN_PRIORITY))
+    run(player, 0.5) # Mid-way through YELLOW's 1 s cycle
+    red_t = player.clock.monotonic()
+    player.play((RED_PRIORITY, GREEN_PRIORITY, GREEN_PRIORITY))
+    assert player.modes[-1] == WAVE_MODE_REPEAT
+    assert player.recorder.edges(PINS[0], since=red_t)[0].t == pytest.approx(red_t) # RED starts on the spot
+
+    run(player, 0.025) # 25 ms into RED's first 50 ms pulse
+    player.play((YELLOW_PRIORITY, GREEN_PRIORITY, GREEN_PRIORITY))
+    assert player.modes[-1] == WAVE_MODE_REPEAT_SYNC
+    run(player, 2.0)
+    period = sum(delay for _, _, delay in compile_pulses(PINS, [PATTERNS[RED_PRIORITY], PATTERNS[GREEN_PRIORITY],
+                                                                PATTERNS[GREEN_PRIORITY]])) / 1e6
+    intervals = player.recorder.on_intervals(PINS[0])
+    red = [(a, b) for a, b in intervals if red_t - 1e-6 <= a < red_t + period - 1e-6]
+    assert len(red) == round(period / 0.1) and all(b - a == pytest.approx(0.05) for a, b in red) # Never cut short
+    yellow = intervals[intervals.index(red[-1]) + 1]
+    assert yellow[0] == pytest.approx(red_t + period) and yellow[1] - yellow[0] == pytest.approx(0.2)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import haptivision.render as render
+from haptivision.render import CachedFrame, PointCloud, StaticText, draw_frame, zone_points
+from haptivision.state import ZoneStore
+from haptivision.zones import POSITIONS, ZONE_IDS, sample_priority
+
+
+@pytest.fixture(scope="module")
+def text(): # The SDL dummy driver: fonts and surfaces, no window
+    pygame.font.init()
+    yield StaticText()
+    pygame.font.quit()
+
+
+def frames(count, seed=0):
+    """ZoneStores of ``count`` successive frames, every zone read again with new distances each time."""
+    rng = np.random.default_rng(seed)
+    store = ZoneStore(samples=20)
+    for _ in range(count):
+        for _, _, label in POSITIONS:
+            dist = rng.integers(0, 450, 20).astype(np.int32)
+            levels = np.array([sample_priority(label, d) for d in dist.tolist()], np.uint8)
+            store.update(ZONE_IDS[label], int(levels.max()), int(dist.min()), dist, levels)
+        yield store
+
+
+def legacy(screen, store, text): # The window as the script drew it: zone_points() lists, one marker at a time
+    points = {label: zone_points(label, store.samples_cm[ZONE_IDS[label]], idx)
+              for idx, (_, _, label) in enumerate(POSITIONS)}
+    draw_frame(screen, store, points, text)
+    return screen
+
+
+def cloud_of(store, cloud=None):
+    cloud = cloud if cloud is not None else PointCloud(samples=20)
+    for _, _, label in POSITIONS:
+        cloud.update(label, store.samples_cm[ZONE_IDS[label]], store.samples_priority[ZONE_IDS[label]])
+    return cloud
+
+
+def pixels(surface):
+    return pygame.image.tobytes(surface, "RGB")
+
+
+def surface():
+    return pygame.Surface((render.WIDTH, render.HEIGHT), 0, 32)
+
+
+def test_point_cloud_draws_the_same_pixels_as_the_legacy_markers(text):
+    for store in frames(2):
+        screen = surface()
+        draw_frame(screen, store, cloud_of(store), text)
+        assert pixels(screen) == pixels(legacy(surface(), store, text))
+
+
+@pytest.mark.parametrize("erase_limit", [render.ERASE_LIMIT, 50]) # 50: past it, every frame is a full redraw
+def test_cached_frame_draws_the_same_pixels_as_draw_frame(text, monkeypatch, erase_limit):
+    monkeypatch.setattr(render, "ERASE_LIMIT", erase_limit)
+    cached, screen, cloud = CachedFrame(text), surface(), PointCloud(samples=20)
+    for n, store in enumerate(frames(4, seed=1)):
+        dirty = cached.draw(screen, store, cloud_of(store, cloud))
+        assert pixels(screen) == pixels(legacy(surface(), store, text)), f"frame {n}"
+        if n and erase_limit < 12 * 20:
+            assert dirty == [screen.get_rect()]
+        elif n:
+            assert screen.get_rect() not in dirty # Only what changed
+    assert cached.full_draws == (4 if erase_limit < 12 * 20 else 1)
+
+
+def test_an_error_in_the_draw_loop_is_kept_and_raised_by_close(tmp_path, monkeypatch):
+    from haptivision.framebuffer import FramebufferOutput
+    from haptivision.render import Renderer
+    output = FramebufferOutput(str(tmp_path / "fb.raw"), size=(172, 100), bpp=16)
+    renderer = Renderer(ZoneStore(samples=20), fps=100, output=output)
+    monkeypatch.setattr(renderer, "draw", lambda screen, force=False: 1 / 0)
+    renderer.start()
+    renderer._thread.join(2.0)
+    assert not renderer._thread.is_alive() and isinstance(renderer.error, ZeroDivisionError)
+    with pytest.raises(ZeroDivisionError):
+        renderer.close()
@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("gpiozero")
+pytest.importorskip("pigpio")
+
+
+@pytest.fixture
+def session(tmp_path, signals):
+    """A two sweep session log of the hallway scene, recorded on the simulator."""
+    from haptivision.runtime import Navigator
+    from haptivision.shutdown import StopSignal
+    from haptivision.sim.clock import VirtualClock
+    from haptivision.sim.hardware import SimulatedHardware
+    path = str(tmp_path / "recorded.hvt")
+    clock = VirtualClock()
+    with SimulatedHardware("hallway", seed=1, clock=clock.monotonic, sleep=clock.sleep), clock.patch():
+        navigator = Navigator(telemetry_path=path, console_interval=1e9, display=False)
+        navigator.start()
+        navigator.sweep()
+        navigator.sweep()
+        navigator.stop = StopSignal(signals=())
+        navigator.shutdown()
+        navigator.close()
+    return path
+
+
+def test_replay_ends_on_the_last_record(session, tmp_path, monkeypatch):
+    from haptivision.replay import replay
+    from haptivision.telemetry import SessionLog
+    monkeypatch.setenv("HAPTIVISION_DISPLAY", "0")
+    output = str(tmp_path / "replayed.hvt")
+    _, lidar, _ = replay(session, output=output)
+    recorded, replayed = SessionLog(session).records, SessionLog(output).records
+    assert lidar.finished and lidar.record == len(recorded)
+    assert len(replayed) == len(recorded) # The last zone is kept, and nothing is logged past it
+    assert (replayed["dist"] == recorded["dist"]).all()
+    assert (replayed["verdict"] == recorded["verdict"]).all()
@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("gpiozero")
+pytest.importorskip("pigpio")
+
+from haptivision.zones import HOME, POSITIONS
+
+
+class Button:
+    """Stands in for the control server: a command waits from before zone ``at`` of the next sweep."""
+
+    def __init__(self, at):
+        self.at = at
+        self.checks = 0
+
+    def pending(self):
+        self.checks += 1
+        return self.checks == self.at + 1
+
+
+@pytest.fixture
+def navigator(signals):
+    from haptivision.runtime import Navigator
+    from haptivision.shutdown import StopSignal
+    from haptivision.sim.clock import VirtualClock
+    from haptivision.sim.hardware import SimulatedHardware
+    clock = VirtualClock()
+    with SimulatedHardware("hallway", seed=1, clock=clock.monotonic, sleep=clock.sleep), clock.patch():
+        navigator = Navigator(console_interval=1e9, display=False)
+        navigator.start()
+        yield navigator
+        navigator.control = None
+        navigator.stop = StopSignal(signals=())
+        navigator.shutdown()
+        navigator.close()
+
+
+def test_a_sweep_cut_short_is_not_counted_and_the_next_starts_at_home_tilt(navigator):
+    tilts = []
+    zone = navigator.zone
+    navigator.zone = lambda idx, *args: (tilts.append((idx, navigator.tilt, navigator.servo2.value)), zone(idx, *args))
+    navigator.control = Button(at=7) # A "status" arrives after the tilt moved down
+    assert navigator.sweep() is False
+    assert navigator.arbiter.sweeps == 0
+    assert navigator.tilt != HOME[1]
+    navigator.control = None
+    tilts.clear()
+    assert navigator.sweep() is True
+    assert len(tilts) == len(POSITIONS) and tilts[0] == (0, HOME[1], pytest.approx(HOME[1]))
+    assert navigator.arbiter.sweeps == 1
@@ -0,0 +1,32 @@
+import pytest
+
+from haptivision.bench.scenarios import motor_pulses, pulse_priority
+from haptivision.haptics import pwm_setting
+from haptivision.patterns import PATTERNS
+from haptivision.sim.gpio import PinRecorder
+from haptivision.zones import GREEN_PRIORITY, GREY_PRIORITY, RED_PRIORITY, YELLOW_PRIORITY
+
+
+def test_pulse_priority_follows_the_patterns():
+    for priority, pattern in PATTERNS.items():
+        on = max(on for on, _ in pattern.pulses)
+        if priority == GREEN_PRIORITY:
+            assert on == 0.0
+            continue
+        for jitter in (0.9, 1.0, 1.1): # Pulses measured on the simulated pins are a little off
+            assert pulse_priority(on * jitter) == priority, pattern.name
+    assert pulse_priority(0.001) is None
+
+
+def test_pwm_settings_are_scored_as_the_priority_they_were_made_for():
+    t = iter(range(100))
+    recorder = PinRecorder(clock=lambda: float(next(t)))
+    settings = [(YELLOW_PRIORITY, 190), (YELLOW_PRIORITY, 101), (RED_PRIORITY, 90), (RED_PRIORITY, 10),
+                (GREY_PRIORITY, 400), (GREEN_PRIORITY, 400)]
+    for priority, cm in settings:
+        duty, frequency = pwm_setting(priority, cm)
+        recorder.pwm(13, frequency, duty)
+    assert motor_pulses(recorder, 13, "pwm") == [(float(i), p) for i, (p, _) in enumerate(settings[:-1])]
+    assert motor_pulses(recorder, 13, "blink") == [] # No pin edges: nothing a blink scorer would see
+    with pytest.raises(ValueError):
+        motor_pulses(recorder, 13, "audio")
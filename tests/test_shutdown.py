@@ -0,0 +1,43 @@
+import signal
+import sys
+import time
+
+import pytest
+
+import haptivision.state
+from haptivision.shutdown import Shutdown, StopSignal
+from haptivision.state import ZoneStore
+
+
+@pytest.fixture
+def stop(signals):
+    return StopSignal(signals=(signal.SIGTERM,))
+
+
+def test_shutdown_waits_for_the_store_write(stop, monkeypatch):
+    store = ZoneStore()
+    level = haptivision.state.proximity_level
+
+    def signal_mid_write(nearest_cm): # Runs between the two version increments of update()
+        stop._handler(signal.SIGTERM, sys._getframe(1))
+        return level(nearest_cm)
+
+    monkeypatch.setattr(haptivision.state, "proximity_level", signal_mid_write)
+    store.update(1, 3, 57) # Must not raise in the middle of the write
+    assert store.version % 2 == 0
+    with pytest.raises(Shutdown):
+        time.sleep(1) # The retry timer raises it once the write is done
+
+
+def test_renderer_close_is_bounded_with_a_write_left_half_done(tmp_path):
+    pytest.importorskip("pygame")
+    from haptivision.framebuffer import FramebufferOutput
+    from haptivision.render import Renderer
+    store = ZoneStore(samples=20)
+    output = FramebufferOutput(str(tmp_path / "fb.raw"), size=(320, 240), bpp=16)
+    renderer = Renderer(store, fps=50, output=output).start()
+    store.version += 1 # What an exception between the two increments of update() would leave
+    time.sleep(0.1)
+    start = time.monotonic()
+    renderer.close()
+    assert time.monotonic() - start < 1.0
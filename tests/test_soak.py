@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+pytest.importorskip("gpiozero")
+pytest.importorskip("pigpio")
+
+
+@pytest.fixture
+def headless(monkeypatch, signals):
+    monkeypatch.setenv("HAPTIVISION_DISPLAY", "0")
+    monkeypatch.setenv("HAPTIVISION_TELEMETRY", "0") # soak() points it at its own log
+    monkeypatch.delenv("HAPTIVISION_CONSOLE", raising=False) # soak() quiets it for the run only
+
+
+def test_soak_changes_priority(headless):
+    from haptivision.bench import soak
+    monitor = soak.soak(sweeps=40)
+    verdict = monitor.verdict(2048, 16384)
+    assert monitor.changes > 0 # The arbitration and pattern paths ran in the steady state
+    assert verdict["ok"], verdict
+    assert os.environ["HAPTIVISION_TELEMETRY"] == "0" and "HAPTIVISION_CONSOLE" not in os.environ
@@ -0,0 +1,15 @@
+import numpy as np
+
+from haptivision.telemetry import RateLimitedConsole
+from haptivision.zones import nearest_return
+
+
+def test_console_follows_its_clock_and_ignores_dropouts(capsys):
+    t = [100.0]
+    console = RateLimitedConsole(interval=5.0, clock=lambda: t[0])
+    dist = np.array([0, 0, 140, 95, 300], np.int32) # Two no-return dropouts
+    console.zone("Zone_1", nearest_return(dist), 1)
+    assert capsys.readouterr().out == "" # No wall time involved: the interval has not passed on this clock
+    t[0] = 105.0
+    console.zone("Zone_1", nearest_return(dist), 1)
+    assert "Zone_1:Y95" in capsys.readouterr().out